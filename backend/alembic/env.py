@@ -8,7 +8,14 @@ from alembic import context
 from sqlmodel import SQLModel  # Needed for .metadata from SQLModel
 from app.core.config import get_settings
 from app.models.user import User, UserStatus  # Import all models to register tables
-from app.models.todo import Todo, TodoStatus, Priority
+from app.models.todo import (
+    Priority,
+    Todo,
+    TodoArchive,
+    TodoListVersion,
+    TodoStatsCounter,
+    TodoStatus,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -17,7 +24,7 @@ config = context.config
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
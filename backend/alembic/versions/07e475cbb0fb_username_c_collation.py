@@ -0,0 +1,44 @@
+"""username c collation
+
+Revision ID: 07e475cbb0fb
+Revises: 2a9e93bf27d0
+Create Date: 2026-10-18 08:25:38.786127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "07e475cbb0fb"
+down_revision: Union[str, Sequence[str], None] = "2a9e93bf27d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Byte order: username prefix filters become a range on ix_user_username
+    # whatever the database collation. Rebuilds the index; no table rewrite
+    op.alter_column(
+        "user",
+        "username",
+        existing_type=sqlmodel.sql.sqltypes.AutoString(length=64),
+        type_=sa.String(length=64, collation="C"),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        "user",
+        "username",
+        existing_type=sa.String(length=64, collation="C"),
+        type_=sqlmodel.sql.sqltypes.AutoString(length=64),
+        existing_nullable=False,
+    )
@@ -0,0 +1,138 @@
+"""todo stats counters
+
+Revision ID: 9b2bd24cf208
+Revises: 55a737263040
+Create Date: 2026-10-18 04:26:02.793045
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b2bd24cf208"
+down_revision: Union[str, Sequence[str], None] = "55a737263040"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COUNTS = """
+    count(*) AS total,
+    count(*) FILTER (WHERE status = 'COMPLETED') AS completed,
+    count(*) FILTER (WHERE priority = 'LOW') AS low,
+    count(*) FILTER (WHERE priority = 'MEDIUM') AS medium,
+    count(*) FILTER (WHERE priority = 'HIGH') AS high
+"""
+
+# Statement-level triggers with transition tables: one aggregated upsert per
+# user per statement, so bulk writes do not pay a counter update per row.
+# Deletes only UPDATE existing counters: when a user is deleted, the cascade
+# may already have removed their todo_stats row, and re-inserting it would
+# violate the foreign key.
+APPLY_FUNCTION = f"""
+CREATE FUNCTION todo_stats_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO todo_stats AS s (user_id, total, completed, low, medium, high)
+        SELECT user_id, {COUNTS}
+        FROM new_rows GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            total = s.total + EXCLUDED.total,
+            completed = s.completed + EXCLUDED.completed,
+            low = s.low + EXCLUDED.low,
+            medium = s.medium + EXCLUDED.medium,
+            high = s.high + EXCLUDED.high;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE todo_stats AS s SET
+            total = s.total - d.total,
+            completed = s.completed - d.completed,
+            low = s.low - d.low,
+            medium = s.medium - d.medium,
+            high = s.high - d.high
+        FROM (
+            SELECT user_id, {COUNTS}
+            FROM old_rows GROUP BY user_id
+        ) AS d
+        WHERE s.user_id = d.user_id;
+    ELSE
+        INSERT INTO todo_stats AS s (user_id, total, completed, low, medium, high)
+        SELECT
+            user_id,
+            sum(n),
+            coalesce(sum(n) FILTER (WHERE status = 'COMPLETED'), 0),
+            coalesce(sum(n) FILTER (WHERE priority = 'LOW'), 0),
+            coalesce(sum(n) FILTER (WHERE priority = 'MEDIUM'), 0),
+            coalesce(sum(n) FILTER (WHERE priority = 'HIGH'), 0)
+        FROM (
+            SELECT user_id, status, priority, 1 AS n FROM new_rows
+            UNION ALL
+            SELECT user_id, status, priority, -1 AS n FROM old_rows
+        ) AS d
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            total = s.total + EXCLUDED.total,
+            completed = s.completed + EXCLUDED.completed,
+            low = s.low + EXCLUDED.low,
+            medium = s.medium + EXCLUDED.medium,
+            high = s.high + EXCLUDED.high
+        -- Title/description edits produce all-zero deltas; skip the write
+        WHERE (EXCLUDED.total, EXCLUDED.completed, EXCLUDED.low, EXCLUDED.medium,
+               EXCLUDED.high) <> (0, 0, 0, 0, 0);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table(
+        "todo_stats",
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("low", sa.Integer(), nullable=False),
+        sa.Column("medium", sa.Integer(), nullable=False),
+        sa.Column("high", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # ### end Alembic commands ###
+    op.execute(APPLY_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER todo_stats_insert AFTER INSERT ON todo "
+        "REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION todo_stats_apply();"
+    )
+    op.execute(
+        "CREATE TRIGGER todo_stats_update AFTER UPDATE ON todo "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION todo_stats_apply();"
+    )
+    op.execute(
+        "CREATE TRIGGER todo_stats_delete AFTER DELETE ON todo "
+        "REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION todo_stats_apply();"
+    )
+    # Backfill counters for existing todos
+    op.execute(
+        "INSERT INTO todo_stats (user_id, total, completed, low, medium, high) "
+        f"SELECT user_id, {COUNTS} FROM todo GROUP BY user_id;"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS todo_stats_delete ON todo;")
+    op.execute("DROP TRIGGER IF EXISTS todo_stats_update ON todo;")
+    op.execute("DROP TRIGGER IF EXISTS todo_stats_insert ON todo;")
+    op.execute("DROP FUNCTION IF EXISTS todo_stats_apply();")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table("todo_stats")
+    # ### end Alembic commands ###
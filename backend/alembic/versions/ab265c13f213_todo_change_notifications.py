@@ -0,0 +1,118 @@
+"""todo change notifications
+
+Revision ID: ab265c13f213
+Revises: f5e8b4bc5f5d
+Create Date: 2026-10-18 09:12:41.305218
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ab265c13f213"
+down_revision: Union[str, Sequence[str], None] = "f5e8b4bc5f5d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match app.core.change_feed.CHANNEL
+CHANNEL = "todo_changes"
+# Statements changing more rows (bulk imports, cascades from user deletion)
+# send one "bulk" event per user instead of one event per row
+MAX_ROW_EVENTS = 1000
+
+
+def _todo(alias: str) -> str:
+    # TodoRead as the list shows it: descriptions are unbounded (NOTIFY payloads
+    # are limited to 8000 bytes) and hidden from other users, so always null
+    return f"jsonb_set(to_jsonb({alias}), '{{description}}', 'null')"
+
+
+def _bulk(rows: str) -> str:
+    return f"""
+            PERFORM pg_notify('{CHANNEL}', json_build_object(
+                'id', nextval('todo_event_id_seq'), 'type', 'bulk',
+                'operation', lower(TG_OP), 'user_id', user_id, 'count', count(*)
+            )::text)
+            FROM {rows} GROUP BY user_id;"""
+
+
+# Statement-level triggers with transition tables, like todo_stats_apply().
+# NOTIFY is sent when the writing transaction commits, and not at all if it
+# rolls back, so every write path emits its events with no extra statement.
+NOTIFY_FUNCTION = f"""
+CREATE FUNCTION todo_notify_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed bigint;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        SELECT count(*) INTO changed FROM old_rows;
+    ELSE
+        SELECT count(*) INTO changed FROM new_rows;
+    END IF;
+    IF changed > {MAX_ROW_EVENTS} THEN
+        IF TG_OP = 'DELETE' THEN{_bulk("old_rows")}
+        ELSE{_bulk("new_rows")}
+        END IF;
+    ELSIF TG_OP = 'INSERT' THEN
+        PERFORM pg_notify('{CHANNEL}', json_build_object(
+            'id', nextval('todo_event_id_seq'), 'type', 'created',
+            'user_id', n.user_id, 'todo', {_todo("n")}
+        )::text)
+        FROM new_rows AS n;
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM pg_notify('{CHANNEL}', json_build_object(
+            'id', nextval('todo_event_id_seq'),
+            'type', CASE
+                WHEN n.status = 'COMPLETED' AND o.status <> 'COMPLETED' THEN 'completed'
+                ELSE 'updated'
+            END,
+            'user_id', n.user_id, 'todo', {_todo("n")}
+        )::text)
+        FROM new_rows AS n JOIN old_rows AS o ON o.id = n.id;
+    ELSE
+        PERFORM pg_notify('{CHANNEL}', json_build_object(
+            'id', nextval('todo_event_id_seq'), 'type', 'deleted',
+            'user_id', o.user_id, 'todo', {_todo("o")}
+        )::text)
+        FROM old_rows AS o;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE SEQUENCE todo_event_id_seq;")
+    op.execute(NOTIFY_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER todo_notify_insert AFTER INSERT ON todo "
+        "REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION todo_notify_changes();"
+    )
+    op.execute(
+        "CREATE TRIGGER todo_notify_update AFTER UPDATE ON todo "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION todo_notify_changes();"
+    )
+    op.execute(
+        "CREATE TRIGGER todo_notify_delete AFTER DELETE ON todo "
+        "REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION todo_notify_changes();"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS todo_notify_delete ON todo;")
+    op.execute("DROP TRIGGER IF EXISTS todo_notify_update ON todo;")
+    op.execute("DROP TRIGGER IF EXISTS todo_notify_insert ON todo;")
+    op.execute("DROP FUNCTION IF EXISTS todo_notify_changes();")
+    op.execute("DROP SEQUENCE IF EXISTS todo_event_id_seq;")
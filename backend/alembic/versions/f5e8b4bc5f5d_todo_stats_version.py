@@ -0,0 +1,116 @@
+"""todo stats version
+
+Revision ID: f5e8b4bc5f5d
+Revises: 0062d06ca0a2
+Create Date: 2026-10-18 05:14:59.694154
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f5e8b4bc5f5d"
+down_revision: Union[str, Sequence[str], None] = "0062d06ca0a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COUNTS = """
+    count(*) AS total,
+    count(*) FILTER (WHERE status = 'COMPLETED') AS completed,
+    count(*) FILTER (WHERE priority = 'LOW') AS low,
+    count(*) FILTER (WHERE priority = 'MEDIUM') AS medium,
+    count(*) FILTER (WHERE priority = 'HIGH') AS high
+"""
+
+# As in 9b2bd24cf208, plus `version`, bumped once per statement for every user
+# whose todos it touched. Unlike a timestamp it cannot go backwards when
+# transactions commit out of order, so sum(version) is a safe ETag watermark.
+# Title/description edits now write the row too, to bump the version.
+APPLY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION todo_stats_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO todo_stats AS s (user_id, total, completed, low, medium, high,
+                                     version)
+        SELECT user_id, {COUNTS}, 1
+        FROM new_rows GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            total = s.total + EXCLUDED.total,
+            completed = s.completed + EXCLUDED.completed,
+            low = s.low + EXCLUDED.low,
+            medium = s.medium + EXCLUDED.medium,
+            high = s.high + EXCLUDED.high,
+            version = s.version + 1;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE todo_stats AS s SET
+            total = s.total - d.total,
+            completed = s.completed - d.completed,
+            low = s.low - d.low,
+            medium = s.medium - d.medium,
+            high = s.high - d.high,
+            version = s.version + 1
+        FROM (
+            SELECT user_id, {COUNTS}
+            FROM old_rows GROUP BY user_id
+        ) AS d
+        WHERE s.user_id = d.user_id;
+    ELSE
+        INSERT INTO todo_stats AS s (user_id, total, completed, low, medium, high,
+                                     version)
+        SELECT
+            user_id,
+            sum(n),
+            coalesce(sum(n) FILTER (WHERE status = 'COMPLETED'), 0),
+            coalesce(sum(n) FILTER (WHERE priority = 'LOW'), 0),
+            coalesce(sum(n) FILTER (WHERE priority = 'MEDIUM'), 0),
+            coalesce(sum(n) FILTER (WHERE priority = 'HIGH'), 0),
+            1
+        FROM (
+            SELECT user_id, status, priority, 1 AS n FROM new_rows
+            UNION ALL
+            SELECT user_id, status, priority, -1 AS n FROM old_rows
+        ) AS d
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            total = s.total + EXCLUDED.total,
+            completed = s.completed + EXCLUDED.completed,
+            low = s.low + EXCLUDED.low,
+            medium = s.medium + EXCLUDED.medium,
+            high = s.high + EXCLUDED.high,
+            version = s.version + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column(
+        "todo_stats",
+        sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+    )
+    # ### end Alembic commands ###
+    op.execute(APPLY_FUNCTION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Restore the function as defined by the todo stats counters revision
+    previous = op.get_context().script.get_revision("9b2bd24cf208")
+    op.execute(
+        previous.module.APPLY_FUNCTION.replace(
+            "CREATE FUNCTION", "CREATE OR REPLACE FUNCTION", 1
+        )
+    )
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_column("todo_stats", "version")
+    # ### end Alembic commands ###
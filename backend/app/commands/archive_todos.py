@@ -0,0 +1,74 @@
+"""Move old completed todos from todo to todo_archive, in small batches.
+
+    uv run python -m app.commands.archive_todos [--older-than-days N] [--batch-size N]
+
+Archives todos completed and not updated for TODO_ARCHIVE_AFTER_DAYS days.
+Each batch is one short transaction that skips rows being written, with a
+pause between batches, so it can run from cron while the API serves traffic.
+Archived todos still count in todo_stats and can be read with
+`include_archived=true` on the list and get endpoints.
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.core.response_cache import response_cache, user_scope
+from app.db.session import engine
+from app.repositories.todo_repository import TodoRepository
+from app.schemas.mixin import utcnow_aware
+
+settings = get_settings()
+
+
+async def archive(older_than_days: int, batch_size: int, delay: float) -> int:
+    cutoff = utcnow_aware() - timedelta(days=older_than_days)
+    archived = 0
+    started = time.perf_counter()
+    async with AsyncSession(engine) as session:
+        repository = TodoRepository(session)
+        while owners := await repository.archive_completed(cutoff, batch_size):
+            archived += len(owners)
+            # Archived todos are no longer served without include_archived.
+            # Only a shared (redis) cache sees this; per-worker entries expire
+            await response_cache.invalidate(*map(user_scope, set(owners)))
+            if len(owners) < batch_size:
+                break
+            await asyncio.sleep(delay)
+    await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    print(f"Archived {archived} todo(s) completed before {cutoff:%Y-%m-%d} in {elapsed:.1f}s")
+    return archived
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive old completed todos")
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=settings.TODO_ARCHIVE_AFTER_DAYS,
+        help="archive todos completed and unchanged for this many days",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.TODO_ARCHIVE_BATCH_SIZE,
+        help="todos moved per transaction",
+    )
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=settings.TODO_ARCHIVE_BATCH_DELAY,
+        help="seconds to pause between batches",
+    )
+    args = parser.parse_args()
+    asyncio.run(archive(args.older_than_days, args.batch_size, args.delay))
+
+
+if __name__ == "__main__":
+    main()
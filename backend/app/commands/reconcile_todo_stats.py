@@ -0,0 +1,44 @@
+"""Rebuild the todo_stats counters from the todo and todo_archive tables and
+report drift.
+
+    uv run python -m app.commands.reconcile_todo_stats [--dry-run]
+
+Exits with status 1 when drift was found, so it can run from cron or CI.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import engine
+from app.repositories.todo_repository import TodoRepository
+
+
+async def reconcile(dry_run: bool) -> int:
+    async with AsyncSession(engine) as session:
+        drift = await TodoRepository(session).reconcile_stats(fix=not dry_run)
+    await engine.dispose()
+
+    for item in drift:
+        print(f"{item.user_id} {item.field}: stored={item.stored} actual={item.actual}")
+    users = len({item.user_id for item in drift})
+    if not drift:
+        print("todo_stats is consistent")
+    elif dry_run:
+        print(f"{users} user(s) drifted; run without --dry-run to fix")
+    else:
+        print(f"{users} user(s) drifted; counters rebuilt")
+    return 1 if drift else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconcile todo_stats counters")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without fixing it")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(reconcile(args.dry_run)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Change feed: todo writes pushed to clients as Server-Sent Events.
+
+Triggers on the todo table NOTIFY the todo_changes channel, one event per
+changed row, when the writing transaction commits (see the todo change
+notifications migration). Each worker holds a single LISTEN connection,
+opened for its first subscriber, and fans every notification out to the
+queues of all its subscribers, so clients cost no database connections.
+
+Every event has an id, sent as the SSE `id:` field. The worker keeps the
+last CHANGE_FEED_BUFFER_SIZE events, and a client reconnecting with
+Last-Event-ID gets the ones it missed. When that id is no longer buffered,
+or events may have been lost while the LISTEN connection was down, it gets
+a `reset` event instead and should refetch the list and stats. Ids are
+increasing numbers, but they are taken when a row is written, and events
+arrive in commit order; resuming goes by position, so treat them as opaque.
+
+Backpressure: a subscriber with CHANGE_FEED_QUEUE_SIZE events queued (a
+client reading slower than todos change) is disconnected instead of being
+buffered for without bound. It resumes from the buffer when it reconnects.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from contextlib import suppress
+from dataclasses import dataclass
+
+import asyncpg
+import orjson
+from sqlalchemy.engine import make_url
+
+from app.core.config import get_settings
+from app.core.metrics import Counter, Gauge, registry
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Must match the channel in the todo_notify_changes() trigger function
+CHANNEL = "todo_changes"
+# Milliseconds an EventSource waits before reconnecting
+RETRY_MS = 2000
+HEARTBEAT = b": keep-alive\n\n"
+
+
+def format_event(event: str, data: bytes | str, event_id: str | None = None) -> bytes:
+    """One SSE message; `data` must be a single line, as compact JSON is."""
+    if isinstance(data, str):
+        data = data.encode()
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: ".encode() + data + b"\n\n"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    id: str
+    type: str
+    # Encoded once, sent as is to every subscriber
+    message: bytes
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "ChangeEvent":
+        data = orjson.loads(payload)
+        event_id, event_type = str(data["id"]), data["type"]
+        return cls(event_id, event_type, format_event(event_type, payload, event_id))
+
+
+def reset_event(last_id: str | None) -> bytes:
+    # Carries the newest id, so the client resumes from there after refetching
+    return format_event("reset", b"{}", last_id)
+
+
+class ChangeFeedUnavailableError(Exception):
+    """The worker cannot take another subscriber, or cannot LISTEN."""
+
+
+change_feed_events = Counter(
+    "change_feed_events_total", "Change feed events received, by type.", ("type",)
+)
+change_feed_disconnects = Counter(
+    "change_feed_disconnects_total",
+    "Subscribers disconnected by the server, by reason (overflow or shutdown).",
+    ("reason",),
+)
+registry.register(change_feed_events)
+registry.register(change_feed_disconnects)
+
+
+class Subscription:
+    def __init__(self):
+        # None tells the stream to end
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+
+
+class ChangeFeed:
+    """One LISTEN connection per worker, fanned out to every subscriber."""
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        buffer_size: int,
+        queue_size: int,
+        max_subscribers: int,
+        heartbeat: float,
+        reconnect_delay: float = 1.0,
+    ):
+        self.dsn = dsn
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self.reconnect_delay = reconnect_delay
+        self.subscribers: set[Subscription] = set()
+        self._buffer: deque[ChangeEvent] = deque(maxlen=buffer_size)
+        self._listening = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def listening(self) -> bool:
+        return self._listening.is_set()
+
+    async def start(self, timeout: float) -> None:
+        """Start listening unless already started, and wait until LISTEN is on."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        async with asyncio.timeout(timeout):
+            await self._listening.wait()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for subscription in list(self.subscribers):
+            self._close(subscription, "shutdown")
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError):
+                logger.warning("Change feed cannot connect; retrying", exc_info=True)
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _: lost.set())
+            try:
+                await conn.add_listener(CHANNEL, self._on_notification)
+                self._listening.set()
+                while not lost.is_set():
+                    # A round trip now and then notices a connection that
+                    # died without closing its socket
+                    with suppress(TimeoutError):
+                        await asyncio.wait_for(lost.wait(), self.heartbeat)
+                        break
+                    await asyncio.wait_for(conn.fetchval("SELECT 1"), self.heartbeat)
+            except (OSError, TimeoutError, asyncpg.PostgresError):
+                logger.warning("Change feed connection failed; reconnecting", exc_info=True)
+            finally:
+                conn.terminate()
+                if self._listening.is_set():
+                    self._listening.clear()
+                    self._lost_events()
+            await asyncio.sleep(self.reconnect_delay)
+
+    def _lost_events(self) -> None:
+        """Nothing is received while not listening: buffered ids can no
+        longer be resumed from, and subscribers must refetch."""
+        last_id = self._buffer[-1].id if self._buffer else None
+        self._buffer.clear()
+        for subscription in list(self.subscribers):
+            self._deliver(subscription, reset_event(last_id))
+
+    def _on_notification(self, conn: object, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = ChangeEvent.from_payload(payload)
+        except (ValueError, KeyError):
+            logger.warning("Ignoring malformed change feed payload: %r", payload)
+            return
+        change_feed_events.inc((event.type,))
+        self._buffer.append(event)
+        for subscription in list(self.subscribers):
+            self._deliver(subscription, event.message)
+
+    def _deliver(self, subscription: Subscription, message: bytes) -> None:
+        if subscription.queue.qsize() >= self.queue_size:
+            self._close(subscription, "overflow")
+        else:
+            subscription.queue.put_nowait(message)
+
+    def _close(self, subscription: Subscription, reason: str) -> None:
+        """Stop delivering to `subscription`; its stream ends once it has
+        sent what is already queued."""
+        if subscription in self.subscribers:
+            self.subscribers.discard(subscription)
+            subscription.queue.put_nowait(None)
+            change_feed_disconnects.inc((reason,))
+
+    def _replay(self, last_event_id: str | None) -> list[bytes]:
+        if last_event_id is None:
+            return []
+        for index in range(len(self._buffer) - 1, -1, -1):
+            if self._buffer[index].id == last_event_id:
+                return [event.message for event in list(self._buffer)[index + 1 :]]
+        return [reset_event(self._buffer[-1].id if self._buffer else None)]
+
+    def subscribe(self, last_event_id: str | None = None) -> Subscription:
+        """Register a subscriber, queueing the events it missed since
+        `last_event_id` (or a reset) ahead of the live ones."""
+        if len(self.subscribers) >= self.max_subscribers:
+            raise ChangeFeedUnavailableError("Too many change feed subscribers")
+        subscription = Subscription()
+        for message in self._replay(last_event_id):
+            subscription.queue.put_nowait(message)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+
+    async def stream(self, subscription: Subscription) -> AsyncIterator[bytes]:
+        """The subscription as an SSE body, with heartbeats while idle."""
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), self.heartbeat)
+                except TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscription)
+
+    async def open(self, last_event_id: str | None = None) -> AsyncIterator[bytes]:
+        """Subscribe and return the SSE body; raises ChangeFeedUnavailableError."""
+        try:
+            await self.start(timeout=settings.HEALTH_CHECK_TIMEOUT)
+        except TimeoutError:
+            raise ChangeFeedUnavailableError("Change feed is not connected") from None
+        return self.stream(self.subscribe(last_event_id))
+
+    def metrics(self) -> Iterable[str]:
+        subscribers = Gauge("change_feed_subscribers", "Clients connected to the change feed.")
+        listening = Gauge("change_feed_listening", "Whether the LISTEN connection is up.")
+        subscribers.set(len(self.subscribers))
+        listening.set(int(self.listening))
+        return subscribers.render() + listening.render()
+
+
+def _listen_dsn() -> str:
+    # asyncpg takes a plain postgresql:// URL, without SQLAlchemy's driver name
+    url = make_url(settings.CHANGE_FEED_DATABASE_URL or settings.DATABASE_URL)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+change_feed = ChangeFeed(
+    _listen_dsn(),
+    buffer_size=settings.CHANGE_FEED_BUFFER_SIZE,
+    queue_size=settings.CHANGE_FEED_QUEUE_SIZE,
+    max_subscribers=settings.CHANGE_FEED_MAX_SUBSCRIBERS,
+    heartbeat=settings.CHANGE_FEED_HEARTBEAT_SECONDS,
+)
+registry.add_collector(change_feed.metrics)
@@ -1,11 +1,57 @@
 # https://fastapi.tiangolo.com/advanced/settings/
 
 from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Connection pool, per engine (primary and each replica) and per worker
+    DATABASE_POOL_SIZE: int = 5
+    # Extra connections opened above DATABASE_POOL_SIZE under load
+    DATABASE_MAX_OVERFLOW: int = 10
+    # Seconds a request waits for a free connection before failing
+    DATABASE_POOL_TIMEOUT: float = 30
+    # Seconds after which a connection is replaced; -1 never
+    DATABASE_POOL_RECYCLE: int = 3600
+    # Test every connection with a round trip on checkout; disable when the
+    # network and server are reliable and rely on DATABASE_POOL_RECYCLE
+    DATABASE_POOL_PRE_PING: bool = True
+    # Prepared statements cached per connection (SQLAlchemy and asyncpg)
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100
+    # Behind PgBouncer in transaction mode: no statement caching and unique
+    # prepared statement names, since consecutive queries may use different
+    # server connections
+    DATABASE_PGBOUNCER: bool = False
+    # Connections opened and warmed (statements compiled and prepared) per
+    # engine at startup, at most DATABASE_POOL_SIZE; 0 skips the warm-up
+    DATABASE_WARMUP_CONNECTIONS: int = 5
+    # Seconds the database warm-up may take before startup goes on without it
+    DATABASE_WARMUP_TIMEOUT: float = 30
+    # Connections each database server (primary, each replica) allows this app
+    # across all instances and workers. app.server shrinks the pool per worker
+    # to fit; 0 leaves DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW as they are
+    DATABASE_MAX_CONNECTIONS: int = 0
+    # Comma-separated read replica URLs; empty sends every read to DATABASE_URL
+    DATABASE_READ_URLS: str = ""
+    # Seconds a replica that failed to connect is skipped before it is retried
+    DATABASE_READ_RETRY_SECONDS: float = 30
+    # Connect timeout for replicas, so a dead one fails over quickly
+    DATABASE_READ_CONNECT_TIMEOUT: float = 2
+    # After a write, that client's reads go to the primary for this long (per
+    # worker) so it sees its own changes despite replica lag; 0 disables
+    READ_YOUR_WRITES_SECONDS: float = 5
+    # A request running one statement more often than this is flagged as a
+    # likely N+1 query; 0 disables the check
+    SQL_REPEATED_QUERY_LIMIT: int = 5
+    # Raise RepeatedQueryError instead of logging a warning (set in tests)
+    SQL_REPEATED_QUERY_ERROR: bool = False
+    # Statements slower than this are written to the slow-query log; 0 disables
+    SQL_SLOW_QUERY_MS: float = 500
+    # Seconds before the same slow statement is EXPLAINed again; 0 logs slow
+    # statements without a plan
+    SQL_SLOW_QUERY_EXPLAIN_INTERVAL: float = 300
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -13,6 +59,76 @@ class Settings(BaseSettings):
     APP_NAME: str = "Todo API"
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
+    # Production server (python -m app.server): worker processes per instance,
+    # 0 means one per available CPU
+    WEB_CONCURRENCY: int = 0
+    # Instances (hosts, containers) running app.server against one database,
+    # sharing DATABASE_MAX_CONNECTIONS
+    WEB_INSTANCES: int = 1
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8000
+    # Connections the listening socket queues while every worker is busy
+    WEB_BACKLOG: int = 2048
+    # Seconds an idle keep-alive connection stays open; keep it above the load
+    # balancer's idle timeout, so the balancer never reuses a connection the
+    # server is closing
+    WEB_KEEPALIVE_SECONDS: int = 75
+    # Admission control: at most ADMISSION_MAX_CONCURRENCY requests that use the
+    # database run at once per worker (0 means DATABASE_POOL_SIZE +
+    # DATABASE_MAX_OVERFLOW), up to ADMISSION_MAX_QUEUE more wait at most
+    # ADMISSION_QUEUE_TIMEOUT seconds, and the rest get 503 with Retry-After
+    ADMISSION_CONTROL: bool = True
+    ADMISSION_MAX_CONCURRENCY: int = 0
+    ADMISSION_MAX_QUEUE: int = 50
+    ADMISSION_QUEUE_TIMEOUT: float = 2
+    # Seconds sent in Retry-After when a request is not admitted
+    ADMISSION_RETRY_AFTER: int = 1
+    # Seconds /health/ready waits for the database before reporting it down
+    HEALTH_CHECK_TIMEOUT: float = 2
+    # Cache of rendered GET responses (todo list, single todo, stats, /users/me):
+    # "memory" (per worker) or "redis" (shared by workers; needs the redis extra)
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    # Seconds an entry lives unless a write invalidates it first; also how
+    # long other workers may serve a user's old entries with "memory". 0 disables
+    RESPONSE_CACHE_TTL_SECONDS: float = 5
+    # Entries kept per worker by the memory backend, least recently used evicted
+    RESPONSE_CACHE_MAX_SIZE: int = 10_000
+    # Change feed (GET /todos/events): each worker LISTENs on one connection to
+    # CHANGE_FEED_DATABASE_URL, or DATABASE_URL when empty. Behind PgBouncer in
+    # transaction mode, point it at PostgreSQL directly: LISTEN needs a session
+    CHANGE_FEED_DATABASE_URL: str = ""
+    # Subscribers per worker before new ones get 503
+    CHANGE_FEED_MAX_SUBSCRIBERS: int = 1000
+    # Recent events kept per worker, for clients resuming with Last-Event-ID
+    CHANGE_FEED_BUFFER_SIZE: int = 1000
+    # Events queued for a subscriber before it is disconnected as too slow
+    CHANGE_FEED_QUEUE_SIZE: int = 100
+    # Seconds between keep-alive comments to idle subscribers, and pings on
+    # the LISTEN connection
+    CHANGE_FEED_HEARTBEAT_SECONDS: float = 15
+    # Per-worker cache of decoded tokens and users for get_current_user.
+    # Status changes on other workers take effect within the TTL; 0 disables.
+    AUTH_CACHE_TTL_SECONDS: float = 30
+    AUTH_CACHE_MAX_SIZE: int = 10_000
+    # Where Argon2 runs: "thread", "process" or "inline" (on the event loop)
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    # 0 means one worker per CPU
+    PASSWORD_HASH_WORKERS: int = 0
+    # Queued + running hash calls before login/register answer 503
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    # Maximum number of items accepted by the todos batch endpoints
+    TODO_BATCH_MAX_SIZE: int = 500
+    # Rows validated and copied to the staging table per round trip on import
+    TODO_IMPORT_BATCH_SIZE: int = 5000
+    # Rejected rows listed in an import result; the rest are only counted
+    TODO_IMPORT_MAX_ERRORS: int = 1000
+    # Completed todos untouched for this many days are moved to todo_archive
+    # by app.commands.archive_todos, TODO_ARCHIVE_BATCH_SIZE rows per
+    # transaction with TODO_ARCHIVE_BATCH_DELAY seconds between them
+    TODO_ARCHIVE_AFTER_DAYS: int = 90
+    TODO_ARCHIVE_BATCH_SIZE: int = 500
+    TODO_ARCHIVE_BATCH_DELAY: float = 0.1
 
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -0,0 +1,38 @@
+"""Weak ETags for conditional requests."""
+
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: object) -> str:
+    """Build a weak ETag from values that change whenever the representation does."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Whether an If-None-Match / If-Match header lists `etag` (or is `*`).
+
+    Uses weak comparison for both headers: every ETag issued here is weak, and
+    strict If-Match semantics would make them useless for PATCH.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """Tag `response` with `etag`; return a 304 if the client already has it.
+
+    Responses are private and must be revalidated, so clients and proxies
+    always come back with If-None-Match instead of serving a stale copy.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
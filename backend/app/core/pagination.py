@@ -0,0 +1,63 @@
+"""Opaque cursor tokens for keyset pagination."""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into a URL-safe token."""
+    raw = json.dumps([_dump(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str, size: int) -> list[Any]:
+    """Decode a token produced by `encode_cursor` holding exactly `size` values."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Invalid cursor")
+    return values
+
+
+def decode_created_at_cursor(token: str) -> tuple[datetime, uuid.UUID]:
+    """Decode a `(created_at, id)` cursor as used by the todo listing."""
+    created_at, row_id = decode_cursor(token, 2)
+    try:
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, TypeError, AttributeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+
+
+def decode_ranked_cursor(token: str) -> tuple[float, datetime, uuid.UUID]:
+    """Decode a `(rank, created_at, id)` cursor as used by relevance-ordered search."""
+    rank, created_at, row_id = decode_cursor(token, 3)
+    try:
+        return float(rank), datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, TypeError, AttributeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+
+
+def decode_username_cursor(token: str) -> str:
+    """Decode a `(username,)` cursor as used by the user listing."""
+    (username,) = decode_cursor(token, 1)
+    if not isinstance(username, str):
+        raise InvalidCursorError("Invalid cursor")
+    return username
@@ -0,0 +1,245 @@
+"""Cache of rendered responses for the hot per-user GET endpoints.
+
+An entry is the ETag and JSON body of a 200 response. Entries are grouped
+into scopes, and writes invalidate whole scopes once they have committed:
+
+- TODO_LIST_SCOPE holds todo list pages. The list shows every user's todos,
+  so any todo write invalidates it. Its keys also embed the list ETag, which
+  is built from the todo_list_version watermark, so a page is never served after a
+  write even by a worker that did not see the invalidation
+- user_scope(user_id) holds that user's single todos, stats and /users/me.
+  It is invalidated by their todo writes and by updates to the user
+
+Two backends: "memory" (the default) is a size-bounded LRU per worker
+process, so other workers keep their copy of a user's entries until the TTL
+runs out; "redis" is shared by every worker, so invalidation is seen
+everywhere at once. Either way a read racing a write may store what it read
+before the write; the TTL bounds how long that copy lives.
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Protocol
+
+from fastapi import Request, Response
+
+from app.core.config import get_settings
+from app.core.etag import not_modified
+from app.core.metrics import Counter, Gauge, registry
+
+logger = logging.getLogger(__name__)
+
+TODO_LIST_SCOPE = "todos"
+
+
+def user_scope(user_id: object) -> str:
+    return f"user:{user_id}"
+
+
+class CacheBackend(Protocol):
+    async def get(self, scope: str, key: str) -> bytes | None: ...
+
+    async def set(self, scope: str, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def invalidate(self, *scopes: str) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+class MemoryCacheBackend:
+    """Size-bounded LRU of entries that expire after their TTL, per process.
+
+    Not thread-safe; meant to be used from a single event loop, like TTLCache.
+    Keeps an index of the keys in each scope so invalidation touches only them.
+    """
+
+    def __init__(self, maxsize: int, timer: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.timer = timer
+        self._data: OrderedDict[tuple[str, str], tuple[float, bytes]] = OrderedDict()
+        self._scopes: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _forget(self, scope: str, key: str) -> None:
+        keys = self._scopes.get(scope)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._scopes[scope]
+
+    async def get(self, scope: str, key: str) -> bytes | None:
+        entry = self._data.get((scope, key))
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.timer():
+            del self._data[scope, key]
+            self._forget(scope, key)
+            return None
+        self._data.move_to_end((scope, key))
+        return value
+
+    async def set(self, scope: str, key: str, value: bytes, ttl: float) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[scope, key] = (self.timer() + ttl, value)
+        self._data.move_to_end((scope, key))
+        self._scopes.setdefault(scope, set()).add(key)
+        while len(self._data) > self.maxsize:
+            (old_scope, old_key), _ = self._data.popitem(last=False)
+            self._forget(old_scope, old_key)
+
+    async def invalidate(self, *scopes: str) -> None:
+        for scope in scopes:
+            for key in self._scopes.pop(scope, ()):
+                del self._data[scope, key]
+
+    async def clear(self) -> None:
+        self._data.clear()
+        self._scopes.clear()
+
+
+class RedisCacheBackend:
+    """One Redis hash per scope, shared by every worker.
+
+    Invalidating a scope is a single DEL. Hash fields cannot expire on their
+    own, so each value carries its expiry time and the hash itself expires a
+    TTL after its last write. The total size is bounded by the server's
+    maxmemory policy (e.g. allkeys-lru), not here. Redis errors are logged
+    and treated as misses, so an outage only costs the cache.
+    """
+
+    def __init__(self, url: str, prefix: str = "response-cache:"):
+        try:
+            from redis.asyncio import Redis
+            from redis.exceptions import RedisError
+        except ImportError as exc:
+            raise RuntimeError(
+                "RESPONSE_CACHE_BACKEND=redis needs the redis package (the 'redis' extra)"
+            ) from exc
+        self.client = Redis.from_url(url)
+        self.prefix = prefix
+        self._errors = (RedisError, OSError)
+
+    def _name(self, scope: str) -> str:
+        return self.prefix + scope
+
+    async def get(self, scope: str, key: str) -> bytes | None:
+        try:
+            value = await self.client.hget(self._name(scope), key)
+        except self._errors:
+            logger.warning("Response cache read failed", exc_info=True)
+            return None
+        if value is None:
+            return None
+        expires_at, _, body = value.partition(b" ")
+        return body if float(expires_at) > time.time() else None
+
+    async def set(self, scope: str, key: str, value: bytes, ttl: float) -> None:
+        name = self._name(scope)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hset(name, key, b"%f %s" % (time.time() + ttl, value))
+                pipe.expire(name, math.ceil(ttl))
+                await pipe.execute()
+        except self._errors:
+            logger.warning("Response cache write failed", exc_info=True)
+
+    async def invalidate(self, *scopes: str) -> None:
+        try:
+            await self.client.delete(*map(self._name, scopes))
+        except self._errors:
+            logger.warning("Response cache invalidation failed", exc_info=True)
+
+    async def clear(self) -> None:
+        async for name in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(name)
+
+
+@dataclass
+class CachedResponse:
+    etag: str
+    body: bytes
+
+    def encode(self) -> bytes:
+        return self.etag.encode() + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, value: bytes) -> "CachedResponse":
+        etag, _, body = value.partition(b"\n")
+        return cls(etag.decode(), body)
+
+    def respond(self, request: Request) -> Response:
+        """The body with its ETag, or a 304 if the client already has it."""
+        response = Response(self.body, media_type="application/json")
+        return not_modified(request, response, self.etag) or response
+
+
+response_cache_requests = Counter(
+    "response_cache_requests_total",
+    "Response cache lookups by route and result (hit or miss).",
+    ("route", "result"),
+)
+registry.register(response_cache_requests)
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def get(self, scope: str, key: str, *, route: str) -> CachedResponse | None:
+        value = await self.backend.get(scope, key)
+        response_cache_requests.inc((route, "miss" if value is None else "hit"))
+        return None if value is None else CachedResponse.decode(value)
+
+    async def set(self, scope: str, key: str, entry: CachedResponse) -> None:
+        await self.backend.set(scope, key, entry.encode(), self.ttl)
+
+    async def invalidate(self, *scopes: str) -> None:
+        if self.enabled:
+            await self.backend.invalidate(*scopes)
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+
+def hit_ratio_metrics() -> Iterable[str]:
+    """Hit ratio per route since the worker started, from the lookup counter."""
+    ratio = Gauge(
+        "response_cache_hit_ratio", "Share of response cache lookups that hit.", ("route",)
+    )
+    lookups: dict[str, dict[str, float]] = {}
+    for (route, result), count in response_cache_requests.values.items():
+        lookups.setdefault(route, {})[result] = count
+    for route, counts in lookups.items():
+        ratio.set(counts.get("hit", 0) / sum(counts.values()), (route,))
+    lines = ratio.render()
+    if isinstance(response_cache.backend, MemoryCacheBackend):
+        entries = Gauge("response_cache_entries", "Entries in this worker's response cache.")
+        entries.set(len(response_cache.backend))
+        lines += entries.render()
+    return lines
+
+
+def _create_backend() -> CacheBackend:
+    settings = get_settings()
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.RESPONSE_CACHE_REDIS_URL)
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_SIZE)
+    raise ValueError(f"Unknown response cache backend: {settings.RESPONSE_CACHE_BACKEND}")
+
+
+response_cache = ResponseCache(_create_backend(), get_settings().RESPONSE_CACHE_TTL_SECONDS)
+registry.add_collector(hit_ratio_metrics)
@@ -1,4 +1,9 @@
-from datetime import datetime, timedelta, timezone
+import asyncio
+import os
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from typing import Any, TypeVar
 
 import jwt
 from pwdlib import PasswordHash
@@ -9,6 +14,12 @@ password_hash = PasswordHash.recommended()
 
 settings = get_settings()
 
+T = TypeVar("T")
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the password hashing queue is full."""
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return password_hash.verify(plain_password, hashed_password)
@@ -18,10 +29,71 @@ def get_password_hash(password: str) -> str:
     return password_hash.hash(password)
 
 
+class PasswordExecutor:
+    """Runs Argon2 hashing off the event loop.
+
+    Each hash or verify takes tens of milliseconds of CPU; run inline it
+    stalls every other request on the worker. `mode` is "thread" (argon2
+    releases the GIL, so threads hash in parallel), "process", or "inline"
+    (the old behaviour, kept for benchmarks). At most `max_queue` calls may
+    be queued or running; beyond that callers get PasswordHasherBusyError
+    instead of piling up behind a login burst.
+    """
+
+    def __init__(self, mode: str, workers: int, max_queue: int):
+        if mode not in ("inline", "thread", "process"):
+            raise ValueError(f"Unknown password hash executor mode: {mode}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.mode == "inline":
+            return func(*args)
+        if self.pending >= self.max_queue:
+            raise PasswordHasherBusyError("Password hashing queue is full")
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_executor = PasswordExecutor(
+    settings.PASSWORD_HASH_EXECUTOR,
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_executor.run(get_password_hash, password)
+
+
 def create_access_token(subject: str, expires_delta: timedelta) -> str:
-    expire = datetime.now(timezone.utc) + expires_delta
+    expire = datetime.now(UTC) + expires_delta
     to_encode = {"sub": str(subject), "exp": expire}
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
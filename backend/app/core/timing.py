@@ -0,0 +1,44 @@
+"""Per-request stage timings, reported in the Server-Timing header."""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class RequestTimings:
+    """Seconds spent in each stage of one request, in the order first seen."""
+
+    __slots__ = ("start", "endpoint_end", "stages")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # Set when the path operation returns; serialization starts there
+        self.endpoint_end: float | None = None
+        self.stages: dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages.items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+current_timings: ContextVar[RequestTimings | None] = ContextVar("current_timings", default=None)
+
+
+@contextmanager
+def record_stage(stage: str) -> Iterator[None]:
+    """Add the time spent in the block to `stage` of the current request, if any."""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(stage, time.perf_counter() - start)
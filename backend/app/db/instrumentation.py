@@ -0,0 +1,195 @@
+"""SQL accounting per request: query counts, repeated statements, slow queries.
+
+Engines created by app.db.session run these cursor hooks. Counts go to the
+innermost active QueryLog (and its parents); MetricsMiddleware opens one per
+request, and tests open their own with assert_max_queries.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.timing import current_timings
+
+logger = logging.getLogger(__name__)
+# Route this logger to its own handler to keep a separate slow-query log
+slow_query_logger = logging.getLogger("app.db.slow_queries")
+
+settings = get_settings()
+
+queries_total = metrics.Counter("db_queries_total", "SQL statements executed.")
+slow_queries_total = metrics.Counter(
+    "db_slow_queries_total", "Statements slower than SQL_SLOW_QUERY_MS."
+)
+repeated_queries_total = metrics.Counter(
+    "db_repeated_queries_total",
+    "Requests that ran one statement more than SQL_REPEATED_QUERY_LIMIT times.",
+)
+for _metric in (queries_total, slow_queries_total, repeated_queries_total):
+    metrics.registry.register(_metric)
+
+
+class RepeatedQueryError(Exception):
+    """A request ran the same statement more often than allowed, likely an N+1."""
+
+
+class QueryLog:
+    """Statements executed while the log is active, nested logs included."""
+
+    def __init__(self, parent: "QueryLog | None" = None, repeat_limit: int = 0):
+        self.parent = parent
+        # Flag statements run more than this many times; 0 disables the check
+        self.repeat_limit = repeat_limit
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str) -> None:
+        log = self
+        while log is not None:
+            log.count += 1
+            log.statements[statement] += 1
+            log = log.parent
+        if self.repeat_limit and self.statements[statement] == self.repeat_limit + 1:
+            repeated_queries_total.inc()
+            message = (
+                f"Statement ran more than {self.repeat_limit} times in one request, "
+                f"likely an N+1 query: {statement}"
+            )
+            if settings.SQL_REPEATED_QUERY_ERROR:
+                raise RepeatedQueryError(message)
+            logger.warning(message)
+
+    def add_time(self, seconds: float) -> None:
+        log = self
+        while log is not None:
+            log.seconds += seconds
+            log = log.parent
+
+    def summary(self) -> str:
+        """One line per distinct statement, most frequent first."""
+        return "\n".join(
+            f"{count}x {statement}" for statement, count in self.statements.most_common()
+        )
+
+
+current_query_log: ContextVar[QueryLog | None] = ContextVar("current_query_log", default=None)
+
+
+@contextmanager
+def track_queries(repeat_limit: int = 0) -> Iterator[QueryLog]:
+    """Record the statements run in this block (and this context) in a QueryLog."""
+    log = QueryLog(current_query_log.get(), repeat_limit)
+    token = current_query_log.set(log)
+    try:
+        yield log
+    finally:
+        current_query_log.reset(token)
+
+
+# Statements EXPLAIN accepts; DDL, ANALYZE and the like are logged without a plan
+EXPLAINABLE = {"SELECT", "INSERT", "UPDATE", "DELETE", "MERGE", "VALUES", "WITH"}
+# Set while a slow statement is being EXPLAINed, so that is not reported again
+_explaining: ContextVar[bool] = ContextVar("explaining", default=False)
+# Slow statements explained recently; each is explained once per interval
+_explained = TTLCache(maxsize=1000, ttl=settings.SQL_SLOW_QUERY_EXPLAIN_INTERVAL)
+_explain_tasks: set[asyncio.Task] = set()
+
+
+def _first_keyword(statement: str) -> str:
+    return statement.lstrip(" \n\t(").split(None, 1)[0].upper() if statement.strip() else ""
+
+
+async def explain(engine: AsyncEngine, statement: str, parameters: Sequence[Any]) -> str:
+    """EXPLAIN `statement` in a read-only transaction that is rolled back.
+
+    Only SELECTs are run with ANALYZE and BUFFERS: anything else is planned
+    but not executed. EXPLAIN ANALYZE runs the query again, on a separate
+    pooled connection, outside the transaction that was slow.
+    """
+    analyze = _first_keyword(statement) == "SELECT"
+    prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+    token = _explaining.set(True)
+    try:
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+            result = await conn.exec_driver_sql(prefix + statement, tuple(parameters))
+            return "\n".join(row[0] for row in result)
+    finally:
+        _explaining.reset(token)
+
+
+async def _log_slow_query(
+    engine: AsyncEngine, statement: str, parameters: Sequence[Any], seconds: float
+) -> None:
+    try:
+        plan = await explain(engine, statement, parameters)
+    except Exception as exc:
+        plan = f"EXPLAIN failed: {exc}"
+    slow_query_logger.warning("Slow query (%.1f ms): %s\n%s", seconds * 1000, statement, plan)
+
+
+def _report_slow_query(
+    engine: AsyncEngine, statement: str, parameters: Any, executemany: bool, seconds: float
+) -> None:
+    slow_queries_total.inc()
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    explain_enabled = (
+        settings.SQL_SLOW_QUERY_EXPLAIN_INTERVAL > 0 and _first_keyword(statement) in EXPLAINABLE
+    )
+    if loop is None or not explain_enabled or _explained.get(statement) is not None:
+        slow_query_logger.warning("Slow query (%.1f ms): %s", seconds * 1000, statement)
+        return
+    _explained.set(statement, True)
+    # A fresh context keeps the EXPLAIN out of the current request's counts
+    task = loop.create_task(
+        _log_slow_query(engine, statement, parameters or (), seconds),
+        context=contextvars.Context(),
+    )
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attach the query accounting hooks to `engine`."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_query(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info["query_start"] = time.perf_counter()
+        queries_total.inc()
+        log = current_query_log.get()
+        if log is not None:
+            log.record(statement)
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def end_query(conn, cursor, statement, parameters, context, executemany) -> None:
+        start = conn.info.pop("query_start", None)
+        if start is None:
+            return
+        seconds = time.perf_counter() - start
+        timings = current_timings.get()
+        if timings is not None:
+            timings.add("db", seconds)
+        log = current_query_log.get()
+        if log is not None:
+            log.add_time(seconds)
+        threshold = settings.SQL_SLOW_QUERY_MS
+        if threshold and seconds * 1000 >= threshold and not _explaining.get():
+            _report_slow_query(engine, statement, parameters, executemany, seconds)
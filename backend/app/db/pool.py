@@ -0,0 +1,117 @@
+"""Connection pool that records checkout latency and failures."""
+
+import bisect
+import time
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import Counter, Gauge, Histogram
+
+# Upper bounds of the checkout wait histogram buckets, in milliseconds
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolStats:
+    """Cumulative checkout counters for one pool, kept across dispose()."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.wait_ms_sum = 0.0
+        # One slot per bucket plus one for anything slower than the last
+        self.wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe(self, wait_ms: float) -> None:
+        self.checkouts += 1
+        self.wait_ms_sum += wait_ms
+        self.wait_counts[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def wait_histogram(self) -> dict[str, int]:
+        """Cumulative counts keyed by upper bound, Prometheus style."""
+        histogram, total = {}, 0
+        for bound, count in zip([*map(str, WAIT_BUCKETS_MS), "+Inf"], self.wait_counts):
+            total += count
+            histogram[bound] = total
+        return histogram
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """The default async engine pool, timing every checkout.
+
+    The wait covers queueing for a free connection, opening a new one and
+    the pre-ping, i.e. everything a request spends before its first query.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            raise
+        except Exception:
+            self.stats.errors += 1
+            raise
+        self.stats.observe((time.perf_counter() - start) * 1000)
+        return connection
+
+
+def pool_status(name: str, engine: AsyncEngine) -> dict[str, Any]:
+    """Live state and counters of an engine created with InstrumentedQueuePool."""
+    pool = engine.pool
+    stats = pool.stats
+    return {
+        "engine": name,
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        # overflow() counts from -pool_size: it is open connections - pool_size
+        "connections": pool.size() + pool.overflow(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": stats.checkouts,
+        "checkout_timeouts": stats.timeouts,
+        "checkout_errors": stats.errors,
+        "wait_ms_sum": stats.wait_ms_sum,
+        "wait_ms_histogram": stats.wait_histogram(),
+    }
+
+
+def pool_metrics(engines: list[tuple[str, AsyncEngine]]) -> list[str]:
+    """pool_status() of each engine as Prometheus exposition lines."""
+    connections = Gauge("db_pool_connections", "Open pool connections.", ("engine",))
+    checked_out = Gauge("db_pool_checked_out", "Connections in use.", ("engine",))
+    checkouts = Counter("db_pool_checkouts_total", "Successful checkouts.", ("engine",))
+    timeouts = Counter(
+        "db_pool_checkout_timeouts_total", "Checkouts that hit the pool timeout.", ("engine",)
+    )
+    errors = Counter("db_pool_checkout_errors_total", "Checkouts that failed.", ("engine",))
+    wait = Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent getting a connection from the pool.",
+        ("engine",),
+        buckets=[bound / 1000 for bound in WAIT_BUCKETS_MS],
+    )
+    for name, engine in engines:
+        status = pool_status(name, engine)
+        stats = engine.pool.stats
+        connections.inc((name,), status["connections"])
+        checked_out.inc((name,), status["checked_out"])
+        checkouts.inc((name,), stats.checkouts)
+        timeouts.inc((name,), stats.timeouts)
+        errors.inc((name,), stats.errors)
+        wait.values[(name,)] = [*stats.wait_counts, stats.wait_ms_sum / 1000]
+    metrics = (connections, checked_out, checkouts, timeouts, errors, wait)
+    return [line for metric in metrics for line in metric.render()]
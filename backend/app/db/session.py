@@ -1,27 +1,171 @@
-from typing import AsyncGenerator
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 
-from sqlalchemy.orm import sessionmaker
-from sqlmodel import create_engine
-from sqlalchemy.ext.asyncio import create_async_engine
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.cache import recent_writers
 from app.core.config import get_settings
+from app.db.instrumentation import instrument_engine
+from app.db.pool import InstrumentedQueuePool
 
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
-    pool_size=5,  # Max number of permanent connections
-    max_overflow=10,  # Max number of connections above pool_size
-    pool_timeout=30,  # Seconds to wait for connection from pool
-    pool_recycle=3600,  # Recycle connections after 1 hour (prevents stale connections)
+
+def _statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def _create_engine(url: str, **connect_args) -> AsyncEngine:
+    if settings.DATABASE_PGBOUNCER:
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=_statement_name,
+        )
+    else:
+        connect_args.update(
+            statement_cache_size=settings.DATABASE_STATEMENT_CACHE_SIZE,
+            prepared_statement_cache_size=settings.DATABASE_STATEMENT_CACHE_SIZE,
+        )
+    async_engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        connect_args=connect_args,
+    )
+    instrument_engine(async_engine)
+    return async_engine
+
+
+engine = _create_engine(settings.DATABASE_URL)
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping any that recently failed.
+
+    A replica that cannot hand out a connection (down, or failing the
+    pre-ping) is skipped for `retry_after` seconds, then tried again.
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        retry_after: float,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.engines = engines
+        self.retry_after = retry_after
+        self.timer = timer
+        self._down_until = [0.0] * len(engines)
+        self._next = 0
+
+    def available(self) -> list[AsyncEngine]:
+        """Healthy replicas, starting with the next one in the rotation."""
+        if not self.engines:
+            return []
+        now, count, start = self.timer(), len(self.engines), self._next
+        self._next = (start + 1) % count
+        indexes = [index % count for index in range(start, start + count)]
+        return [self.engines[i] for i in indexes if self._down_until[i] <= now]
+
+    def mark_down(self, replica: AsyncEngine) -> None:
+        index = self.engines.index(replica)
+        self._down_until[index] = self.timer() + self.retry_after
+        logger.warning(
+            "Read replica %s unavailable, skipping it for %ss",
+            replica.url.render_as_string(hide_password=True),
+            self.retry_after,
+        )
+
+    async def connect(self) -> AsyncConnection | None:
+        """A connection to a healthy replica, or None to use the primary."""
+        for replica in self.available():
+            try:
+                return await replica.connect()
+            except (OSError, TimeoutError, DBAPIError):
+                self.mark_down(replica)
+        return None
+
+
+replicas = ReplicaSet(
+    [
+        _create_engine(url.strip(), timeout=settings.DATABASE_READ_CONNECT_TIMEOUT)
+        for url in settings.DATABASE_READ_URLS.split(",")
+        if url.strip()
+    ],
+    retry_after=settings.DATABASE_READ_RETRY_SECONDS,
 )
 
 
+def engines() -> list[tuple[str, AsyncEngine]]:
+    """Every engine with a display name: the primary, then each replica."""
+    return [("primary", engine)] + [
+        (replica.url.render_as_string(hide_password=True), replica) for replica in replicas.engines
+    ]
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection, e.g. on shutdown."""
+    await asyncio.gather(*(async_engine.dispose() for _, async_engine in engines()))
+
+
+@event.listens_for(Session, "after_commit")
+def _record_commit(session: Session) -> None:
+    session.info["committed"] = True
+
+
 # Dependency to get async session
-async def get_async_session() -> AsyncSession:
-    async with AsyncSession(engine) as session:
+async def get_async_session(request: Request) -> AsyncSession:
+    # Objects stay readable after commit without another round trip
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    # Clients are told apart by their credentials; see get_read_session
+    client = request.headers.get("Authorization")
+    if client and session.info.get("committed"):
+        recent_writers.set(client, True)
+
+
+@asynccontextmanager
+async def read_session(primary: bool = False) -> AsyncIterator[AsyncSession]:
+    """Session for read-only work: on a healthy replica when there is one,
+    otherwise (or with `primary`) on the primary."""
+    connection = None if primary else await replicas.connect()
+    if connection is None:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+        return
+    try:
+        async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+            yield session
+    finally:
+        await connection.close()
+
+
+def wrote_recently(request: Request) -> bool:
+    """Whether the client committed a write in the last READ_YOUR_WRITES_SECONDS."""
+    client = request.headers.get("Authorization")
+    return client is not None and recent_writers.get(client) is not None
+
+
+# Dependency to get a read-only session
+async def get_read_session(request: Request) -> AsyncSession:
+    # A client that wrote recently reads from the primary, so replica lag
+    # never hides its own changes
+    async with read_session(wrote_recently(request)) as session:
         yield session
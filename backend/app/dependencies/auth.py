@@ -1,3 +1,4 @@
+import time
 import uuid
 from typing import Annotated
 
@@ -7,12 +8,13 @@ from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 
+from app.core.cache import token_cache, user_cache
 from app.core.config import get_settings
+from app.core.timing import record_stage
 from app.dependencies.user import UserServiceDep
 from app.models.user import User, UserStatus
 from app.schemas.auth import TokenPayload
 
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/oauth2")
 
 settings = get_settings()
@@ -22,28 +24,49 @@ TokenDep = Annotated[str, Depends(oauth2_scheme)]
 
 
 async def get_current_user(token: TokenDep, user_service: UserServiceDep) -> User:
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-        print(token_data)
-    except (InvalidTokenError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not validate credentials",
-        )
-    user = await user_service.get_user(uuid.UUID(token_data.sub))
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-    if not user.status == UserStatus.ACTIVE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"{user.status.value.capitalize()} user",
-        )
-    return user
+    with record_stage("auth"):
+        token_data = token_cache.get(token)
+        if token_data is None:
+            try:
+                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                token_data = TokenPayload(**payload)
+            except (InvalidTokenError, ValidationError):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Could not validate credentials",
+                )
+            # Never serve a cached token past its expiry
+            ttl = payload["exp"] - time.time() if "exp" in payload else None
+            token_cache.set(token, token_data, ttl=ttl)
+
+        user_id = uuid.UUID(token_data.sub)
+        user = user_cache.get(user_id)
+        if user is None:
+            user = await user_service.get_user(user_id)
+            if not user:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+            # Cache a detached copy so it outlives this request's session
+            user = User.model_validate(user)
+            user_cache.set(user_id, user)
+            # Otherwise the request holds this connection while its read
+            # session takes another: with a small pool (see app.server), every
+            # admitted request can end up waiting for a second one
+            await user_service.release_connection()
+        if not user.status == UserStatus.ACTIVE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{user.status.value.capitalize()} user",
+            )
+        return user
 
 
 CurrentUserDep = Annotated[User, Depends(get_current_user)]
+
+
+async def get_current_superuser(current_user: CurrentUserDep) -> User:
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    return current_user
+
+
+CurrentSuperuserDep = Annotated[User, Depends(get_current_superuser)]
@@ -0,0 +1,38 @@
+from typing import Annotated
+
+from fastapi import Depends, Request, Response
+
+from app.core.response_cache import CachedResponse, response_cache
+from app.db.session import replicas, wrote_recently
+
+
+class RouteCache:
+    """The response cache as used by one request.
+
+    Lookups are counted under the request's route template. With read
+    replicas, a client that wrote recently skips the cache altogether: an
+    entry refilled from a lagging replica after its write could hide the
+    write, which get_read_session otherwise guarantees it sees.
+    """
+
+    def __init__(self, request: Request):
+        self.request = request
+        self.route = request.scope["route"].path
+        self.enabled = response_cache.enabled and not (replicas.engines and wrote_recently(request))
+
+    async def get(self, scope: str, key: str) -> Response | None:
+        """The cached response (or a 304) if there is one."""
+        if not self.enabled:
+            return None
+        entry = await response_cache.get(scope, key, route=self.route)
+        return entry.respond(self.request) if entry is not None else None
+
+    async def store(self, scope: str, key: str, etag: str, body: bytes) -> Response:
+        """Cache a freshly rendered JSON body and respond with it."""
+        entry = CachedResponse(etag, body)
+        if self.enabled:
+            await response_cache.set(scope, key, entry)
+        return entry.respond(self.request)
+
+
+RouteCacheDep = Annotated[RouteCache, Depends(RouteCache)]
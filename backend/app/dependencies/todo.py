@@ -0,0 +1,34 @@
+from typing import Annotated
+
+from fastapi import Depends
+from sqlmodel import Session
+
+from app.db.session import get_async_session, get_read_session
+from app.repositories.todo_repository import TodoRepository
+from app.services.todo_import_service import TodoImportService
+from app.services.todo_service import TodoService
+
+
+def get_todo_service(session: Session = Depends(get_async_session)) -> TodoService:
+    todo_repository = TodoRepository(session)
+    return TodoService(todo_repository)
+
+
+TodoServiceDep = Annotated[TodoService, Depends(get_todo_service)]
+
+
+def get_todo_read_service(session: Session = Depends(get_read_session)) -> TodoService:
+    return TodoService(TodoRepository(session))
+
+
+# For read-only endpoints; may be served by a replica
+TodoReadServiceDep = Annotated[TodoService, Depends(get_todo_read_service)]
+
+
+def get_todo_import_service(
+    session: Session = Depends(get_async_session),
+) -> TodoImportService:
+    return TodoImportService(TodoRepository(session))
+
+
+TodoImportServiceDep = Annotated[TodoImportService, Depends(get_todo_import_service)]
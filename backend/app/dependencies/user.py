@@ -3,7 +3,7 @@ from typing import Annotated
 from fastapi import Depends
 from sqlmodel import Session
 
-from app.db.session import get_async_session
+from app.db.session import get_async_session, get_read_session
 from app.repositories.user_repository import UserRepository
 from app.services.user_service import UserService
 
@@ -14,3 +14,11 @@ def get_user_service(session: Session = Depends(get_async_session)) -> UserServi
 
 
 UserServiceDep = Annotated[UserService, Depends(get_user_service)]
+
+
+def get_user_read_service(session: Session = Depends(get_read_session)) -> UserService:
+    return UserService(UserRepository(session))
+
+
+# For read-only endpoints; may be served by a replica
+UserReadServiceDep = Annotated[UserService, Depends(get_user_read_service)]
@@ -1,12 +1,21 @@
 """Main FastAPI application module."""
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.core.change_feed import change_feed
 from app.core.config import get_settings
-from app.routers import auth, todos, users
-
+from app.core.metrics import registry
+from app.core.security import password_executor
+from app.db.pool import pool_metrics
+from app.db.session import dispose_engines, engines
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.metrics import MetricsMiddleware, TimedJSONResponse
+from app.routers import auth, internal, todos, users
+from app.startup import database_reachable, state, warm_up
 
 settings = get_settings()
 
@@ -14,8 +23,17 @@ settings = get_settings()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Starting up...")
+    print(
+        f"Database pool per engine: {settings.DATABASE_POOL_SIZE} + "
+        f"{settings.DATABASE_MAX_OVERFLOW} overflow"
+    )
+    # Requests are only accepted once this returns
+    await warm_up()
     yield
     print("Shutting down...")
+    await change_feed.stop()
+    await dispose_engines()
+    password_executor.shutdown()
 
 
 app = FastAPI(
@@ -24,10 +42,13 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan,
     openapi_url="/openapi.json",
+    default_response_class=TimedJSONResponse,
 )
 
 
 # Middleware
+# Innermost, so 503s it sends still get CORS headers and are counted in metrics
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -37,12 +58,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it is outermost and its timings include the other middleware
+app.add_middleware(MetricsMiddleware)
 
 
 # Routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(todos.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
+app.include_router(internal.router, prefix="/api/v1")
+
+registry.add_collector(lambda: pool_metrics(engines()))
 
 
 @app.get("/")
@@ -50,6 +76,27 @@ async def root():
     return {"message": "Todo API is running!", "version": "1.0.0", "docs": "/docs"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Scraped per worker; label the target by instance to aggregate workers
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def ready(response: Response):
+    # Liveness stays on /health; this is for load balancers and orchestrators
+    database = await database_reachable()
+    is_ready = state.finished and database
+    if not is_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ok" if is_ready else "unavailable",
+        "warmup": "finished" if state.finished else "pending",
+        "warmup_failed": state.failed,
+        "database": "ok" if database else "unavailable",
+    }
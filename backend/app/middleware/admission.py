@@ -0,0 +1,212 @@
+"""Admission control: shed load before it piles up on the connection pool.
+
+Without it, a spike past what the pool can serve makes requests queue inside
+SQLAlchemy for up to DATABASE_POOL_TIMEOUT (30s) and then fail, so overload
+shows up as a wall of half-minute timeouts. AdmissionMiddleware instead lets
+at most ADMISSION_MAX_CONCURRENCY database-using requests run at once per
+worker, queues up to ADMISSION_MAX_QUEUE more for at most
+ADMISSION_QUEUE_TIMEOUT seconds, and answers the rest at once with 503 and
+Retry-After.
+
+Queued requests are admitted by priority (see `route_priority`), so login
+and readiness checks get through ahead of listings and exports. When the
+queue is full, a request may take the place of a lower-priority one, which
+is turned away instead.
+
+The default limit is what the pool can serve at once. Where the CPU saturates
+first, a lower one keeps admitted requests fast; benchmarks/overload.py shows
+the effect of a setting.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import Counter, Gauge, Histogram, registry
+
+API_PREFIX = "/api/v1"
+
+settings = get_settings()
+
+
+class Priority(IntEnum):
+    """Lower values are admitted first."""
+
+    CRITICAL = 0
+    NORMAL = 1
+    LOW = 2
+
+
+# (method or None for any, path) -> priority, None for exempt; paths match
+# exactly or as a prefix ending in "/". Checked in order, first match wins
+ROUTE_PRIORITIES: list[tuple[str | None, str, Priority | None]] = [
+    # Long-lived, and holds no connection while streaming
+    ("GET", f"{API_PREFIX}/todos/events", None),
+    (None, "/health/ready", Priority.CRITICAL),
+    (None, f"{API_PREFIX}/auth/", Priority.CRITICAL),
+    ("GET", f"{API_PREFIX}/todos", Priority.LOW),
+    ("GET", f"{API_PREFIX}/todos/export", Priority.LOW),
+    ("POST", f"{API_PREFIX}/todos:import", Priority.LOW),
+    ("GET", f"{API_PREFIX}/users", Priority.LOW),
+]
+
+
+def route_priority(method: str, path: str) -> Priority | None:
+    """The priority of a request, or None if it bypasses admission control:
+    it never touches the database (docs, metrics, liveness) or is exempt."""
+    for rule_method, rule_path, priority in ROUTE_PRIORITIES:
+        if rule_method not in (None, method):
+            continue
+        if path == rule_path or (rule_path.endswith("/") and path.startswith(rule_path)):
+            return priority
+    if path.startswith(f"{API_PREFIX}/") and method != "OPTIONS":
+        return Priority.NORMAL
+    return None
+
+
+class OverloadedError(Exception):
+    """Raised when a request is not admitted; `reason` labels the metric."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+admission_requests = Counter(
+    "admission_requests_total",
+    "Requests by priority and admission outcome (admitted, queue_full, timeout, shed).",
+    ("priority", "outcome"),
+)
+admission_wait = Histogram(
+    "admission_wait_seconds", "Time admitted requests spent queued.", ("priority",)
+)
+registry.register(admission_requests)
+registry.register(admission_wait)
+
+
+class AdmissionController:
+    """A priority semaphore with a bounded queue and a wait deadline.
+
+    Used from a single event loop, so it needs no locking. `limit` of zero
+    or less disables it: every request is admitted at once.
+    """
+
+    def __init__(self, limit: int, max_queue: int, queue_timeout: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        # Heap of (priority, arrival order, future); cancelled entries are
+        # skipped when popped
+        self._queue: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return sum(not future.done() for _, _, future in self._queue)
+
+    def _shed_lowest(self, priority: Priority) -> bool:
+        """Turn away the newest waiter of the lowest priority below `priority`."""
+        waiting = [entry for entry in self._queue if not entry[2].done()]
+        if not waiting:
+            return False
+        victim = max(waiting, key=lambda entry: (entry[0], entry[1]))
+        if victim[0] <= priority:
+            return False
+        victim[2].set_exception(OverloadedError("shed"))
+        return True
+
+    async def acquire(self, priority: Priority) -> None:
+        """Wait for a slot; raises OverloadedError if none frees up in time."""
+        if self.limit <= 0 or (self.active < self.limit and not self.queued):
+            self.active += 1
+            return
+        if self.queued >= self.max_queue and not self._shed_lowest(priority):
+            raise OverloadedError("queue_full")
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._order), future))
+        try:
+            # The slot is handed over by release(), already counted in active
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except BaseException as exc:
+            # Timed out, shed, or the client went away
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # Admitted just as the wait ended: give the slot back
+                self.release()
+            else:
+                future.cancel()
+            if isinstance(exc, TimeoutError):
+                raise OverloadedError("timeout") from None
+            raise
+
+    def release(self) -> None:
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def metrics(self) -> list[str]:
+        active = Gauge("admission_active_requests", "Requests holding an admission slot.")
+        queued = Gauge("admission_queued_requests", "Requests waiting for a slot.")
+        active.set(self.active)
+        queued.set(self.queued)
+        return active.render() + queued.render()
+
+
+admission = AdmissionController(
+    settings.ADMISSION_MAX_CONCURRENCY
+    or settings.DATABASE_POOL_SIZE + settings.DATABASE_MAX_OVERFLOW,
+    settings.ADMISSION_MAX_QUEUE,
+    settings.ADMISSION_QUEUE_TIMEOUT,
+)
+registry.add_collector(admission.metrics)
+
+
+class AdmissionMiddleware:
+    """Run each database-using request only once `admission` lets it in.
+
+    The slot is held until the response body is sent, streamed exports
+    included, since that is how long the request can hold a connection.
+    Plain ASGI like MetricsMiddleware, which wraps it so rejections are
+    counted and timed too.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.ADMISSION_CONTROL:
+            await self.app(scope, receive, send)
+            return
+        priority = route_priority(scope["method"], scope["path"])
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.controller.acquire(priority)
+        except OverloadedError as exc:
+            admission_requests.inc((priority.name, exc.reason))
+            response = JSONResponse(
+                {"detail": "Server is overloaded, try again shortly"},
+                status_code=503,
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+            )
+            await response(scope, receive, send)
+            return
+        admission_requests.inc((priority.name, "admitted"))
+        admission_wait.observe(time.perf_counter() - start, (priority.name,))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
@@ -0,0 +1,155 @@
+"""Request metrics and the Server-Timing header."""
+
+import functools
+import inspect
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import (
+    http_request_duration,
+    http_request_queries,
+    http_requests,
+    http_requests_in_flight,
+)
+from app.core.timing import RequestTimings, current_timings, record_stage
+from app.db.instrumentation import track_queries
+
+# Route label for requests no route matched, so 404 scans stay one series
+UNMATCHED_ROUTE = "<unmatched>"
+
+settings = get_settings()
+
+
+class MetricsMiddleware:
+    """Count requests per route template and status, time them, and count
+    their SQL statements (flagging repeated ones, see app.db.instrumentation).
+
+    Plain ASGI rather than BaseHTTPMiddleware: it adds no task or queue per
+    request and leaves streaming responses alone. The Server-Timing total
+    stops at the response headers; the latency histogram covers the body.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"server-timing", timings.server_timing().encode("latin-1")),
+                ]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            with track_queries(settings.SQL_REPEATED_QUERY_LIMIT) as queries:
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            http_requests_in_flight.dec()
+            current_timings.reset(token)
+            # The router stores the matched route in the (shared) scope
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            http_requests.inc((method, route, str(status_code)))
+            http_request_duration.observe(time.perf_counter() - timings.start, (method, route))
+            http_request_queries.observe(queries.count, (method, route))
+
+
+def _mark_endpoint_end() -> None:
+    timings = current_timings.get()
+    if timings is not None:
+        timings.endpoint_end = time.perf_counter()
+
+
+def _timed_endpoint(call: Callable) -> Callable:
+    if inspect.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def timed(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _mark_endpoint_end()
+
+    else:
+
+        @functools.wraps(call)
+        def timed(*args, **kwargs):
+            try:
+                return call(*args, **kwargs)
+            finally:
+                _mark_endpoint_end()
+
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """Route that records when its path operation returns.
+
+    Everything between that point and the response being built (response
+    model validation, then JSON rendering in TimedJSONResponse) is the
+    "serialize" stage.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The request handler calls dependant.call; wrapping it leaves the
+        # signature FastAPI derived parameters and OpenAPI from untouched
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse closing the "serialize" stage once the body is rendered."""
+
+    def render(self, content: Any) -> bytes:
+        body = super().render(content)
+        timings = current_timings.get()
+        if timings is not None and timings.endpoint_end is not None:
+            timings.add("serialize", time.perf_counter() - timings.endpoint_end)
+            timings.endpoint_end = None
+        return body
+
+
+def _orjson_default(value: Any) -> Any:
+    # orjson only knows uuid.UUID itself, not asyncpg's subclass of it
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class TimedORJSONResponse(ORJSONResponse):
+    """Response for the ORM-free list endpoints, rendered with orjson.
+
+    Path operations return it with plain data (dicts and lists of Core row
+    values: UUIDs, datetimes, enums), which skips response_model validation
+    and jsonable_encoder; the response_model still documents the body.
+    Datetimes render as pydantic renders them, "Z" for UTC. It is built
+    inside the path operation, so it times the "serialize" stage itself.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with record_stage("serialize"):
+            return orjson.dumps(
+                content,
+                default=_orjson_default,
+                option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+            )
@@ -2,9 +2,11 @@ import uuid
 from datetime import datetime
 from enum import Enum
 
-from sqlmodel import Field, SQLModel
+from pydantic import field_validator
+from sqlalchemy import BigInteger, CheckConstraint, DateTime, SmallInteger, text
+from sqlmodel import Field, Index, SQLModel
 
-from app.schemas.mixin import TimeStampMixin
+from app.schemas.mixin import TimeStampMixin, naive_utc, utcnow_aware
 
 
 class Priority(str, Enum):
@@ -26,8 +28,98 @@ class TodoBase(SQLModel):
     priority: Priority | None = Field(default=None, nullable=True)
     due_date: datetime | None = Field(default=None, nullable=True)
 
+    # due_date is stored without a time zone, as UTC
+    _due_date_utc = field_validator("due_date")(naive_utc)
+
 
 class Todo(TodoBase, TimeStampMixin, table=True):
-    id: uuid.UUID = Field(
-        default_factory=uuid.uuid4, primary_key=True, index=True, nullable=False
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id) backwards, newest first
+        Index("ix_todo_created_at_id", "created_at", "id"),
+        # The same order within one value of the leading column, for list
+        # filters and per-user export; user_id's also serves the foreign key
+        Index("ix_todo_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_todo_priority_created_at_id", "priority", "created_at", "id"),
+        Index("ix_todo_status_created_at_id", "status", "created_at", "id"),
+        # Substring title search (ILIKE '%q%'), needs the pg_trgm extension
+        Index(
+            "ix_todo_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        # Word search; queries must use this exact expression to hit the index
+        Index(
+            "ix_todo_title_fts",
+            text("to_tsvector('english', title)"),
+            postgresql_using="gin",
+        ),
+        # Candidates for archival, oldest first; see TodoArchive
+        Index(
+            "ix_todo_completed_updated_at",
+            "updated_at",
+            postgresql_where=text("status = 'COMPLETED'"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, nullable=False)
+    user_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE", nullable=False)
+
+
+class TodoArchive(TodoBase, TimeStampMixin, table=True):
+    """Completed todos moved out of `todo` once they are old enough, so the
+    hot table and its indexes only hold live todos. Same columns, plus when
+    the row was archived; see app.commands.archive_todos.
+
+    Counted in todo_stats by the same triggers as `todo`. Archived todos are
+    read-only: the API lists and gets them only when asked to.
+    """
+
+    __tablename__ = "todo_archive"
+    __table_args__ = (
+        Index("ix_todo_archive_created_at_id", "created_at", "id"),
+        # Lets the planner skip the archive in reads that filter out
+        # completed todos, even through the todo + archive UNION ALL
+        CheckConstraint("status = 'COMPLETED'", name="completed"),
+    )
+
+    id: uuid.UUID = Field(primary_key=True, nullable=False)
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", ondelete="CASCADE", index=True, nullable=False
+    )
+    archived_at: datetime = Field(
+        sa_type=DateTime(timezone=True),
+        default_factory=utcnow_aware,
+        nullable=False,
+        sa_column_kwargs={"server_default": text("now()")},
     )
+
+
+class TodoStatsCounter(SQLModel, table=True):
+    """Per-user todo counters, kept current by triggers on the todo table."""
+
+    __tablename__ = "todo_stats"
+
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", ondelete="CASCADE", primary_key=True, nullable=False
+    )
+    total: int = Field(default=0, nullable=False)
+    completed: int = Field(default=0, nullable=False)
+    low: int = Field(default=0, nullable=False)
+    medium: int = Field(default=0, nullable=False)
+    high: int = Field(default=0, nullable=False)
+
+
+class TodoListVersion(SQLModel, table=True):
+    """Watermark of every todo list: bumped by a trigger on each statement
+    that writes todo or todo_archive, and read as the sum over all slots.
+
+    Counted in a few slots, picked by the writer's backend, so concurrent
+    writers do not queue on one row lock until they commit. Rows are never
+    deleted and versions only grow, so the sum never repeats.
+    """
+
+    __tablename__ = "todo_list_version"
+
+    slot: int = Field(sa_type=SmallInteger, primary_key=True, nullable=False)
+    version: int = Field(default=0, sa_type=BigInteger, nullable=False)
@@ -2,9 +2,9 @@ import uuid
 from enum import Enum
 
 from pydantic import EmailStr
+from sqlalchemy import String
 from sqlmodel import Field, SQLModel
 
-
 from app.schemas.mixin import TimeStampMixin
 
 
@@ -18,12 +18,22 @@ class UserBase(SQLModel):
     email: EmailStr | None = Field(
         default=None, max_length=255, unique=True, index=True, nullable=True
     )
-    username: str = Field(max_length=64, unique=True, index=True, nullable=False)
+    # Compared byte by byte, so prefix filters can use the index under any
+    # database collation; see UserRepository.get_users
+    username: str = Field(
+        max_length=64,
+        sa_type=String(length=64, collation="C"),
+        unique=True,
+        index=True,
+        nullable=False,
+    )
     status: UserStatus = Field(default=UserStatus.ACTIVE, nullable=False)
 
 
 class User(UserBase, TimeStampMixin, table=True):
-    id: uuid.UUID = Field(
-        default_factory=uuid.uuid4, primary_key=True, index=True, nullable=False
-    )
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, nullable=False)
     hashed_password: str = Field(max_length=255, nullable=False)
+    # Admins may export every user's todos; not settable through the API
+    is_superuser: bool = Field(
+        default=False, nullable=False, sa_column_kwargs={"server_default": "false"}
+    )
@@ -1,6 +1,566 @@
-from app.models.todo import Todo, Priority
+import uuid
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import (
+    ARRAY,
+    Boolean,
+    Column,
+    DateTime,
+    FromClause,
+    MetaData,
+    Row,
+    Table,
+    Text,
+    any_,
+    case,
+    cast,
+    column,
+    delete,
+    func,
+    literal,
+    literal_column,
+    tuple_,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, select
+
+from app.models.todo import (
+    Priority,
+    Todo,
+    TodoArchive,
+    TodoBase,
+    TodoListVersion,
+    TodoStatsCounter,
+    TodoStatus,
+)
+from app.models.user import User
+from app.schemas.todo import SearchMode, TodoCreate, TodoRead, TodoStatsDrift, TodoUpdate
+
+_TODO_COLUMNS = tuple(Todo.__table__.c.keys())
+
+
+def _todo_source(include_archived: bool = False) -> FromClause:
+    """What todo reads select from: the todo table, or with archived todos,
+    todo and todo_archive as one `todo_all` subquery with todo's columns.
+
+    PostgreSQL pushes filters down into both halves of the UNION ALL and
+    merges their ordered index scans, so each table uses its own indexes.
+    """
+    if not include_archived:
+        return Todo.__table__
+    archive = TodoArchive.__table__.c
+    return union_all(
+        select(*Todo.__table__.c),
+        select(*(archive[name] for name in _TODO_COLUMNS)),
+    ).subquery("todo_all")
+
+
+def _title_tsvector(source: FromClause) -> Any:
+    # Must match the ix_todo_title_fts expression exactly for the index to be used
+    return func.to_tsvector(literal_column("'english'"), source.c.title)
+
+
+def _counter_filters(source: FromClause) -> dict[str, Any]:
+    # Same definitions as the todo_stats_apply() trigger function
+    return {
+        "completed": source.c.status == TodoStatus.COMPLETED,
+        "low": source.c.priority == Priority.LOW,
+        "medium": source.c.priority == Priority.MEDIUM,
+        "high": source.c.priority == Priority.HIGH,
+    }
+
+
+_COUNTER_FIELDS = ("total", *_counter_filters(Todo.__table__))
+_UPDATABLE_FIELDS = tuple(TodoUpdate.model_fields)
+IMPORT_COLUMNS = tuple(TodoBase.model_fields)
+
+
+def _recount(user_id: uuid.UUID | None = None) -> Any:
+    """Per user (or for `user_id` only): user_id, then the counters recounted
+    from todo and todo_archive, then the stored ones (missing counts as 0)."""
+    source = _todo_source(include_archived=True)
+    actual = select(
+        source.c.user_id,
+        func.count().label("total"),
+        *(
+            func.count().filter(clause).label(field)
+            for field, clause in _counter_filters(source).items()
+        ),
+    )
+    stored = select(TodoStatsCounter)
+    if user_id is not None:
+        actual = actual.where(source.c.user_id == user_id)
+        stored = stored.where(TodoStatsCounter.user_id == user_id)
+    actual = actual.group_by(source.c.user_id).subquery()
+    stored = stored.subquery()
+    return select(
+        func.coalesce(actual.c.user_id, stored.c.user_id),
+        *(func.coalesce(actual.c[field], 0) for field in _COUNTER_FIELDS),
+        *(func.coalesce(stored.c[field], 0) for field in _COUNTER_FIELDS),
+    ).select_from(actual.join(stored, stored.c.user_id == actual.c.user_id, full=True))
+
+
+def _drifted(counts: Sequence[int]) -> bool:
+    """Whether a _recount row's recounted and stored counters differ."""
+    width = len(_COUNTER_FIELDS)
+    return tuple(counts[:width]) != tuple(counts[width:])
+
+
+# Bulk imports are COPYed here first, then merged into todo with one INSERT.
+# Enums are staged as text and cast on merge; no indexes or triggers.
+_import_staging = Table(
+    "todo_import",
+    MetaData(),
+    Column("title", Text, nullable=False),
+    Column("description", Text, nullable=False),
+    Column("status", Text, nullable=False),
+    Column("priority", Text),
+    Column("due_date", DateTime),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def _read_columns(viewer_id: uuid.UUID, source: FromClause) -> list[Any]:
+    """TodoRead's columns, in order, as list queries return them.
+
+    Descriptions of todos `viewer_id` does not own come back as NULL, so
+    other users' (unbounded) descriptions are never read out or sent.
+    """
+    return [
+        case((source.c.user_id == viewer_id, source.c.description)).label(field)
+        if field == "description"
+        else source.c[field]
+        for field in TodoRead.model_fields
+    ]
+
+
+def _like_pattern(search: str) -> str:
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
 
 
 class TodoRepository:
-    # TODO: Implement the todo repository methods
-    pass
+    def __init__(self, session: Session):
+        self.session = session
+
+    @staticmethod
+    def _filters(
+        source: FromClause,
+        priority: Priority | None = None,
+        completed: bool | None = None,
+        search: str | None = None,
+        search_mode: SearchMode = SearchMode.SUBSTRING,
+    ) -> list[Any]:
+        clauses: list[Any] = []
+        if priority is not None:
+            clauses.append(source.c.priority == priority)
+        if completed is True:
+            clauses.append(source.c.status == TodoStatus.COMPLETED)
+        elif completed is False:
+            clauses.append(source.c.status != TodoStatus.COMPLETED)
+        if search and search_mode == SearchMode.WORDS:
+            query = func.websearch_to_tsquery(literal_column("'english'"), search)
+            clauses.append(_title_tsvector(source).op("@@")(query))
+        elif search:
+            # Served by the ix_todo_title_trgm GIN index instead of a seq scan
+            clauses.append(source.c.title.ilike(_like_pattern(search), escape="\\"))
+        return clauses
+
+    @staticmethod
+    def _rank(source: FromClause, search: str, search_mode: SearchMode) -> Any:
+        if search_mode == SearchMode.WORDS:
+            query = func.websearch_to_tsquery(literal_column("'english'"), search)
+            return func.ts_rank(_title_tsvector(source), query)
+        return func.word_similarity(search, source.c.title)
+
+    async def get_todo(self, todo_id: uuid.UUID, *, for_update: bool = False) -> Todo | None:
+        # for_update holds a row lock until commit, for check-then-write flows
+        todo = await self.session.get(Todo, todo_id, with_for_update=for_update)
+        return todo
+
+    async def get_archived_todo(self, todo_id: uuid.UUID) -> TodoArchive | None:
+        todo = await self.session.get(TodoArchive, todo_id)
+        return todo
+
+    async def get_todos(
+        self,
+        *,
+        viewer_id: uuid.UUID,
+        limit: int,
+        offset: int = 0,
+        after: tuple[datetime, uuid.UUID] | None = None,
+        priority: Priority | None = None,
+        completed: bool | None = None,
+        include_archived: bool = False,
+    ) -> list[Row[Any]]:
+        """List todos newest first, as rows of TodoRead's columns as seen by
+        `viewer_id` (other users' descriptions are NULL).
+
+        With `after`, seeks past the given `(created_at, id)` key using
+        `ix_todo_created_at_id` instead of skipping `offset` rows, so every
+        page costs the same regardless of depth. Rows are not hydrated into
+        ORM objects: the list endpoint serializes them as they are.
+        """
+        source = _todo_source(include_archived)
+        statement = select(*_read_columns(viewer_id, source)).where(
+            *self._filters(source, priority, completed)
+        )
+        if after is not None:
+            statement = statement.where(tuple_(source.c.created_at, source.c.id) < tuple_(*after))
+        statement = (
+            statement.order_by(source.c.created_at.desc(), source.c.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await self.session.exec(statement)
+        return list(result.all())
+
+    async def search_todos(
+        self,
+        search: str,
+        *,
+        viewer_id: uuid.UUID,
+        limit: int,
+        offset: int = 0,
+        after: tuple[float, datetime, uuid.UUID] | None = None,
+        search_mode: SearchMode = SearchMode.SUBSTRING,
+        priority: Priority | None = None,
+        completed: bool | None = None,
+        include_archived: bool = False,
+    ) -> list[Row[Any]]:
+        """Search todo titles, most relevant first.
+
+        Matching rows come from the title GIN indexes; only those are ranked
+        and sorted. Returns rows like `get_todos` plus a trailing `rank`
+        column, so callers can build a `(rank, created_at, id)` keyset
+        cursor, which `after` seeks past. The archive has no title indexes:
+        searching it with `include_archived` scans it.
+        """
+        source = _todo_source(include_archived)
+        rank = self._rank(source, search, search_mode)
+        statement = select(*_read_columns(viewer_id, source), rank.label("rank")).where(
+            *self._filters(source, priority, completed, search, search_mode)
+        )
+        if after is not None:
+            statement = statement.where(
+                tuple_(rank, source.c.created_at, source.c.id) < tuple_(*after)
+            )
+        statement = (
+            statement.order_by(rank.desc(), source.c.created_at.desc(), source.c.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await self.session.exec(statement)
+        return list(result.all())
+
+    async def stream_todos(
+        self, *, user_id: uuid.UUID | None = None, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        """Yield todos in batches of plain rows from a server-side cursor.
+
+        Rows are fetched `batch_size` at a time and never hydrated into ORM
+        objects, so memory stays flat however many rows match. Archived todos
+        are included: an export is the whole history.
+        """
+        source = _todo_source(include_archived=True)
+        statement = select(*source.c)
+        if user_id is not None:
+            statement = statement.where(source.c.user_id == user_id)
+        statement = statement.order_by(source.c.created_at, source.c.id).execution_options(
+            yield_per=batch_size
+        )
+        result = await self.session.stream(statement)
+        async for partition in result.partitions():
+            yield partition
+
+    async def count_todos(
+        self,
+        *,
+        priority: Priority | None = None,
+        completed: bool | None = None,
+        search: str | None = None,
+        search_mode: SearchMode = SearchMode.SUBSTRING,
+        include_archived: bool = False,
+    ) -> int:
+        source = _todo_source(include_archived)
+        statement = (
+            select(func.count())
+            .select_from(source)
+            .where(*self._filters(source, priority, completed, search, search_mode))
+        )
+        result = await self.session.exec(statement)
+        return result.one()
+
+    async def create_todo(self, user_id: uuid.UUID, todo_in: TodoCreate) -> Todo:
+        """Insert the todo with one INSERT ... RETURNING."""
+        row = Todo(**todo_in.model_dump(), user_id=user_id).model_dump()
+        result = await self.session.exec(insert(Todo).values(row).returning(Todo))
+        todo = result.scalars().one()
+        await self.session.commit()
+        return todo
+
+    async def _update_owned(
+        self, todo_id: uuid.UUID, user_id: uuid.UUID, values: dict[str, Any]
+    ) -> Todo | None:
+        statement = (
+            update(Todo)
+            .where(Todo.id == todo_id, Todo.user_id == user_id)
+            .values(values)
+            .returning(Todo)
+            # Refresh the todo if the session already holds it (If-Match)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await self.session.exec(statement)
+        todo = result.scalars().one_or_none()
+        await self.session.commit()
+        return todo
+
+    async def update_todo(
+        self, todo_id: uuid.UUID, user_id: uuid.UUID, todo_in: TodoUpdate
+    ) -> Todo | None:
+        """Apply the fields set in `todo_in` to the todo if `user_id` owns it,
+        with one UPDATE ... RETURNING; None if no such todo was updated."""
+        return await self._update_owned(todo_id, user_id, todo_in.model_dump(exclude_unset=True))
+
+    async def toggle_completed(self, todo_id: uuid.UUID, user_id: uuid.UUID) -> Todo | None:
+        """Flip the todo between COMPLETED and NOT_STARTED, like `update_todo`."""
+        status_type = Todo.__table__.c.status.type
+        new_status = case(
+            (
+                Todo.status == TodoStatus.COMPLETED,
+                literal(TodoStatus.NOT_STARTED, status_type),
+            ),
+            else_=literal(TodoStatus.COMPLETED, status_type),
+        )
+        return await self._update_owned(todo_id, user_id, {"status": new_status})
+
+    async def delete_todo(self, todo_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        """Delete the todo if `user_id` owns it; whether a todo was deleted."""
+        return bool(await self.delete_todos(user_id, [todo_id]))
+
+    async def create_todos(self, user_id: uuid.UUID, todos_in: list[TodoCreate]) -> list[Todo]:
+        """Insert all todos with one multi-row INSERT ... RETURNING."""
+        rows = [Todo(**todo_in.model_dump(), user_id=user_id).model_dump() for todo_in in todos_in]
+        result = await self.session.exec(insert(Todo).values(rows).returning(Todo))
+        todos = list(result.scalars().all())
+        await self.session.commit()
+        return todos
+
+    async def update_todos(
+        self, user_id: uuid.UUID, updates: dict[uuid.UUID, dict[str, Any]]
+    ) -> list[Todo]:
+        """Apply per-todo partial updates with one UPDATE ... FROM (VALUES ...).
+
+        Each VALUES row carries a value and a `set_<field>` flag per field, so
+        rows can update different subsets of fields (including setting them to
+        null). Only todos owned by `user_id` are touched; the caller compares
+        the returned ids with the requested ones to report the rest.
+        """
+        columns = [column("id", Todo.__table__.c.id.type)]
+        for field in _UPDATABLE_FIELDS:
+            columns += [
+                column(field, Todo.__table__.c[field].type),
+                column(f"set_{field}", Boolean),
+            ]
+        data = []
+        for todo_id, changes in updates.items():
+            row: list[Any] = [todo_id]
+            for field in _UPDATABLE_FIELDS:
+                row += [changes.get(field), field in changes]
+            data.append(tuple(row))
+        changes_table = values(*columns, name="changes").data(data)
+
+        statement = (
+            update(Todo)
+            .where(Todo.id == changes_table.c.id, Todo.user_id == user_id)
+            .values(
+                {
+                    field: case(
+                        (
+                            changes_table.c[f"set_{field}"],
+                            # A VALUES column that is NULL in every row is typed text
+                            cast(changes_table.c[field], Todo.__table__.c[field].type),
+                        ),
+                        else_=getattr(Todo, field),
+                    )
+                    for field in _UPDATABLE_FIELDS
+                }
+            )
+            .returning(Todo)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.exec(statement)
+        todos = list(result.scalars().all())
+        await self.session.commit()
+        return todos
+
+    async def delete_todos(self, user_id: uuid.UUID, todo_ids: list[uuid.UUID]) -> list[uuid.UUID]:
+        """Delete the given todos owned by `user_id`, returning the deleted ids."""
+        statement = (
+            delete(Todo)
+            .where(col(Todo.id).in_(todo_ids), Todo.user_id == user_id)
+            .returning(Todo.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.exec(statement)
+        deleted = list(result.scalars().all())
+        await self.session.commit()
+        return deleted
+
+    async def get_existing_ids(self, todo_ids: list[uuid.UUID]) -> set[uuid.UUID]:
+        statement = select(Todo.id).where(col(Todo.id).in_(todo_ids))
+        result = await self.session.exec(statement)
+        return set(result.all())
+
+    async def create_import_staging(self) -> None:
+        """Create the staging table, dropped when the transaction ends."""
+        connection = await self.session.connection()
+        await connection.run_sync(_import_staging.create)
+
+    async def copy_to_import_staging(self, records: list[tuple[Any, ...]]) -> None:
+        """COPY `records` (tuples in IMPORT_COLUMNS order) into staging."""
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            _import_staging.name, records=records, columns=IMPORT_COLUMNS
+        )
+
+    async def merge_import_staging(self, user_id: uuid.UUID) -> int:
+        """Move the staged rows into todo for `user_id` and commit."""
+        staged = _import_staging.c
+        now = func.now()
+        statement = insert(Todo).from_select(
+            ["id", "user_id", "created_at", "updated_at", *IMPORT_COLUMNS],
+            select(
+                func.gen_random_uuid(),
+                literal(user_id, Todo.__table__.c.user_id.type),
+                now,
+                now,
+                staged.title,
+                staged.description,
+                cast(staged.status, Todo.__table__.c.status.type),
+                cast(staged.priority, Todo.__table__.c.priority.type),
+                staged.due_date,
+            ),
+        )
+        result = await self.session.exec(statement)
+        await self.session.commit()
+        return result.rowcount
+
+    async def get_stats(self, user_id: uuid.UUID) -> TodoStatsCounter | None:
+        todo_stats = await self.session.get(TodoStatsCounter, user_id)
+        return todo_stats
+
+    async def get_list_watermark(self) -> int:
+        """Version of every todo list, moved by each todo write; see TodoListVersion."""
+        statement = select(func.coalesce(func.sum(TodoListVersion.version), 0))
+        result = await self.session.exec(statement)
+        return int(result.one())
+
+    async def archive_completed(self, cutoff: datetime, limit: int) -> list[uuid.UUID]:
+        """Move up to `limit` todos completed and last updated before `cutoff`
+        from todo to todo_archive, oldest first, and commit.
+
+        One statement deletes and inserts, so the rows are never in both
+        tables or neither. Rows locked by a concurrent write are skipped, not
+        waited for, and the transaction only lasts one batch. Returns the
+        owner of each archived todo.
+        """
+        # Read by todo_notify_changes(), to announce the rows as archived
+        await self.session.exec(select(func.set_config("app.archiving", "on", True)))
+        candidates = (
+            select(Todo.id)
+            .where(Todo.status == TodoStatus.COMPLETED, Todo.updated_at < cutoff)
+            .order_by(col(Todo.updated_at))
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("candidates")
+        )
+        # = ANY(array) probes the primary key; IN (candidates) would be planned
+        # as a hash join over the whole table, as the batch looks large
+        candidate_ids = cast(
+            select(func.array_agg(candidates.c.id)).scalar_subquery(),
+            ARRAY(Todo.__table__.c.id.type),
+        )
+        moved = (
+            delete(Todo)
+            .where(Todo.id == any_(candidate_ids))
+            .returning(*Todo.__table__.c)
+            .cte("moved")
+        )
+        statement = (
+            insert(TodoArchive)
+            .from_select(
+                _TODO_COLUMNS,
+                select(*(moved.c[name] for name in _TODO_COLUMNS)),
+                # archived_at comes from its server default, now()
+                include_defaults=False,
+            )
+            .returning(TodoArchive.user_id)
+        )
+        result = await self.session.exec(statement)
+        owners = list(result.scalars().all())
+        await self.session.commit()
+        return owners
+
+    async def reconcile_stats(self, *, fix: bool = True) -> list[TodoStatsDrift]:
+        """Recount every user's todos, archived ones included, and compare
+        them with `todo_stats`.
+
+        The full recount takes no locks, so writes carry on; it may flag a
+        user whose todos were being written meanwhile. Each flagged user is
+        recounted again in a short transaction holding that user's
+        `todo_stats` row lock, which the counter triggers also take, and
+        only drift confirmed there is reported. With `fix`, those counters
+        are overwritten with the recounted values in the same transaction.
+        """
+        result = await self.session.exec(_recount())
+        suspects = [user_id for user_id, *counts in result.all() if _drifted(counts)]
+        await self.session.rollback()
+
+        drift: list[TodoStatsDrift] = []
+        for user_id in suspects:
+            drift += await self._reconcile_user(user_id, fix)
+        return drift
+
+    async def _reconcile_user(self, user_id: uuid.UUID, fix: bool) -> list[TodoStatsDrift]:
+        # A missing row is created first, so there is always one to lock
+        # (unless the user is gone); triggers writing it wait for the commit
+        await self.session.exec(
+            insert(TodoStatsCounter)
+            .from_select(["user_id"], select(User.id).where(User.id == user_id))
+            .on_conflict_do_nothing()
+        )
+        await self.session.exec(
+            select(TodoStatsCounter.user_id)
+            .where(TodoStatsCounter.user_id == user_id)
+            .with_for_update()
+        )
+        row = (await self.session.exec(_recount(user_id))).one_or_none()
+        counts = row[1:] if row else ()
+        if not row or not _drifted(counts):
+            await self.session.rollback()
+            return []
+
+        width = len(_COUNTER_FIELDS)
+        recounted, stored = counts[:width], counts[width:]
+        if fix:
+            await self.session.exec(
+                update(TodoStatsCounter)
+                .where(TodoStatsCounter.user_id == user_id)
+                .values(**dict(zip(_COUNTER_FIELDS, recounted)))
+            )
+            await self.session.commit()
+        else:
+            await self.session.rollback()
+        return [
+            TodoStatsDrift(user_id=user_id, field=field, stored=old, actual=new)
+            for field, old, new in zip(_COUNTER_FIELDS, stored, recounted)
+            if old != new
+        ]
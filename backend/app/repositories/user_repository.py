@@ -1,10 +1,25 @@
 import uuid
+from typing import Any
 
 from pydantic import EmailStr
-from sqlmodel import Session, select
+from sqlalchemy import Row, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, col, select
 
-from app.models.user import User
-from app.schemas.user import UserCreate
+from app.models.user import User, UserStatus
+from app.schemas.user import UserCreate, UserRead, UserSummary, UserUpdate
+
+# Fields of UserRead / UserSummary, in order; the list query returns these as plain rows
+_READ_COLUMNS = [User.__table__.c[field] for field in UserRead.model_fields]
+_SUMMARY_COLUMNS = [User.__table__.c[field] for field in UserSummary.model_fields]
+# Unique index on email, the only unique field a user can change
+EMAIL_CONSTRAINT = "ix_user_email"
+
+
+def violated_constraint(exc: IntegrityError) -> str | None:
+    """Name of the constraint behind an IntegrityError raised by asyncpg."""
+    return getattr(exc.orig.__cause__, "constraint_name", None)
 
 
 class UserRepository:
@@ -15,6 +30,11 @@ class UserRepository:
         user = await self.session.get(User, user_id)
         return user
 
+    async def release_connection(self) -> None:
+        """End the read transaction so its connection goes back to the pool.
+        Loaded users are expired; only copies of them stay usable."""
+        await self.session.rollback()
+
     async def get_user_by_email(self, email: EmailStr) -> User | None:
         statement = select(User).where(User.email == email)
         result = await self.session.exec(statement)
@@ -25,26 +45,70 @@ class UserRepository:
         result = await self.session.exec(statement)
         return result.first()
 
-    async def get_users(self) -> list[User]:
-        statement = select(User)
+    async def get_users(
+        self,
+        *,
+        limit: int,
+        after: str | None = None,
+        status: UserStatus | None = None,
+        username_prefix: str | None = None,
+        summary: bool = False,
+    ) -> list[Row[Any]]:
+        """List users by username, as rows of UserRead's columns (UserSummary's
+        with `summary`), never hashed_password.
+
+        Walks `ix_user_username` in order, seeking past the `after` username.
+        username uses the C collation, so the planner turns `username_prefix`
+        into a range on the same index and a filtered page reads only
+        matching entries.
+        """
+        statement = select(*(_SUMMARY_COLUMNS if summary else _READ_COLUMNS))
+        if status is not None:
+            statement = statement.where(User.status == status)
+        if username_prefix:
+            statement = statement.where(func.starts_with(User.username, username_prefix))
+        if after is not None:
+            statement = statement.where(User.username > after)
+        statement = statement.order_by(col(User.username)).limit(limit)
         result = await self.session.exec(statement)
-        return result.all()
+        return list(result.all())
+
+    async def register_user(self, user_in: UserCreate) -> User | None:
+        """Insert the user with one INSERT ... ON CONFLICT DO NOTHING RETURNING.
 
-    async def register_user(self, user_in: UserCreate) -> User:
-        user = User(**user_in.model_dump())
-        self.session.add(user)
+        Returns None if the username or email is already taken.
+        """
+        row = User(**user_in.model_dump()).model_dump()
+        statement = insert(User).values(row).on_conflict_do_nothing().returning(User)
+        result = await self.session.exec(statement)
+        user = result.scalars().one_or_none()
         await self.session.commit()
-        await self.session.refresh(user)
         return user
 
-    async def update_user(self, user_id: uuid.UUID, user_in: UserCreate) -> User | None:
-        user = await self.get_user(user_id)
-        if not user:
-            return None
+    async def update_user(self, user_id: uuid.UUID, user_in: UserUpdate) -> User | None:
+        """Apply the fields set in `user_in` with one UPDATE ... RETURNING.
+
+        Returns None if there is no such user; raises IntegrityError (after
+        rolling back) if a constraint fails, e.g. EMAIL_CONSTRAINT when the new
+        email is already taken.
+        """
         user_data = user_in.model_dump(exclude_unset=True)
-        for key, value in user_data.items():
-            setattr(user, key, value)
-        self.session.add(user)
+        if not user_data:
+            # Nothing to change, updated_at included
+            return await self.get_user(user_id)
+        statement = (
+            update(User)
+            .where(User.id == user_id)
+            .values(user_data)
+            .returning(User)
+            # Refresh the user if the session already holds it (the current user)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        try:
+            result = await self.session.exec(statement)
+        except IntegrityError:
+            await self.session.rollback()
+            raise
+        user = result.scalars().one_or_none()
         await self.session.commit()
-        await self.session.refresh(user)
         return user
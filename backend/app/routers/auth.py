@@ -1,15 +1,14 @@
-import uuid
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.dependencies.user import UserServiceDep
+from app.middleware.metrics import TimedRoute
 from app.schemas.auth import AuthToken
 from app.schemas.user import UserLogin, UserRead, UserRegister
 
-
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
 
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from app.db.pool import pool_status
+from app.db.session import engines
+from app.dependencies.auth import CurrentSuperuserDep
+from app.middleware.metrics import TimedRoute
+from app.schemas.internal import PoolStatus
+
+router = APIRouter(prefix="/internal", tags=["internal"], route_class=TimedRoute)
+
+
+@router.get("/pools", response_model=list[PoolStatus])
+async def get_pools(current_user: CurrentSuperuserDep):
+    """
+    Connection pool statistics for the primary and each read replica. Admins
+    only. Figures are for the worker process that serves the request.
+    """
+    return [pool_status(name, engine) for name, engine in engines()]
@@ -1,50 +1,285 @@
-from datetime import datetime, timezone
 import uuid
-from typing import Any
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
+from app.core.change_feed import ChangeFeedUnavailableError, change_feed
+from app.core.config import get_settings
+from app.core.etag import make_etag, not_modified
+from app.core.response_cache import TODO_LIST_SCOPE, user_scope
+from app.dependencies.auth import CurrentUserDep
+from app.dependencies.cache import RouteCacheDep
+from app.dependencies.todo import (
+    TodoImportServiceDep,
+    TodoReadServiceDep,
+    TodoServiceDep,
+)
+from app.middleware.metrics import TimedORJSONResponse, TimedRoute
+from app.models.todo import Priority
+from app.schemas.todo import (
+    FileFormat,
+    SearchMode,
+    TodoBatchCreate,
+    TodoBatchDelete,
+    TodoBatchDeleteResult,
+    TodoBatchResult,
+    TodoBatchUpdate,
+    TodoCreate,
+    TodoImportResult,
+    TodoPage,
+    TodoRead,
+    TodoStats,
+    TodoUpdate,
+)
 
-router = APIRouter(prefix="/todos", tags=["todos"])
+router = APIRouter(prefix="/todos", tags=["todos"], route_class=TimedRoute)
 
+settings = get_settings()
 
-@router.post("")
-async def create_todo():
-    # TODO: Implement create todo endpoint
-    return "todo"
+EXPORT_MEDIA_TYPES = {
+    FileFormat.NDJSON: ("application/x-ndjson", "ndjson"),
+    FileFormat.CSV: ("text/csv", "csv"),
+}
 
 
-@router.get("")
-async def get_todos():
-    # TODO: Implement list todos endpoint
-    # All authenticated users can view todos, but without description
-    return "todos"
+@router.post("", response_model=TodoRead, status_code=status.HTTP_201_CREATED)
+async def create_todo(
+    todo_in: TodoCreate, todo_service: TodoServiceDep, current_user: CurrentUserDep
+):
+    """Create a todo owned by the authenticated user."""
+    return await todo_service.create_todo(todo_in, current_user)
 
 
-@router.get("/{todo_id}")
-async def get_todo():
-    # TODO: Implement get todo endpoint
-    return "todo"
+@router.post(":batchCreate", response_model=TodoBatchResult, status_code=status.HTTP_201_CREATED)
+async def batch_create_todos(
+    batch_in: TodoBatchCreate, todo_service: TodoServiceDep, current_user: CurrentUserDep
+):
+    """Create up to TODO_BATCH_MAX_SIZE todos in one transaction."""
+    return await todo_service.create_todos(batch_in.items, current_user)
 
 
-@router.patch("/{todo_id}")
-async def update_todo():
-    return "todo"
+@router.patch(":batchUpdate", response_model=TodoBatchResult)
+async def batch_update_todos(
+    batch_in: TodoBatchUpdate, todo_service: TodoServiceDep, current_user: CurrentUserDep
+):
+    """
+    Partially update many todos in one transaction. Items that do not exist or
+    belong to another user are skipped and reported in `errors`.
+    """
+    return await todo_service.update_todos(batch_in.items, current_user)
 
 
-@router.delete("/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_todo():
-    # TODO: Implement delete todo endpoint
-    return None
+@router.delete(":batchDelete", response_model=TodoBatchDeleteResult)
+async def batch_delete_todos(
+    batch_in: TodoBatchDelete, todo_service: TodoServiceDep, current_user: CurrentUserDep
+):
+    """
+    Delete many todos in one transaction. Items that do not exist or belong to
+    another user are skipped and reported in `errors`.
+    """
+    return await todo_service.delete_todos(batch_in.ids, current_user)
+
+
+@router.post(
+    ":import",
+    response_model=TodoImportResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {}, "text/csv": {}},
+        }
+    },
+)
+async def import_todos(
+    request: Request,
+    todo_import_service: TodoImportServiceDep,
+    current_user: CurrentUserDep,
+    import_format: FileFormat = Query(default=FileFormat.NDJSON, alias="format"),
+):
+    """
+    Bulk import todos owned by the authenticated user from an NDJSON body (one
+    TodoCreate object per line) or a CSV body with a header row. The body is
+    streamed, so any size is accepted. Invalid rows are skipped and reported
+    in `errors`; all valid rows are committed together.
+    """
+    return await todo_import_service.import_todos(current_user, request.stream(), import_format)
+
+
+@router.get("", response_model=TodoPage)
+async def get_todos(
+    request: Request,
+    response: Response,
+    todo_service: TodoReadServiceDep,
+    current_user: CurrentUserDep,
+    cache: RouteCacheDep,
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(
+        default=None, description="`next_cursor` from a previous page; overrides `page`"
+    ),
+    priority: Priority | None = None,
+    completed: bool | None = None,
+    search: str | None = Query(default=None, max_length=200),
+    search_mode: SearchMode = SearchMode.SUBSTRING,
+    include_archived: bool = Query(
+        default=False, description="Also list completed todos moved to the archive"
+    ),
+):
+    """
+    List todos from all users, newest first, or most relevant first when
+    searching by title. Descriptions of todos owned by other users are hidden.
+    Old completed todos are archived and only listed with `include_archived`.
+    Supports If-None-Match, checked before the list is queried.
+    """
+    query = urlencode(sorted(request.query_params.multi_items()))
+    etag = await todo_service.get_todos_etag(current_user, query)
+    if cached := not_modified(request, response, etag):
+        return cached
+    # The ETag already covers the viewer, the query and every todo write
+    if cached := await cache.get(TODO_LIST_SCOPE, etag):
+        return cached
+    page = await todo_service.get_todos(
+        current_user,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        priority=priority,
+        completed=completed,
+        search=search,
+        search_mode=search_mode,
+        include_archived=include_archived,
+    )
+    return await cache.store(TODO_LIST_SCOPE, etag, etag, TimedORJSONResponse(page).body)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+async def export_todos(
+    todo_service: TodoServiceDep,
+    current_user: CurrentUserDep,
+    export_format: FileFormat = Query(default=FileFormat.NDJSON, alias="format"),
+    all_users: bool = Query(default=False, alias="all", description="Admins only"),
+):
+    """
+    Stream the authenticated user's todos (or everyone's, for admins) as
+    NDJSON or CSV, oldest first.
+    """
+    todo_service.check_export_allowed(current_user, all_users)
+    media_type, extension = EXPORT_MEDIA_TYPES[export_format]
+    return StreamingResponse(
+        todo_service.export_todos(current_user, all_users=all_users, export_format=export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="todos.{extension}"'},
+    )
+
 
+@router.get("/stats", response_model=TodoStats)
+async def get_stats(
+    todo_service: TodoReadServiceDep, current_user: CurrentUserDep, cache: RouteCacheDep
+):
+    """Totals for the authenticated user's todos. Supports If-None-Match."""
+    scope = user_scope(current_user.id)
+    if cached := await cache.get(scope, "stats"):
+        return cached
+    stats = await todo_service.get_stats(current_user)
+    etag = make_etag(current_user.id, stats)
+    return await cache.store(scope, "stats", etag, stats.model_dump_json().encode())
 
-@router.patch("/{todo_id}/complete")
-async def complete_todo():
-    # TODO: Implement complete todo endpoint
-    return "todo"
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def todo_events(
+    current_user: CurrentUserDep,
+    last_event_id: str | None = Header(default=None),
+):
+    """
+    Server-Sent Events stream of todo changes from all users: `created`,
+    `updated`, `completed`, `deleted` and `archived`, each with the todo as the
+    list shows it (descriptions hidden), and `bulk` for large imports and
+    deletions.
+    Reconnecting with Last-Event-ID replays missed events when the server
+    still has them; otherwise a `reset` event asks the client to refetch.
+    """
+    try:
+        stream = await change_feed.open(last_event_id)
+    except ChangeFeedUnavailableError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+        )
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        # Proxies must pass events on as they come
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{todo_id}", response_model=TodoRead)
+async def get_todo(
+    todo_id: uuid.UUID,
+    todo_service: TodoReadServiceDep,
+    current_user: CurrentUserDep,
+    cache: RouteCacheDep,
+    include_archived: bool = Query(
+        default=False, description="Also look in the archive of old completed todos"
+    ),
+):
+    """Get a single todo. Owner only. Supports If-None-Match."""
+    # Only the owner's requests ever fill or hit their scope
+    scope, key = user_scope(current_user.id), f"todo:{todo_id}"
+    if include_archived:
+        key += ":archived"
+    if cached := await cache.get(scope, key):
+        return cached
+    todo = await todo_service.get_todo(todo_id, current_user, include_archived=include_archived)
+    etag = todo_service.todo_etag(todo)
+    return await cache.store(scope, key, etag, todo.model_dump_json().encode())
+
+
+@router.patch("/{todo_id}", response_model=TodoRead)
+async def update_todo(
+    todo_id: uuid.UUID,
+    todo_in: TodoUpdate,
+    response: Response,
+    todo_service: TodoServiceDep,
+    current_user: CurrentUserDep,
+    if_match: str | None = Header(default=None),
+):
+    """
+    Partially update a todo. Owner only. With If-Match, fails with 412 unless
+    the todo still has that ETag.
+    """
+    todo = await todo_service.update_todo(todo_id, todo_in, current_user, if_match)
+    response.headers["ETag"] = todo_service.todo_etag(todo)
+    return todo
+
+
+@router.delete("/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_todo(
+    todo_id: uuid.UUID, todo_service: TodoServiceDep, current_user: CurrentUserDep
+):
+    """Delete a todo. Owner only."""
+    await todo_service.delete_todo(todo_id, current_user)
 
 
-@router.get("/stats")
-async def get_stats():
-    # TODO: Implement get stats endpoint
-    return "stats"
+@router.patch("/{todo_id}/complete", response_model=TodoRead)
+async def complete_todo(
+    todo_id: uuid.UUID,
+    response: Response,
+    todo_service: TodoServiceDep,
+    current_user: CurrentUserDep,
+    if_match: str | None = Header(default=None),
+):
+    """Toggle the completed status of a todo. Owner only. Supports If-Match."""
+    todo = await todo_service.complete_todo(todo_id, current_user, if_match)
+    response.headers["ETag"] = todo_service.todo_etag(todo)
+    return todo
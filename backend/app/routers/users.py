@@ -1,28 +1,55 @@
 import uuid
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
+from app.core.etag import make_etag
+from app.core.response_cache import user_scope
 from app.dependencies.auth import CurrentUserDep
-from app.dependencies.user import UserServiceDep
-from app.schemas.user import UserRead, UserUpdate
+from app.dependencies.cache import RouteCacheDep
+from app.dependencies.user import UserReadServiceDep, UserServiceDep
+from app.middleware.metrics import TimedORJSONResponse, TimedRoute
+from app.models.user import UserStatus
+from app.schemas.user import UserPage, UserRead, UserUpdate, UserView
 
+router = APIRouter(prefix="/users", tags=["users"], route_class=TimedRoute)
 
-router = APIRouter(prefix="/users", tags=["users"])
 
-
-@router.get("", response_model=list[UserRead])
-async def get_users(user_service: UserServiceDep, current_user: CurrentUserDep):
-    return await user_service.get_users()
+@router.get("", response_model=UserPage)
+async def get_users(
+    user_service: UserReadServiceDep,
+    current_user: CurrentUserDep,
+    page_size: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None, description="`next_cursor` from a previous page"),
+    status: UserStatus | None = None,
+    username_prefix: str | None = Query(default=None, max_length=64),
+    view: UserView = Query(
+        default=UserView.FULL, description="SUMMARY returns only id and username"
+    ),
+):
+    """List users ordered by username, a page at a time."""
+    page = await user_service.get_users(
+        page_size=page_size,
+        cursor=cursor,
+        user_status=status,
+        username_prefix=username_prefix,
+        view=view,
+    )
+    return TimedORJSONResponse(page)
 
 
 @router.get("/me", response_model=UserRead)
-def get_me(current_user: CurrentUserDep):
-    return current_user
+async def get_me(current_user: CurrentUserDep, cache: RouteCacheDep):
+    scope = user_scope(current_user.id)
+    if cached := await cache.get(scope, "me"):
+        return cached
+    etag = make_etag(current_user.id, current_user.updated_at)
+    body = UserRead.model_validate(current_user).model_dump_json().encode()
+    return await cache.store(scope, "me", etag, body)
 
 
 @router.get("/{user_id}", response_model=UserRead)
 async def get_user(
-    user_id: uuid.UUID, user_service: UserServiceDep, current_user: CurrentUserDep
+    user_id: uuid.UUID, user_service: UserReadServiceDep, current_user: CurrentUserDep
 ):
     return await user_service.get_user(user_id)
 
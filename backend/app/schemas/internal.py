@@ -0,0 +1,19 @@
+from sqlmodel import SQLModel
+
+
+class PoolStatus(SQLModel):
+    # "primary", or the replica URL without its password
+    engine: str
+    pool_size: int
+    max_overflow: int
+    # Open connections, idle or checked out
+    connections: int
+    checked_out: int
+    overflow: int
+    # Cumulative since startup; failed checkouts are not in the histogram
+    checkouts: int
+    checkout_timeouts: int
+    checkout_errors: int
+    wait_ms_sum: float
+    # Cumulative count of checkouts that waited at most <key> ms
+    wait_ms_histogram: dict[str, int]
@@ -1,9 +1,18 @@
-from datetime import datetime, timezone
-from sqlmodel import DateTime, SQLModel, Field
+from datetime import UTC, datetime
+
+from sqlmodel import DateTime, Field, SQLModel
 
 
 def utcnow_aware() -> datetime:
-    return datetime.now(timezone.utc)
+    return datetime.now(UTC)
+
+
+def naive_utc(value: datetime | None) -> datetime | None:
+    """Convert an offset-aware datetime to naive UTC, for columns stored
+    without a time zone; naive values are taken to be UTC already."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return value
 
 
 class TimeStampMixin(SQLModel):
@@ -1 +1,124 @@
-# TODO: Create Todo schemas
+import uuid
+from datetime import datetime
+from enum import Enum
+
+from pydantic import field_validator
+from sqlmodel import Field, SQLModel
+
+from app.core.config import get_settings
+from app.models.todo import Priority, TodoBase, TodoStatus
+from app.schemas.mixin import TimeStampMixin, naive_utc
+
+settings = get_settings()
+
+
+class SearchMode(str, Enum):
+    # Case-insensitive substring of the title, ranked by trigram similarity
+    SUBSTRING = "SUBSTRING"
+    # English word search (stemmed, supports "quoted" and -negated terms)
+    WORDS = "WORDS"
+
+
+class FileFormat(str, Enum):
+    NDJSON = "NDJSON"
+    CSV = "CSV"
+
+
+class TodoCreate(TodoBase):
+    pass
+
+
+class TodoUpdate(SQLModel):
+    title: str | None = Field(default=None, max_length=200)
+    description: str | None = None
+    status: TodoStatus | None = None
+    priority: Priority | None = None
+    due_date: datetime | None = None
+
+    _due_date_utc = field_validator("due_date")(naive_utc)
+
+    @field_validator("title", "description", "status")
+    @classmethod
+    def _not_null(cls, value):
+        # Only priority and due_date can be cleared; omit a field to keep it
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
+class TodoRead(TodoBase, TimeStampMixin):
+    id: uuid.UUID
+    user_id: uuid.UUID
+    # Hidden (null) for todos owned by other users
+    description: str | None = None
+
+
+class TodoBatchCreate(SQLModel):
+    items: list[TodoCreate] = Field(min_length=1, max_length=settings.TODO_BATCH_MAX_SIZE)
+
+
+class TodoBatchUpdateItem(TodoUpdate):
+    id: uuid.UUID
+
+
+class TodoBatchUpdate(SQLModel):
+    items: list[TodoBatchUpdateItem] = Field(min_length=1, max_length=settings.TODO_BATCH_MAX_SIZE)
+
+
+class TodoBatchDelete(SQLModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=settings.TODO_BATCH_MAX_SIZE)
+
+
+class TodoBatchError(SQLModel):
+    # Position of the failing item in the request
+    index: int
+    id: uuid.UUID | None = None
+    status_code: int
+    detail: str
+
+
+class TodoBatchResult(SQLModel):
+    items: list[TodoRead]
+    errors: list[TodoBatchError]
+
+
+class TodoBatchDeleteResult(SQLModel):
+    deleted: list[uuid.UUID]
+    errors: list[TodoBatchError]
+
+
+class TodoImportError(SQLModel):
+    # 1-based data row (CSV header not counted)
+    row: int
+    detail: str
+
+
+class TodoImportResult(SQLModel):
+    imported: int
+    rejected: int
+    # The first rejected rows only, see TODO_IMPORT_MAX_ERRORS
+    errors: list[TodoImportError]
+
+
+class TodoPage(SQLModel):
+    items: list[TodoRead]
+    page_size: int
+    # Only set in page/page_size mode; cursor mode skips the COUNT query
+    page: int | None = None
+    total: int | None = None
+    # Pass back as `cursor` to fetch the next page; null on the last page
+    next_cursor: str | None = None
+
+
+class TodoStats(SQLModel):
+    total: int
+    completed: int
+    pending: int
+    by_priority: dict[Priority, int]
+
+
+class TodoStatsDrift(SQLModel):
+    user_id: uuid.UUID
+    field: str
+    stored: int
+    actual: int
@@ -1,6 +1,7 @@
 import uuid
+from enum import Enum
 
-from pydantic import EmailStr
+from pydantic import EmailStr, field_validator
 from sqlmodel import Field, SQLModel
 
 from app.models.user import UserBase, UserStatus
@@ -18,10 +19,29 @@ class UserLogin(SQLModel):
     password: str = Field(min_length=8, max_length=128)
 
 
+class UserView(str, Enum):
+    FULL = "FULL"
+    # Only id and username, e.g. for owner pickers
+    SUMMARY = "SUMMARY"
+
+
 class UserRead(UserBase, TimeStampMixin):
     id: uuid.UUID
 
 
+class UserSummary(SQLModel):
+    id: uuid.UUID
+    username: str
+
+
+class UserPage(SQLModel):
+    # UserSummary items with view=SUMMARY
+    items: list[UserRead] | list[UserSummary]
+    page_size: int
+    # Pass back as `cursor` to fetch the next page; null on the last page
+    next_cursor: str | None = None
+
+
 class UserCreate(UserBase):
     hashed_password: str = Field(max_length=255)
 
@@ -29,3 +49,11 @@ class UserCreate(UserBase):
 class UserUpdate(SQLModel):
     email: EmailStr | None = Field(default=None, max_length=255)
     status: UserStatus | None = None
+
+    @field_validator("status")
+    @classmethod
+    def _not_null(cls, value):
+        # email can be cleared; omit status to keep it
+        if value is None:
+            raise ValueError("may not be null")
+        return value
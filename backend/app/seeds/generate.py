@@ -0,0 +1,294 @@
+"""Generate a large, realistic dataset of users and todos with COPY.
+
+    uv run python -m app.seeds.generate --users 1000 --todos 1000000
+    uv run python -m app.seeds.generate --users 100 --todos 50000 --skew 0 --seed 1
+
+Users are named <prefix><n> (seed_0, seed_1, ...) and share one password, so
+benchmarks can log in as them. Todos per user follow a Zipf distribution:
+user n gets a share proportional to 1 / (n + 1) ** skew, so seed_0 is the
+heaviest user and most users have a few todos; --skew 0 spreads them evenly.
+
+Everything is loaded in one transaction. With --drop-indexes, the secondary
+indexes on todo are dropped for the load and rebuilt afterwards, which is much
+faster for big datasets but should only be used on an otherwise idle database.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.security import get_password_hash
+from app.db.session import engine
+from app.models.todo import Priority, TodoStatus
+
+DEFAULT_PASSWORD = "Password123!"
+PROGRESS_EVERY = 100_000
+# Distinct titles and descriptions drawn from
+TEXT_POOL_SIZE = 20_000
+
+WORDS = [
+    "plan",
+    "review",
+    "write",
+    "call",
+    "email",
+    "book",
+    "fix",
+    "update",
+    "prepare",
+    "schedule",
+    "clean",
+    "buy",
+    "pay",
+    "send",
+    "order",
+    "check",
+    "organise",
+    "read",
+    "report",
+    "invoice",
+    "meeting",
+    "garden",
+    "kitchen",
+    "budget",
+    "presentation",
+    "dentist",
+    "groceries",
+    "car",
+    "insurance",
+    "taxes",
+    "birthday",
+    "party",
+    "flight",
+    "hotel",
+    "project",
+    "roadmap",
+    "design",
+    "release",
+    "deploy",
+    "backup",
+    "laptop",
+    "contract",
+    "client",
+    "team",
+    "weekly",
+    "monthly",
+    "quarterly",
+    "draft",
+    "final",
+    "notes",
+    "slides",
+    "tickets",
+    "renewal",
+    "application",
+    "feedback",
+    "training",
+]
+
+USER_COLUMNS = [
+    "id",
+    "username",
+    "email",
+    "status",
+    "hashed_password",
+    "is_superuser",
+    "created_at",
+    "updated_at",
+]
+TODO_COLUMNS = [
+    "id",
+    "user_id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "due_date",
+    "created_at",
+    "updated_at",
+]
+
+STATUSES = [status.value for status in TodoStatus]
+STATUS_WEIGHTS = [45, 20, 35]
+PRIORITIES = [None, *(priority.value for priority in Priority)]
+PRIORITY_WEIGHTS = [25, 30, 30, 15]
+
+
+def random_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def todo_counts(users: int, todos: int, skew: float, rng: random.Random) -> list[int]:
+    """Split `todos` over `users` with Zipf weights 1 / rank ** skew."""
+    weights = [1 / (rank + 1) ** skew for rank in range(users)]
+    total = sum(weights)
+    counts = [int(todos * weight / total) for weight in weights]
+    for index in rng.choices(range(users), weights=weights, k=todos - sum(counts)):
+        counts[index] += 1
+    return counts
+
+
+def user_records(
+    user_ids: list[uuid.UUID], prefix: str, hashed_password: str, now: datetime
+) -> Iterator[tuple]:
+    for index, user_id in enumerate(user_ids):
+        username = f"{prefix}{index}"
+        email = f"{username}@example.com"
+        yield (user_id, username, email, "ACTIVE", hashed_password, False, now, now)
+
+
+def sentences(rng: random.Random, count: int, min_words: int, max_words: int) -> list[str]:
+    return [
+        " ".join(rng.choices(WORDS, k=rng.randint(min_words, max_words))).capitalize()
+        for _ in range(count)
+    ]
+
+
+def todo_records(
+    user_ids: list[uuid.UUID], counts: list[int], rng: random.Random, now: datetime
+) -> Iterator[tuple]:
+    # Drawing text from pools is several times faster than building it per row
+    titles = sentences(rng, TEXT_POOL_SIZE, 2, 5)
+    descriptions = [sentence + "." for sentence in sentences(rng, TEXT_POOL_SIZE, 5, 40)]
+    year = timedelta(days=365).total_seconds()
+    loaded = 0
+    for user_id, count in zip(user_ids, counts):
+        statuses = rng.choices(STATUSES, weights=STATUS_WEIGHTS, k=count)
+        priorities = rng.choices(PRIORITIES, weights=PRIORITY_WEIGHTS, k=count)
+        for status, priority in zip(statuses, priorities):
+            created_at = now - timedelta(seconds=rng.random() * year)
+            updated_at = created_at + (now - created_at) * rng.random() ** 4
+            # due_date is a naive UTC column
+            due_date = (
+                (created_at + timedelta(days=rng.randint(1, 60))).replace(tzinfo=None)
+                if rng.random() < 0.3
+                else None
+            )
+            yield (
+                random_uuid(rng),
+                user_id,
+                rng.choice(titles),
+                rng.choice(descriptions),
+                status,
+                priority,
+                due_date,
+                created_at,
+                updated_at,
+            )
+            loaded += 1
+            if loaded % PROGRESS_EVERY == 0:
+                print(f"\r{loaded:,} todos", end="", file=sys.stderr)
+
+
+async def drop_todo_indexes(conn: AsyncConnection) -> list[str]:
+    """Drop todo's indexes that back no constraint, returning their definitions."""
+    result = await conn.execute(
+        text(
+            "SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid) "
+            "FROM pg_index WHERE indrelid = 'todo'::regclass "
+            "AND indexrelid NOT IN (SELECT conindid FROM pg_constraint)"
+        )
+    )
+    indexes = result.all()
+    for name, _ in indexes:
+        await conn.execute(text(f"DROP INDEX {name}"))
+    return [definition for _, definition in indexes]
+
+
+async def generate(
+    users: int,
+    todos: int,
+    skew: float,
+    prefix: str,
+    password: str,
+    seed: int | None,
+    drop_indexes: bool,
+) -> int:
+    # Ids come from the generator too; the prefix keeps datasets apart
+    rng = random.Random(None if seed is None else f"{prefix}{seed}")
+    counts = todo_counts(users, todos, skew, rng)
+    user_ids = [random_uuid(rng) for _ in range(users)]
+    now = datetime.now(UTC)
+    started = time.perf_counter()
+
+    async with engine.begin() as conn:
+        # Also starts the transaction the COPYs below run in
+        existing = await conn.scalar(
+            text('SELECT count(*) FROM "user" WHERE starts_with(username, :prefix)'),
+            {"prefix": prefix},
+        )
+        if existing:
+            print(f"{existing} users named {prefix}* already exist", file=sys.stderr)
+            return 2
+        index_definitions = await drop_todo_indexes(conn) if drop_indexes else []
+
+        driver = (await conn.get_raw_connection()).driver_connection
+        await driver.copy_records_to_table(
+            "user",
+            records=user_records(user_ids, prefix, get_password_hash(password), now),
+            columns=USER_COLUMNS,
+        )
+        await driver.copy_records_to_table(
+            "todo", records=todo_records(user_ids, counts, rng, now), columns=TODO_COLUMNS
+        )
+        print(f"\r{todos:,} todos loaded in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        for definition in index_definitions:
+            index_started = time.perf_counter()
+            await conn.execute(text(definition))
+            print(f"{definition} ({time.perf_counter() - index_started:.1f}s)", file=sys.stderr)
+
+    async with engine.connect() as conn:
+        await conn.execute(text('ANALYZE "user"'))
+        await conn.execute(text("ANALYZE todo"))
+    await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Seeded {users:,} users and {todos:,} todos in {elapsed:.1f}s "
+        f"({(users + todos) / elapsed:,.0f} rows/s); "
+        f"{prefix}0 has {counts[0]:,} todos, {prefix}{users - 1} has {counts[-1]:,}"
+    )
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument(
+        "--skew", type=float, default=1.0, help="Zipf exponent; 0 = same count per user"
+    )
+    parser.add_argument("--prefix", default="seed_", help="username prefix")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, help="random seed, for repeatable datasets")
+    parser.add_argument(
+        "--drop-indexes",
+        action="store_true",
+        help="drop todo's secondary indexes during the load and rebuild them after",
+    )
+    args = parser.parse_args()
+    if args.users < 1 or args.todos < 0:
+        parser.error("--users must be positive and --todos not negative")
+    status = asyncio.run(
+        generate(
+            args.users,
+            args.todos,
+            args.skew,
+            args.prefix,
+            args.password,
+            args.seed,
+            args.drop_indexes,
+        )
+    )
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
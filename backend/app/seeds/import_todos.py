@@ -0,0 +1,104 @@
+"""Bulk import todos for one user from an NDJSON or CSV file.
+
+    uv run python -m app.seeds.import_todos todos.ndjson --username alice
+    uv run python -m app.seeds.import_todos todos.csv --username alice --errors bad.ndjson
+
+The format follows the file extension unless --format is given. Progress goes
+to stderr; rejected rows are written to --errors as NDJSON (default: stderr).
+Exits with status 1 when any row was rejected.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import engine
+from app.repositories.todo_repository import TodoRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.todo import FileFormat
+from app.services.todo_import_service import TodoImportService
+
+CHUNK_SIZE = 1024 * 1024
+
+
+async def read_chunks(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def import_file(
+    path: Path, username: str, import_format: FileFormat, errors_path: Path | None
+) -> int:
+    started = time.perf_counter()
+
+    def report(staged: int, rejected: int) -> None:
+        rate = staged / (time.perf_counter() - started)
+        print(
+            f"\r{staged:,} rows staged, {rejected:,} rejected ({rate:,.0f} rows/s)",
+            end="",
+            file=sys.stderr,
+        )
+
+    try:
+        async with AsyncSession(engine) as session:
+            user = await UserRepository(session).get_user_by_username(username)
+            if not user:
+                print(f"No user named {username!r}", file=sys.stderr)
+                return 2
+            service = TodoImportService(TodoRepository(session))
+            result = await service.import_todos(
+                user, read_chunks(path), import_format, on_progress=report
+            )
+    except HTTPException as exc:
+        print(f"\nImport aborted: {exc.detail}", file=sys.stderr)
+        return 2
+    finally:
+        await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"\nImported {result.imported:,} todos in {elapsed:.1f}s "
+        f"({result.imported / elapsed:,.0f} rows/s), {result.rejected:,} rejected",
+        file=sys.stderr,
+    )
+    if result.errors:
+        lines = [json.dumps(error.model_dump()) for error in result.errors]
+        if errors_path:
+            errors_path.write_text("\n".join(lines) + "\n")
+        else:
+            print("\n".join(lines), file=sys.stderr)
+        if result.rejected > len(result.errors):
+            print(f"(first {len(result.errors)} errors only)", file=sys.stderr)
+    return 1 if result.rejected else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import todos for a user")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--username", required=True, help="owner of the imported todos")
+    parser.add_argument(
+        "--format",
+        type=str.upper,
+        choices=[file_format.value for file_format in FileFormat],
+        help="NDJSON or CSV (default: from the file extension)",
+    )
+    parser.add_argument("--errors", type=Path, help="write rejected rows here")
+    args = parser.parse_args()
+    import_format = (
+        FileFormat(args.format)
+        if args.format
+        else (FileFormat.CSV if args.path.suffix.lower() == ".csv" else FileFormat.NDJSON)
+    )
+    sys.exit(asyncio.run(import_file(args.path, args.username, import_format, args.errors)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Production entry point: uvicorn workers sized to the machine and the database.
+
+    uv run python -m app.server [--workers N] [--host HOST] [--port PORT]
+
+Every worker process has its own pool per engine, DATABASE_POOL_SIZE +
+DATABASE_MAX_OVERFLOW connections, plus the change feed's LISTEN connection.
+Adding workers or instances multiplies that, so scaling out can exceed the
+server's max_connections without any warning until connections are refused.
+
+The launcher picks the worker count (WEB_CONCURRENCY, or one per CPU the
+process may use) and, when DATABASE_MAX_CONNECTIONS is set, splits it across
+WEB_INSTANCES x workers: each worker's pool shrinks to its share (it is never
+grown past the configured pool), and the launcher refuses to start when a
+share is too small to hold a single pooled connection. Auto-sized workers are
+capped to what the budget can hold instead. The budget applies to each
+database server, so replicas get the same per-worker pool. Leave headroom
+below max_connections for migrations, the commands in app.commands and
+superuser sessions.
+
+Workers inherit the shrunk pool through the environment; admission control
+and warm-up follow it. The event loop is uvloop and HTTP parsing httptools,
+with WEB_BACKLOG and WEB_KEEPALIVE_SECONDS for the listening socket and idle
+connections. The plan is printed at startup and each worker reports the pool
+it opened with.
+"""
+
+import argparse
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import uvicorn
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# CPU quota of the process's cgroup (v2), e.g. a container run with --cpus
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+# Connections a worker holds outside its pool: the change feed's LISTEN
+CHANGE_FEED_CONNECTIONS = 1
+
+
+@dataclass(frozen=True)
+class ServerPlan:
+    """Worker processes, and the pool each opens per engine."""
+
+    workers: int
+    pool_size: int
+    max_overflow: int
+
+    @property
+    def connections_per_worker(self) -> int:
+        """Most connections one worker opens to the primary."""
+        return self.pool_size + self.max_overflow + CHANGE_FEED_CONNECTIONS
+
+
+def available_cpus(cpu_max: Path = CGROUP_CPU_MAX) -> int:
+    """CPUs the process may run on, capped by its cgroup's CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not available on macOS or Windows
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = cpu_max.read_text().split()
+        return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        # No cgroup v2, or "max": no quota
+        return cpus
+
+
+def plan_server(
+    cpus: int,
+    workers: int,
+    instances: int,
+    max_connections: int,
+    pool_size: int,
+    max_overflow: int,
+) -> ServerPlan:
+    """Worker count (0 for one per CPU) and per-worker pool that fit
+    `max_connections` across `instances`; 0 leaves the pool as configured.
+
+    Raises ValueError when explicitly requested workers cannot get one
+    pooled connection each.
+    """
+    if max_connections <= 0:
+        return ServerPlan(workers or cpus, pool_size, max_overflow)
+    if not workers:
+        fitting = max_connections // (instances * (1 + CHANGE_FEED_CONNECTIONS))
+        workers = max(1, min(cpus, fitting))
+    share = max_connections // (instances * workers) - CHANGE_FEED_CONNECTIONS
+    if share < 1:
+        raise ValueError(
+            f"DATABASE_MAX_CONNECTIONS={max_connections} cannot give {instances} "
+            f"instance(s) x {workers} worker(s) a pooled connection each; "
+            "raise it or run fewer workers"
+        )
+    pooled = min(share, pool_size + max_overflow)
+    return ServerPlan(workers, min(pool_size, pooled), pooled - min(pool_size, pooled))
+
+
+def describe(plan: ServerPlan, cpus: int) -> str:
+    total = plan.connections_per_worker * plan.workers * settings.WEB_INSTANCES
+    budget = settings.DATABASE_MAX_CONNECTIONS or "unlimited"
+    return (
+        f"Starting {plan.workers} worker(s) on {cpus} CPU(s); database pool per worker and "
+        f"engine: {plan.pool_size} + {plan.max_overflow} overflow, so up to "
+        f"{plan.connections_per_worker} connections per worker with the change feed and "
+        f"{total} across {settings.WEB_INSTANCES} instance(s) (DATABASE_MAX_CONNECTIONS: "
+        f"{budget})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with production server settings")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.WEB_CONCURRENCY,
+        help="worker processes, 0 for one per available CPU",
+    )
+    parser.add_argument("--host", default=settings.WEB_HOST)
+    parser.add_argument("--port", type=int, default=settings.WEB_PORT)
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    try:
+        plan = plan_server(
+            cpus,
+            args.workers,
+            settings.WEB_INSTANCES,
+            settings.DATABASE_MAX_CONNECTIONS,
+            settings.DATABASE_POOL_SIZE,
+            settings.DATABASE_MAX_OVERFLOW,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    # Workers read their settings from the environment, which overrides .env;
+    # a single worker runs in this process, so its cached settings are dropped
+    os.environ["DATABASE_POOL_SIZE"] = str(plan.pool_size)
+    os.environ["DATABASE_MAX_OVERFLOW"] = str(plan.max_overflow)
+    get_settings.cache_clear()
+    print(describe(plan, cpus))
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=plan.workers,
+        loop="uvloop",
+        http="httptools",
+        backlog=settings.WEB_BACKLOG,
+        timeout_keep_alive=settings.WEB_KEEPALIVE_SECONDS,
+        log_level=settings.LOG_LEVEL.lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
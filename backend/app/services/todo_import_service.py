@@ -0,0 +1,177 @@
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+from enum import Enum
+from typing import Any
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+
+from app.core.config import get_settings
+from app.core.response_cache import TODO_LIST_SCOPE, response_cache, user_scope
+from app.models.todo import TodoBase
+from app.models.user import User
+from app.repositories.todo_repository import IMPORT_COLUMNS, TodoRepository
+from app.schemas.todo import FileFormat, TodoImportError, TodoImportResult
+
+settings = get_settings()
+
+# Called after every batch copied to staging with (rows staged, rows rejected)
+ImportProgress = Callable[[int, int], None]
+
+# A parsed row: field values, or why the row could not be parsed
+ParsedRow = dict[str, Any] | str
+
+# Empty CSV cells in these columns mean "use the default"
+_OPTIONAL_FIELDS = frozenset(
+    name for name, field in TodoBase.model_fields.items() if not field.is_required()
+)
+
+
+async def _read_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[list[str]]:
+    """Re-split a byte stream into complete lines, one list per chunk."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        if lines:
+            yield lines
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield [pending]
+
+
+async def _ndjson_rows(chunks: AsyncIterable[bytes]) -> AsyncIterator[list[ParsedRow]]:
+    async for lines in _read_lines(chunks):
+        rows: list[ParsedRow] = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                rows.append("Invalid JSON")
+                continue
+            rows.append(data if isinstance(data, dict) else "Expected a JSON object")
+        yield rows
+
+
+async def _csv_rows(chunks: AsyncIterable[bytes]) -> AsyncIterator[list[ParsedRow]]:
+    """Parse CSV with a header row; quoted cells may contain newlines."""
+    header: list[str] | None = None
+    record_lines: list[str] = []
+    quotes = 0
+    async for lines in _read_lines(chunks):
+        records = []
+        for line in lines:
+            record_lines.append(line)
+            quotes += line.count('"')
+            # An odd number of quotes so far means a quoted cell spans lines
+            if quotes % 2 == 0:
+                records.append("\n".join(record_lines))
+                record_lines, quotes = [], 0
+        rows: list[ParsedRow] = []
+        for values in csv.reader(records):
+            if not values:
+                continue
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                rows.append(f"Expected {len(header)} columns, got {len(values)}")
+                continue
+            rows.append(
+                {
+                    name: value
+                    for name, value in zip(header, values)
+                    if value or name not in _OPTIONAL_FIELDS
+                }
+            )
+        yield rows
+    if record_lines:
+        raise csv.Error("unterminated quoted cell at end of file")
+
+
+def _copy_value(value: Any) -> Any:
+    # TodoBase has already converted due_date to naive UTC
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _validate(row: ParsedRow) -> tuple[Any, ...] | str:
+    """Return the record to COPY for a valid row, or the error message."""
+    if isinstance(row, str):
+        return row
+    try:
+        todo = TodoBase.model_validate(row)
+    except ValidationError as exc:
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in exc.errors()
+        )
+    return tuple(_copy_value(getattr(todo, name)) for name in IMPORT_COLUMNS)
+
+
+class TodoImportService:
+    def __init__(self, todo_repository: TodoRepository):
+        self.todo_repository = todo_repository
+
+    async def import_todos(
+        self,
+        current_user: User,
+        chunks: AsyncIterable[bytes],
+        import_format: FileFormat,
+        on_progress: ImportProgress | None = None,
+    ) -> TodoImportResult:
+        """Import todos owned by `current_user` from an NDJSON or CSV stream.
+
+        Rows are validated against TodoBase in batches and COPYed into a
+        staging table; valid rows are merged into todo in one statement at
+        the end. Invalid rows are skipped and reported. Nothing is written if
+        the stream itself is malformed (bad encoding, unterminated quote).
+        """
+        parse = _csv_rows if import_format == FileFormat.CSV else _ndjson_rows
+        await self.todo_repository.create_import_staging()
+        staged = rejected = row_number = 0
+        errors: list[TodoImportError] = []
+        batch: list[tuple[Any, ...]] = []
+
+        async def flush() -> None:
+            nonlocal staged, batch
+            await self.todo_repository.copy_to_import_staging(batch)
+            staged += len(batch)
+            batch = []
+            if on_progress:
+                on_progress(staged, rejected)
+
+        try:
+            async for rows in parse(chunks):
+                for row in rows:
+                    row_number += 1
+                    record = _validate(row)
+                    if isinstance(record, str):
+                        rejected += 1
+                        if len(errors) < settings.TODO_IMPORT_MAX_ERRORS:
+                            errors.append(TodoImportError(row=row_number, detail=record))
+                        continue
+                    batch.append(record)
+                    if len(batch) >= settings.TODO_IMPORT_BATCH_SIZE:
+                        await flush()
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Malformed input after row {row_number}: {exc}",
+            )
+        if batch:
+            await flush()
+
+        # Read before the merge commits: the CLI's session expires current_user
+        scopes = (TODO_LIST_SCOPE, user_scope(current_user.id))
+        imported = await self.todo_repository.merge_import_staging(current_user.id)
+        if imported:
+            await response_cache.invalidate(*scopes)
+        return TodoImportResult(imported=imported, rejected=rejected, errors=errors)
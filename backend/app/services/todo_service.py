@@ -1,8 +1,365 @@
+import csv
+import io
+import json
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime
+from enum import Enum
+from typing import Any
+
 from fastapi import HTTPException, status
+from sqlalchemy import Row
+
+from app.core.etag import etag_matches, make_etag
+from app.core.pagination import (
+    InvalidCursorError,
+    decode_created_at_cursor,
+    decode_ranked_cursor,
+    encode_cursor,
+)
+from app.core.response_cache import TODO_LIST_SCOPE, response_cache, user_scope
+from app.db.session import read_session
+from app.models.todo import Priority, Todo, TodoArchive, TodoStatsCounter
+from app.models.user import User
+from app.repositories.todo_repository import TodoRepository
+from app.schemas.todo import (
+    FileFormat,
+    SearchMode,
+    TodoBatchDeleteResult,
+    TodoBatchError,
+    TodoBatchResult,
+    TodoBatchUpdateItem,
+    TodoCreate,
+    TodoRead,
+    TodoStats,
+    TodoUpdate,
+)
+
+EXPORT_BATCH_SIZE = 1000
+READ_FIELDS = tuple(TodoRead.model_fields)
+EXPORT_FIELDS = READ_FIELDS
+
 
-from app.models.todo import Todo, Priority
+def _export_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _export_record(row: Row[Any]) -> dict[str, Any]:
+    mapping = row._mapping
+    return {field: _export_value(mapping[field]) for field in EXPORT_FIELDS}
 
 
 class TodoService:
-    # TODO: Implement the todo service methods
-    pass
+    def __init__(self, todo_repository: TodoRepository):
+        self.todo_repository = todo_repository
+
+    @staticmethod
+    def todo_etag(todo: Todo | TodoArchive | TodoRead) -> str:
+        return make_etag(todo.id, todo.updated_at)
+
+    @staticmethod
+    async def invalidate_cache(current_user: User) -> None:
+        """Drop the cached responses a todo write by `current_user` can change:
+        every list page, and their own todos and stats."""
+        await response_cache.invalidate(TODO_LIST_SCOPE, user_scope(current_user.id))
+
+    async def _get_owned_todo(
+        self,
+        todo_id: uuid.UUID,
+        current_user: User,
+        *,
+        if_match: str | None = None,
+        include_archived: bool = False,
+    ) -> Todo | TodoArchive:
+        """Fetch a todo the user owns; with `if_match`, lock it and check it is
+        still the version the client last saw. Archived todos are only found
+        with `include_archived`."""
+        todo: Todo | TodoArchive | None = await self.todo_repository.get_todo(
+            todo_id, for_update=if_match is not None
+        )
+        if not todo and include_archived:
+            todo = await self.todo_repository.get_archived_todo(todo_id)
+        if not todo:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
+        if todo.user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions",
+            )
+        if if_match is not None and not etag_matches(if_match, self.todo_etag(todo)):
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Todo was modified since it was fetched",
+                headers={"ETag": self.todo_etag(todo)},
+            )
+        return todo
+
+    async def create_todo(self, todo_in: TodoCreate, current_user: User) -> TodoRead:
+        todo = await self.todo_repository.create_todo(current_user.id, todo_in)
+        await self.invalidate_cache(current_user)
+        return TodoRead.model_validate(todo)
+
+    async def get_todos(
+        self,
+        current_user: User,
+        *,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: str | None = None,
+        priority: Priority | None = None,
+        completed: bool | None = None,
+        search: str | None = None,
+        search_mode: SearchMode = SearchMode.SUBSTRING,
+        include_archived: bool = False,
+    ) -> dict[str, Any]:
+        """A page of todos as plain data in TodoPage's shape.
+
+        Built from Core rows and left unvalidated, for the router to render
+        with orjson; see TimedORJSONResponse. The query already hides other
+        users' descriptions.
+        """
+        filters = {
+            "priority": priority,
+            "completed": completed,
+            "include_archived": include_archived,
+        }
+        offset = (page - 1) * page_size if cursor is None else 0
+        try:
+            if search:
+                after = decode_ranked_cursor(cursor) if cursor is not None else None
+                rows = await self.todo_repository.search_todos(
+                    search,
+                    viewer_id=current_user.id,
+                    limit=page_size + 1,
+                    offset=offset,
+                    after=after,
+                    search_mode=search_mode,
+                    **filters,
+                )
+            else:
+                after = decode_created_at_cursor(cursor) if cursor is not None else None
+                rows = await self.todo_repository.get_todos(
+                    viewer_id=current_user.id,
+                    limit=page_size + 1,
+                    offset=offset,
+                    after=after,
+                    **filters,
+                )
+        except InvalidCursorError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        total = None
+        if cursor is None:
+            total = await self.todo_repository.count_todos(
+                search=search, search_mode=search_mode, **filters
+            )
+
+        # One extra row tells us whether a next page exists without a COUNT
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            sort_key: tuple = (last.created_at, last.id)
+            if search:
+                sort_key = (last.rank, *sort_key)
+            next_cursor = encode_cursor(*sort_key)
+        return {
+            # zip stops at READ_FIELDS, dropping trailing columns such as rank
+            "items": [dict(zip(READ_FIELDS, row)) for row in rows],
+            "page_size": page_size,
+            "page": page if cursor is None else None,
+            "total": total,
+            "next_cursor": next_cursor,
+        }
+
+    async def get_todos_etag(self, current_user: User, query: str) -> str:
+        """ETag for a todo list, from a cheap watermark instead of the list.
+
+        Descriptions are masked per viewer, so the viewer is part of the tag,
+        as is the normalized `query` string selecting the page.
+        """
+        watermark = await self.todo_repository.get_list_watermark()
+        return make_etag(current_user.id, watermark, query)
+
+    async def get_todo(
+        self, todo_id: uuid.UUID, current_user: User, *, include_archived: bool = False
+    ) -> TodoRead:
+        todo = await self._get_owned_todo(todo_id, current_user, include_archived=include_archived)
+        return TodoRead.model_validate(todo)
+
+    async def _write_error(self, todo_id: uuid.UUID) -> HTTPException:
+        """Why a write matched no todo of the user: missing, or someone else's.
+
+        Only runs after the write came back empty, so successful writes stay
+        a single statement.
+        """
+        if await self.todo_repository.get_existing_ids([todo_id]):
+            return HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions",
+            )
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
+
+    async def update_todo(
+        self,
+        todo_id: uuid.UUID,
+        todo_in: TodoUpdate,
+        current_user: User,
+        if_match: str | None = None,
+    ) -> TodoRead:
+        if if_match is not None or not todo_in.model_fields_set:
+            todo = await self._get_owned_todo(todo_id, current_user, if_match=if_match)
+            # An empty update changes nothing, updated_at (and the ETag) included
+            if not todo_in.model_fields_set:
+                return TodoRead.model_validate(todo)
+        todo = await self.todo_repository.update_todo(todo_id, current_user.id, todo_in)
+        if todo is None:
+            raise await self._write_error(todo_id)
+        await self.invalidate_cache(current_user)
+        return TodoRead.model_validate(todo)
+
+    async def complete_todo(
+        self, todo_id: uuid.UUID, current_user: User, if_match: str | None = None
+    ) -> TodoRead:
+        if if_match is not None:
+            await self._get_owned_todo(todo_id, current_user, if_match=if_match)
+        todo = await self.todo_repository.toggle_completed(todo_id, current_user.id)
+        if todo is None:
+            raise await self._write_error(todo_id)
+        await self.invalidate_cache(current_user)
+        return TodoRead.model_validate(todo)
+
+    async def delete_todo(self, todo_id: uuid.UUID, current_user: User) -> None:
+        if not await self.todo_repository.delete_todo(todo_id, current_user.id):
+            raise await self._write_error(todo_id)
+        await self.invalidate_cache(current_user)
+
+    async def create_todos(self, todos_in: list[TodoCreate], current_user: User) -> TodoBatchResult:
+        todos = await self.todo_repository.create_todos(current_user.id, todos_in)
+        await self.invalidate_cache(current_user)
+        return TodoBatchResult(items=[TodoRead.model_validate(todo) for todo in todos], errors=[])
+
+    async def _batch_errors(
+        self, requested: list[uuid.UUID], done: set[uuid.UUID]
+    ) -> list[TodoBatchError]:
+        """Explain why requested ids were not processed, in request order."""
+        missing = [todo_id for todo_id in requested if todo_id not in done]
+        existing = await self.todo_repository.get_existing_ids(missing) if missing else set()
+        errors = []
+        seen: set[uuid.UUID] = set()
+        for index, todo_id in enumerate(requested):
+            if todo_id in seen:
+                errors.append(
+                    TodoBatchError(
+                        index=index,
+                        id=todo_id,
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Duplicate id in batch",
+                    )
+                )
+            elif todo_id in existing:
+                errors.append(
+                    TodoBatchError(
+                        index=index,
+                        id=todo_id,
+                        status_code=status.HTTP_403_FORBIDDEN,
+                        detail="Not enough permissions",
+                    )
+                )
+            elif todo_id not in done:
+                errors.append(
+                    TodoBatchError(
+                        index=index,
+                        id=todo_id,
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Todo not found",
+                    )
+                )
+            seen.add(todo_id)
+        return errors
+
+    async def update_todos(
+        self, items: list[TodoBatchUpdateItem], current_user: User
+    ) -> TodoBatchResult:
+        updates: dict[uuid.UUID, dict[str, Any]] = {}
+        for item in items:
+            # The first occurrence of a duplicated id wins; the rest are errors
+            updates.setdefault(item.id, item.model_dump(exclude={"id"}, exclude_unset=True))
+        todos = await self.todo_repository.update_todos(current_user.id, updates)
+        if todos:
+            await self.invalidate_cache(current_user)
+        by_id = {todo.id: todo for todo in todos}
+        return TodoBatchResult(
+            items=[
+                TodoRead.model_validate(by_id[todo_id]) for todo_id in updates if todo_id in by_id
+            ],
+            errors=await self._batch_errors([item.id for item in items], set(by_id)),
+        )
+
+    async def delete_todos(
+        self, todo_ids: list[uuid.UUID], current_user: User
+    ) -> TodoBatchDeleteResult:
+        unique_ids = list(dict.fromkeys(todo_ids))
+        deleted = set(await self.todo_repository.delete_todos(current_user.id, unique_ids))
+        if deleted:
+            await self.invalidate_cache(current_user)
+        return TodoBatchDeleteResult(
+            deleted=[todo_id for todo_id in unique_ids if todo_id in deleted],
+            errors=await self._batch_errors(todo_ids, deleted),
+        )
+
+    def check_export_allowed(self, current_user: User, all_users: bool) -> None:
+        if all_users and not current_user.is_superuser:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only admins can export all todos",
+            )
+
+    async def export_todos(
+        self, current_user: User, *, all_users: bool, export_format: FileFormat
+    ) -> AsyncIterator[bytes]:
+        """Yield the export as encoded chunks, one per cursor batch.
+
+        Runs in its own session, on a replica when there is one: the request
+        session is closed before a StreamingResponse body is sent.
+        """
+        async with read_session() as session:
+            batches = TodoRepository(session).stream_todos(
+                user_id=None if all_users else current_user.id,
+                batch_size=EXPORT_BATCH_SIZE,
+            )
+            if export_format == FileFormat.CSV:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(EXPORT_FIELDS)
+                async for rows in batches:
+                    writer.writerows(_export_record(row).values() for row in rows)
+                    yield buffer.getvalue().encode()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue().encode()
+            else:
+                async for rows in batches:
+                    yield "".join(json.dumps(_export_record(row)) + "\n" for row in rows).encode()
+
+    async def get_stats(self, current_user: User) -> TodoStats:
+        counters = await self.todo_repository.get_stats(current_user.id)
+        if not counters:
+            counters = TodoStatsCounter(user_id=current_user.id)
+        return TodoStats(
+            total=counters.total,
+            completed=counters.completed,
+            pending=counters.total - counters.completed,
+            by_priority={
+                Priority.LOW: counters.low,
+                Priority.MEDIUM: counters.medium,
+                Priority.HIGH: counters.high,
+            },
+        )
@@ -1,14 +1,33 @@
 import uuid
+from collections.abc import Awaitable
 from datetime import timedelta
+from typing import Any, TypeVar
 
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 
 from app.core import security
+from app.core.cache import user_cache
 from app.core.config import get_settings
+from app.core.pagination import InvalidCursorError, decode_username_cursor, encode_cursor
+from app.core.response_cache import response_cache, user_scope
 from app.models.user import UserStatus
-from app.repositories.user_repository import UserRepository
+from app.repositories.user_repository import (
+    EMAIL_CONSTRAINT,
+    UserRepository,
+    violated_constraint,
+)
 from app.schemas.auth import AuthToken
-from app.schemas.user import UserCreate, UserLogin, UserRead, UserRegister, UserUpdate
+from app.schemas.user import (
+    UserCreate,
+    UserLogin,
+    UserRead,
+    UserRegister,
+    UserUpdate,
+    UserView,
+)
+
+T = TypeVar("T")
 
 
 class UserService:
@@ -17,37 +36,47 @@ class UserService:
         self.settings = get_settings()
 
     async def register_user(self, user_in: UserRegister) -> UserRead:
-        if await self.user_repository.get_user_by_username(user_in.username):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already registered",
-            )
-        if await self.user_repository.get_user_by_email(user_in.email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered",
-            )
-
         user_create = UserCreate(
             username=user_in.username,
             email=user_in.email,
-            hashed_password=security.get_password_hash(user_in.password),
+            hashed_password=await self._run_hasher(
+                security.get_password_hash_async(user_in.password)
+            ),
         )
 
-        return await self.user_repository.register_user(user_create)
+        user = await self.user_repository.register_user(user_create)
+        if user:
+            return user
+        # Only a conflicting registration pays for finding out which field clashed
+        if await self.user_repository.get_user_by_username(user_in.username):
+            detail = "Username already registered"
+        else:
+            detail = "Email already registered"
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+    @staticmethod
+    async def _run_hasher(call: Awaitable[T]) -> T:
+        try:
+            return await call
+        except security.PasswordHasherBusyError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent logins, try again shortly",
+                headers={"Retry-After": "1"},
+            )
 
     async def _authenticate(self, username: str, password: str):
         user = await self.user_repository.get_user_by_username(username)
         if not user:
             return None
-        if not security.verify_password(password, user.hashed_password):
+        if not await self._run_hasher(
+            security.verify_password_async(password, user.hashed_password)
+        ):
             return None
         return user
 
     async def authenticate_user(self, user_in: UserLogin) -> AuthToken:
-        user = await self._authenticate(
-            username=user_in.username, password=user_in.password
-        )
+        user = await self._authenticate(username=user_in.username, password=user_in.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -61,9 +90,7 @@ class UserService:
                 detail=f"{user.status.value.capitalize()} user",
             )
 
-        access_token_expires = timedelta(
-            minutes=self.settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
+        access_token_expires = timedelta(minutes=self.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
         return AuthToken(
             access_token=security.create_access_token(
@@ -76,18 +103,56 @@ class UserService:
     async def get_user(self, user_id: uuid.UUID) -> UserRead:
         user = await self.user_repository.get_user(user_id)
         if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-            )
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         return user
 
-    async def get_users(self) -> list[UserRead]:
-        return await self.user_repository.get_users()
+    async def release_connection(self) -> None:
+        await self.user_repository.release_connection()
+
+    async def get_users(
+        self,
+        *,
+        page_size: int = 20,
+        cursor: str | None = None,
+        user_status: UserStatus | None = None,
+        username_prefix: str | None = None,
+        view: UserView = UserView.FULL,
+    ) -> dict[str, Any]:
+        """A page of users as plain data in UserPage's shape, for
+        TimedORJSONResponse."""
+        try:
+            after = decode_username_cursor(cursor) if cursor is not None else None
+        except InvalidCursorError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        rows = await self.user_repository.get_users(
+            limit=page_size + 1,
+            after=after,
+            status=user_status,
+            username_prefix=username_prefix,
+            summary=view == UserView.SUMMARY,
+        )
+        # One extra row tells us whether a next page exists without a COUNT
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return {
+            "items": [row._asdict() for row in rows],
+            "page_size": page_size,
+            "next_cursor": encode_cursor(rows[-1].username) if has_more else None,
+        }
 
     async def update_user(self, user_id: uuid.UUID, user_in: UserUpdate) -> UserRead:
-        user = await self.user_repository.update_user(user_id, user_in)
-        if not user:
+        try:
+            user = await self.user_repository.update_user(user_id, user_in)
+        except IntegrityError as exc:
+            if violated_constraint(exc) != EMAIL_CONSTRAINT:
+                raise
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered",
             )
+        if not user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        # Status changes (e.g. suspensions) must apply to the next request
+        user_cache.delete(user_id)
+        await response_cache.invalidate(user_scope(user_id))
         return user
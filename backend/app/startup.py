@@ -0,0 +1,196 @@
+"""Worker warm-up at startup, and the readiness it reports.
+
+Without it the first requests a fresh worker serves pay for opening pool
+connections, asyncpg's type introspection (done once per connection),
+compiling the ORM statements and preparing them on the server, and starting
+the password hashing workers. `warm_up` runs in `lifespan`, before the worker
+accepts requests, and does that work up front:
+
+- opens DATABASE_WARMUP_CONNECTIONS connections per engine and, on each,
+  runs the hot repository statements so they are compiled once and prepared
+  on every pooled connection. Writes run on the primary only, inside a
+  transaction that is rolled back, so nothing is left behind
+- signs and decodes a JWT, and hashes once per password executor worker
+
+A phase that fails is logged and skipped: a cold worker still serves
+requests, only more slowly. `/health/ready` reports warm-up completion and
+whether the primary answers.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Awaitable
+from datetime import UTC, datetime, timedelta
+
+import jwt
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import Gauge, registry
+from app.core.security import (
+    create_access_token,
+    get_password_hash_async,
+    password_executor,
+    verify_password_async,
+)
+from app.db.session import engine, engines
+from app.models.todo import TodoStatus
+from app.repositories.todo_repository import TodoRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.auth import TokenPayload
+from app.schemas.todo import SearchMode, TodoCreate, TodoUpdate
+from app.schemas.user import UserCreate, UserUpdate
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+startup_seconds = Gauge(
+    "app_startup_seconds",
+    "Time the last startup spent warming up the worker, by phase.",
+    ("phase",),
+)
+registry.register(startup_seconds)
+
+WARMUP_TEXT = "warm-up"
+
+
+class StartupState:
+    """Whether warm-up has finished, and which of its phases failed."""
+
+    def __init__(self):
+        self.finished = False
+        self.failed: list[str] = []
+
+    def reset(self) -> None:
+        self.finished = False
+        self.failed = []
+
+
+state = StartupState()
+
+
+async def _warm_reads(session: AsyncSession) -> None:
+    todos, users = TodoRepository(session), UserRepository(session)
+    nobody = uuid.UUID(int=0)
+    # LIMIT and OFFSET are bound parameters: one statement whatever the page size
+    await users.get_user(nobody)
+    await users.get_user_by_username(WARMUP_TEXT)
+    await users.get_users(limit=1)
+    await todos.get_todos(viewer_id=nobody, limit=1)
+    await todos.get_todos(viewer_id=nobody, limit=1, after=(datetime.now(UTC), nobody))
+    await todos.count_todos()
+    for search_mode in SearchMode:
+        await todos.search_todos(WARMUP_TEXT, viewer_id=nobody, limit=1, search_mode=search_mode)
+    await todos.get_todo(nobody)
+    await todos.get_stats(nobody)
+    await todos.get_list_watermark()
+    await todos.get_existing_ids([nobody])
+
+
+async def _warm_writes(session: AsyncSession) -> None:
+    todos, users = TodoRepository(session), UserRepository(session)
+    username = f"warmup_{uuid.uuid4().hex}"
+    user = await users.register_user(UserCreate(username=username, hashed_password=""))
+    await users.update_user(user.id, UserUpdate(email=f"{username}@example.com"))
+    todo = await todos.create_todo(user.id, TodoCreate(title=WARMUP_TEXT, description=""))
+    await todos.get_todo(todo.id, for_update=True)
+    await todos.update_todo(todo.id, user.id, TodoUpdate(status=TodoStatus.IN_PROGRESS))
+    await todos.toggle_completed(todo.id, user.id)
+    await todos.delete_todo(todo.id, user.id)
+
+
+async def _warm_connection(conn: AsyncConnection, writes: bool) -> None:
+    transaction = await conn.begin()
+    try:
+        # Repository commits release savepoints; the rollback undoes everything
+        async with AsyncSession(
+            bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        ) as session:
+            await _warm_reads(session)
+            if writes:
+                await _warm_writes(session)
+    finally:
+        await transaction.rollback()
+
+
+async def warm_engine(async_engine: AsyncEngine, connections: int, *, writes: bool) -> None:
+    """Open `connections` connections at once and warm each one, leaving them
+    in the pool (up to its size)."""
+    opened = await asyncio.gather(
+        *(async_engine.connect() for _ in range(connections)), return_exceptions=True
+    )
+    conns = [conn for conn in opened if isinstance(conn, AsyncConnection)]
+    # Every connection is done with before any is closed, failed or not
+    warmed = await asyncio.gather(
+        *(_warm_connection(conn, writes) for conn in conns), return_exceptions=True
+    )
+    await asyncio.gather(*(conn.close() for conn in conns))
+    for result in [*opened, *warmed]:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def warm_database() -> None:
+    connections = min(settings.DATABASE_WARMUP_CONNECTIONS, settings.DATABASE_POOL_SIZE)
+    if connections <= 0:
+        return
+    async with asyncio.timeout(settings.DATABASE_WARMUP_TIMEOUT):
+        # Replicas are read-only: they only get the reads
+        await asyncio.gather(
+            *(
+                warm_engine(async_engine, connections, writes=async_engine is engine)
+                for _, async_engine in engines()
+            )
+        )
+
+
+async def warm_security() -> None:
+    token = create_access_token(WARMUP_TEXT, timedelta(minutes=1))
+    TokenPayload(**jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]))
+    # One hash per executor worker, so every thread (or process) is started
+    hashes = 1
+    if password_executor.mode != "inline":
+        hashes = min(password_executor.workers, password_executor.max_queue)
+    hashed = await asyncio.gather(*(get_password_hash_async(WARMUP_TEXT) for _ in range(hashes)))
+    await verify_password_async(WARMUP_TEXT, hashed[0])
+
+
+async def _run_phase(name: str, phase: Awaitable[None]) -> None:
+    start = time.perf_counter()
+    try:
+        await phase
+    except Exception:
+        state.failed.append(name)
+        logger.exception("Startup warm-up phase %r failed; continuing without it", name)
+    finally:
+        startup_seconds.set(time.perf_counter() - start, (name,))
+
+
+async def warm_up() -> None:
+    """Run every warm-up phase, recording how long each took."""
+    state.reset()
+    start = time.perf_counter()
+    await asyncio.gather(
+        _run_phase("database", warm_database()), _run_phase("security", warm_security())
+    )
+    elapsed = time.perf_counter() - start
+    startup_seconds.set(elapsed, ("total",))
+    state.finished = True
+    logger.info("Warm-up finished in %.3fs", elapsed)
+
+
+async def database_reachable() -> bool:
+    """Whether the primary answers a trivial query within HEALTH_CHECK_TIMEOUT."""
+    try:
+        async with asyncio.timeout(settings.HEALTH_CHECK_TIMEOUT):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+    except (OSError, SQLAlchemyError):
+        return False
+    return True
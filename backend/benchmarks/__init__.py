@@ -0,0 +1,7 @@
+"""Performance benchmarks.
+
+Each module is runnable with `uv run python -m benchmarks.<name> --help` and
+talks to the database configured by DATABASE_URL. Benchmarks remove the data
+they create (most seed inside a transaction that is rolled back), so they
+leave the database as they found it.
+"""
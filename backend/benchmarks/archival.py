@@ -0,0 +1,162 @@
+"""Hot-table query latency before and after archiving old completed todos.
+
+Seeds --rows todos (a third completed, updated over the last year) and times
+the list endpoint's queries through `TodoRepository`, then archives todos
+completed more than --older-than-days ago in batches of --batch-size the way
+app.commands.archive_todos does, reporting throughput and the longest batch
+(how long each batch holds its row locks). After VACUUM ANALYZE the same
+queries are timed again, plus the first page with `include_archived`.
+
+Commits, unlike the other benchmarks, because archival commits per batch.
+Everything archived during the run is moved back to todo afterwards and the
+seeded users are deleted (their todos cascade).
+
+    uv run python -m benchmarks.archival --rows 1000000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import delete, text
+from sqlmodel import col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import engine
+from app.models.user import User
+from app.repositories.todo_repository import TodoRepository
+from app.schemas.mixin import utcnow_aware
+from benchmarks.common import measure, print_table, seed_todos
+
+settings = get_settings()
+
+COLUMNS = "created_at, updated_at, title, description, status, priority, due_date, id, user_id"
+
+
+async def table_size() -> str:
+    async with engine.connect() as conn:
+        rows, size = (
+            await conn.execute(
+                text("SELECT count(*), pg_size_pretty(pg_total_relation_size('todo')) FROM todo")
+            )
+        ).one()
+        return f"{rows} rows, {size}"
+
+
+async def vacuum() -> None:
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE todo"))
+        await conn.execute(text("VACUUM ANALYZE todo_archive"))
+
+
+async def time_queries(
+    session: AsyncSession, viewer_id: uuid.UUID, repeat: int, include_archived: bool = False
+) -> dict[str, dict[str, float]]:
+    repository = TodoRepository(session)
+    options = {"viewer_id": viewer_id, "include_archived": include_archived}
+    [middle] = await repository.get_todos(limit=1, offset=10_000, **options)
+
+    queries = {
+        "first page": lambda: repository.get_todos(limit=21, **options),
+        "cursor page": lambda: repository.get_todos(
+            limit=21, after=(middle.created_at, middle.id), **options
+        ),
+        "open todos": lambda: repository.get_todos(limit=21, completed=False, **options),
+        "count": lambda: repository.count_todos(include_archived=include_archived),
+        "search": lambda: repository.search_todos("garden", limit=21, **options),
+    }
+    return {name: await measure(query, repeat) for name, query in queries.items()}
+
+
+async def archive(older_than_days: int, batch_size: int) -> tuple[int, float, float]:
+    cutoff = utcnow_aware() - timedelta(days=older_than_days)
+    archived, batches = 0, []
+    async with AsyncSession(engine) as session:
+        repository = TodoRepository(session)
+        while True:
+            started = time.perf_counter()
+            owners = await repository.archive_completed(cutoff, batch_size)
+            batches.append(time.perf_counter() - started)
+            archived += len(owners)
+            if len(owners) < batch_size:
+                break
+    return archived, sum(batches), max(batches) * 1000
+
+
+async def restore(since) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                f"WITH moved AS (DELETE FROM todo_archive WHERE archived_at >= :since "
+                f"RETURNING {COLUMNS}) INSERT INTO todo ({COLUMNS}) SELECT {COLUMNS} FROM moved"
+            ),
+            {"since": since},
+        )
+
+
+async def main(rows: int, older_than_days: int, batch_size: int, repeat: int) -> None:
+    print(f"Seeding {rows} todos...")
+    async with engine.begin() as conn:
+        user_ids = await seed_todos(conn, rows)
+    started = utcnow_aware()
+    try:
+        size_before = await table_size()
+        async with AsyncSession(engine) as session:
+            before = await time_queries(session, user_ids[0], repeat)
+
+        print(f"Archiving todos completed over {older_than_days} days ago...")
+        archived, seconds, longest = await archive(older_than_days, batch_size)
+        await vacuum()
+        size_after = await table_size()
+        async with AsyncSession(engine) as session:
+            after = await time_queries(session, user_ids[0], repeat)
+            with_archive = await time_queries(session, user_ids[0], repeat, include_archived=True)
+    finally:
+        await restore(started)
+        async with engine.begin() as conn:
+            await conn.execute(delete(User).where(col(User.id).in_(user_ids)))
+    await engine.dispose()
+
+    print()
+    print(
+        f"Archived {archived} todos in {seconds:.1f}s ({archived / seconds:.0f} rows/s), "
+        f"longest batch {longest:.1f} ms"
+    )
+    # VACUUM makes the space reusable by new rows; it does not shrink the files
+    print(f"todo table: {size_before} -> {size_after}")
+    print()
+    print_table(
+        [
+            "query",
+            "before p50 ms",
+            "after p50 ms",
+            "before p95 ms",
+            "after p95 ms",
+            "with archive p50 ms",
+        ],
+        [
+            [
+                name,
+                before[name]["p50"],
+                after[name]["p50"],
+                before[name]["p95"],
+                after[name]["p95"],
+                with_archive[name]["p50"],
+            ]
+            for name in before
+        ],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--older-than-days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=settings.TODO_ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.older_than_days, args.batch_size, args.repeat))
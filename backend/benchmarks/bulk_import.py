@@ -0,0 +1,112 @@
+"""Bulk import throughput: COPY via staging vs. ORM and batch INSERTs.
+
+Each path loads generated todos for a throwaway user and reports rows per
+second. The per-row ORM path is slow, so it runs on --orm-rows only.
+
+    uv run python -m benchmarks.bulk_import --rows 200000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections.abc import AsyncIterator
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import engine
+from app.models.user import User
+from app.repositories.todo_repository import TodoRepository
+from app.schemas.todo import FileFormat, TodoCreate
+from app.services.todo_import_service import TodoImportService
+from benchmarks.common import WORDS, print_table
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def generate(rows: int) -> list[dict]:
+    return [
+        {
+            "title": " ".join(random.choices(WORDS, k=3)).capitalize(),
+            "description": "lorem ipsum " * random.randint(1, 20),
+            "priority": random.choice(["LOW", "MEDIUM", "HIGH", None]),
+        }
+        for _ in range(rows)
+    ]
+
+
+async def chunks(body: bytes) -> AsyncIterator[bytes]:
+    for start in range(0, len(body), CHUNK_SIZE):
+        yield body[start : start + CHUNK_SIZE]
+
+
+async def create_user() -> User:
+    user = User(
+        username=f"bench_{uuid.uuid4()}",
+        email=f"bench_{uuid.uuid4()}@example.com",
+        hashed_password="not-a-hash",
+    )
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(user)
+        await session.commit()
+    return user
+
+
+async def orm(user: User, todos: list[dict]) -> None:
+    async with AsyncSession(engine) as session:
+        repository = TodoRepository(session)
+        for todo in todos:
+            await repository.create_todo(user.id, TodoCreate(**todo))
+
+
+async def batch_insert(user: User, todos: list[dict]) -> None:
+    batch_size = get_settings().TODO_BATCH_MAX_SIZE
+    async with AsyncSession(engine) as session:
+        repository = TodoRepository(session)
+        for start in range(0, len(todos), batch_size):
+            batch = [TodoCreate(**todo) for todo in todos[start : start + batch_size]]
+            await repository.create_todos(user.id, batch)
+
+
+async def copy_import(user: User, todos: list[dict]) -> None:
+    body = "".join(json.dumps(todo) + "\n" for todo in todos).encode()
+    async with AsyncSession(engine) as session:
+        service = TodoImportService(TodoRepository(session))
+        result = await service.import_todos(user, chunks(body), FileFormat.NDJSON)
+    assert result.imported == len(todos), result
+
+
+async def main(rows: int, orm_rows: int) -> None:
+    todos = generate(rows)
+    user = await create_user()
+    results = []
+    try:
+        for name, func, sample in [
+            ("ORM, one commit per row", orm, todos[:orm_rows]),
+            ("batch INSERT", batch_insert, todos),
+            ("COPY via staging", copy_import, todos),
+        ]:
+            print(f"{name}: {len(sample)} rows...")
+            start = time.perf_counter()
+            await func(user, sample)
+            elapsed = time.perf_counter() - start
+            results.append([name, len(sample), elapsed, round(len(sample) / elapsed)])
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text('DELETE FROM "user" WHERE id = :id'), {"id": user.id})
+
+    print()
+    print_table(["path", "rows", "seconds", "rows/s"], results)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--orm-rows", type=int, default=2_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.orm_rows))
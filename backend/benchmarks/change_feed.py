@@ -0,0 +1,171 @@
+"""Change feed fan-out: delivery latency and memory per connected client.
+
+Drives the app in-process: for each --clients level, opens that many
+GET /todos/events streams through the ASGI app (no sockets), then creates
+--events todos one at a time and times each event's arrival at every client,
+from the start of the write that caused it. All clients share the worker's
+single LISTEN connection; the memory column is the growth in resident size
+per client while they are connected.
+
+    uv run python -m benchmarks.change_feed --clients 100 1000 5000 --events 50
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete
+
+from app.core.change_feed import change_feed
+from app.core.security import password_executor
+from app.db.session import engine
+from app.main import app
+from app.models.user import User
+from benchmarks.common import print_table, summarize
+
+PASSWORD = "Password123!"
+EVENTS_URL = "/api/v1/todos/events"
+
+
+def resident_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * 4096
+
+
+class Client:
+    """An SSE request driven straight through ASGI, recording when each
+    event arrives."""
+
+    def __init__(self, authorization: str, disconnected: asyncio.Event):
+        self.authorization = authorization
+        self.disconnected = disconnected
+        self.arrivals: list[float] = []
+        self.status = 0
+
+    async def run(self) -> None:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": EVENTS_URL,
+            "raw_path": EVENTS_URL.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"authorization", self.authorization.encode())],
+            "server": ("bench", 80),
+            "client": ("bench", 1234),
+        }
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await self.disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                self.status = message["status"]
+            elif message["type"] == "http.response.body" and message["body"].startswith(b"id:"):
+                self.arrivals.append(time.perf_counter())
+
+        await app(scope, receive, send)
+
+
+async def run_level(
+    http: AsyncClient, headers: dict[str, str], clients: int, events: int, interval: float
+) -> list:
+    disconnected = asyncio.Event()
+    before = resident_bytes()
+    streams = [Client(headers["Authorization"], disconnected) for _ in range(clients)]
+    tasks = [asyncio.create_task(stream.run()) for stream in streams]
+    while len(change_feed.subscribers) < clients:
+        if any(task.done() for task in tasks):
+            statuses = {stream.status for stream in streams}
+            raise SystemExit(f"A client could not connect (status {statuses})")
+        await asyncio.sleep(0.01)
+    per_client = (resident_bytes() - before) / clients
+
+    started = []
+    for index in range(events):
+        started.append(time.perf_counter())
+        response = await http.post(
+            "/api/v1/todos", json={"title": f"Event {index}", "description": ""}, headers=headers
+        )
+        response.raise_for_status()
+        await asyncio.sleep(interval)
+    deadline = time.perf_counter() + 10
+    while any(len(stream.arrivals) < events for stream in streams):
+        if time.perf_counter() > deadline:
+            break
+        await asyncio.sleep(0.01)
+    disconnected.set()
+    await asyncio.gather(*tasks)
+
+    # Events arrive in commit order, and the writes are sequential
+    delivered = [
+        (arrival - started[index]) * 1000
+        for stream in streams
+        for index, arrival in enumerate(stream.arrivals[:events])
+    ]
+    # Time until the last client had each event
+    complete = [
+        (max(stream.arrivals[index] for stream in streams) - started[index]) * 1000
+        for index in range(min(len(stream.arrivals) for stream in streams))
+    ]
+    latency = summarize(delivered)
+    missing = clients * events - len(delivered)
+    return [
+        clients,
+        latency["p50"],
+        latency["p99"],
+        summarize(complete)["p99"] if complete else 0.0,
+        missing,
+        per_client / 1024,
+    ]
+
+
+async def main(levels: list[int], events: int, interval: float) -> None:
+    username = f"bench_{uuid.uuid4().hex[:8]}"
+    change_feed.max_subscribers = max(levels)
+    results = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as http:
+        response = await http.post(
+            "/api/v1/auth/register", json={"username": username, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        try:
+            response = await http.post(
+                "/api/v1/auth/login", json={"username": username, "password": PASSWORD}
+            )
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            for clients in levels:
+                print(f"{clients} clients, {events} events...")
+                results.append(await run_level(http, headers, clients, events, interval))
+        finally:
+            await change_feed.stop()
+            async with engine.begin() as conn:
+                await conn.execute(delete(User).where(User.username == username))
+    await engine.dispose()
+    password_executor.shutdown()
+
+    print()
+    print_table(
+        ["clients", "p50 ms", "p99 ms", "all clients p99 ms", "missing", "KiB/client"],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--events", type=int, default=50, help="todos created per level")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between writes")
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.events, args.interval))
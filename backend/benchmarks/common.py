@@ -0,0 +1,124 @@
+"""Shared helpers for the benchmark scripts."""
+
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.seeds.generate import WORDS
+
+
+async def seed_todos(conn: AsyncConnection, rows: int, users: int = 1) -> list[uuid.UUID]:
+    """Insert `users` users and `rows` todos spread over the last year.
+
+    Titles are three random words from `WORDS`. Runs as set-based SQL so a
+    million rows take seconds, and analyzes the tables afterwards.
+    """
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    await conn.execute(
+        text(
+            'INSERT INTO "user" (id, username, email, status, hashed_password, '
+            "created_at, updated_at) "
+            "SELECT u, 'bench_' || u, 'bench_' || u || '@example.com', 'ACTIVE', "
+            "'not-a-hash', now(), now() FROM unnest(CAST(:ids AS uuid[])) AS u"
+        ),
+        {"ids": user_ids},
+    )
+    await conn.execute(
+        text(
+            "INSERT INTO todo (id, user_id, title, description, status, priority, "
+            "created_at, updated_at) "
+            "SELECT gen_random_uuid(), "
+            "(CAST(:ids AS uuid[]))[1 + floor(random() * :users)::int], "
+            "initcap(w[1 + floor(random() * cardinality(w))::int] || ' ' || "
+            "w[1 + floor(random() * cardinality(w))::int] || ' ' || "
+            "w[1 + floor(random() * cardinality(w))::int]), "
+            "repeat('lorem ipsum ', 1 + floor(random() * 20)::int), "
+            "(ARRAY['NOT_STARTED', 'IN_PROGRESS', 'COMPLETED'])"
+            "[1 + floor(random() * 3)::int]::todostatus, "
+            "(ARRAY['LOW', 'MEDIUM', 'HIGH'])[1 + floor(random() * 3)::int]::priority, "
+            "ts, ts "
+            "FROM generate_series(1, :rows), "
+            "LATERAL (SELECT now() - random() * interval '365 days' AS ts) t, "
+            "(SELECT CAST(:words AS text[]) AS w) words"
+        ),
+        {"ids": user_ids, "users": users, "rows": rows, "words": WORDS},
+    )
+    await conn.execute(text('ANALYZE "user"'))
+    await conn.execute(text("ANALYZE todo"))
+    return user_ids
+
+
+async def call(app, path: str, query_string: bytes = b"") -> bytes:
+    """GET `path` from an ASGI app directly, without a client, returning the body."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [],
+        "server": ("test", 80),
+        "client": ("test", 1234),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    body = []
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def measure(
+    func: Callable[[], Awaitable[Any]], repeat: int, warmup: int = 2
+) -> dict[str, float]:
+    """Run `func` and return latency percentiles in milliseconds."""
+    for _ in range(warmup):
+        await func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples_ms: list[float]) -> dict[str, float]:
+    ordered = sorted(samples_ms)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "p50": pct(50),
+        "p95": pct(95),
+        "p99": pct(99),
+        "mean": statistics.fmean(ordered),
+        "max": ordered[-1],
+    }
+
+
+def print_table(headers: list[str], rows: list[list[Any]]) -> None:
+    cells = [headers] + [
+        [f"{value:.2f}" if isinstance(value, float) else str(value) for value in row]
+        for row in rows
+    ]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for index, row in enumerate(cells):
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+        if index == 0:
+            print("  ".join("-" * width for width in widths))
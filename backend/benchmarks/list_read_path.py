@@ -0,0 +1,127 @@
+"""Todo list throughput: ORM objects and response_model vs. Core rows and orjson.
+
+Both apps serve the same first page of todos in cursor mode (newest first,
+no COUNT, other users' descriptions hidden) from the same seeded data:
+
+- orm: the previous read path. Todo objects are hydrated, validated into
+  TodoRead, then checked against the TodoPage response_model and encoded
+  by FastAPI's JSON encoder
+- rows: TodoService.get_todos, plain rows rendered by TimedORJSONResponse
+
+Requests go straight to the ASGI apps, one at a time, so requests per second
+are CPU cost plus database round trips. The page size is not capped at 100
+here, unlike the API.
+
+    uv run python -m benchmarks.list_read_path --rows 20000 --seconds 5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import UTC, datetime
+
+from fastapi import APIRouter, FastAPI
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.pagination import encode_cursor
+from app.db.session import engine
+from app.middleware.metrics import TimedJSONResponse, TimedORJSONResponse, TimedRoute
+from app.models.todo import Todo
+from app.models.user import User
+from app.repositories.todo_repository import TodoRepository
+from app.schemas.todo import TodoPage, TodoRead
+from app.services.todo_service import TodoService
+from benchmarks.common import call, print_table, seed_todos
+
+PAGE_SIZES = [20, 100, 500]
+# Sorts after every todo, so the first page is fetched in cursor mode
+FIRST_CURSOR = encode_cursor(datetime.max.replace(tzinfo=UTC), uuid.UUID(int=2**128 - 1))
+
+
+def build_app(conn: AsyncConnection, viewer: User) -> FastAPI:
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/orm", response_model=TodoPage)
+    async def orm_page(page_size: int):
+        session = AsyncSession(bind=conn)
+        statement = (
+            select(Todo)
+            .order_by(col(Todo.created_at).desc(), col(Todo.id).desc())
+            .limit(page_size + 1)
+        )
+        todos = list((await session.exec(statement)).all())
+        items = []
+        for todo in todos[:page_size]:
+            item = TodoRead.model_validate(todo)
+            if todo.user_id != viewer.id:
+                item.description = None
+            items.append(item)
+        last = todos[page_size - 1]
+        return TodoPage(
+            items=items,
+            page_size=page_size,
+            page=None,
+            total=None,
+            next_cursor=encode_cursor(last.created_at, last.id),
+        )
+
+    @router.get("/rows", response_model=TodoPage)
+    async def rows_page(page_size: int):
+        service = TodoService(TodoRepository(AsyncSession(bind=conn)))
+        page = await service.get_todos(viewer, page_size=page_size, cursor=FIRST_CURSOR)
+        return TimedORJSONResponse(page)
+
+    app = FastAPI(default_response_class=TimedJSONResponse)
+    app.include_router(router)
+    return app
+
+
+async def requests_per_second(app: FastAPI, path: str, page_size: int, seconds: float) -> float:
+    query = f"page_size={page_size}".encode()
+    for _ in range(5):
+        await call(app, path, query)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        await call(app, path, query)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+async def main(rows: int, seconds: float) -> None:
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            print(f"Seeding {rows} todos...")
+            user_ids = await seed_todos(conn, rows, users=2)
+            viewer = User(id=user_ids[0], username="viewer", hashed_password="")
+            app = build_app(conn, viewer)
+
+            results = []
+            for page_size in PAGE_SIZES:
+                query = f"page_size={page_size}".encode()
+                orm_body = json.loads(await call(app, "/orm", query))
+                rows_body = json.loads(await call(app, "/rows", query))
+                assert orm_body == rows_body, f"bodies differ at page_size={page_size}"
+
+                orm = await requests_per_second(app, "/orm", page_size, seconds)
+                core = await requests_per_second(app, "/rows", page_size, seconds)
+                results.append([page_size, orm, core, f"{core / orm:.2f}x"])
+        finally:
+            await transaction.rollback()
+
+    print()
+    print_table(["page size", "orm req/s", "rows req/s", "speedup"], results)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--seconds", type=float, default=5, help="per page size and path")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.seconds))
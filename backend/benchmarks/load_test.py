@@ -0,0 +1,306 @@
+"""Load test: throughput and latency percentiles per endpoint.
+
+Seed a dataset first; workers log in as its users (seed_0, seed_1, ...), so
+the heaviest users are the ones under load:
+
+    uv run python -m app.seeds.generate --users 1000 --todos 1000000 --drop-indexes
+    uv run python -m benchmarks.load_test --concurrency 32 --seconds 10 --output run.json
+    uv run python -m benchmarks.load_test --compare baseline.json --output run.json
+
+Each scenario runs on its own for --seconds, with --concurrency workers sending
+requests back to back. Without --base-url the app is driven in-process through
+ASGI, so client and server share one event loop: compare runs against each
+other, not against a real deployment. With --base-url requests go over HTTP to
+a running server, e.g. uvicorn app.main:app --workers 4.
+
+--output writes the results as JSON (scenario stats plus run metadata such as
+the git commit and dataset size); --compare prints the change against such a
+file from an earlier run.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+from httpx import ASGITransport, AsyncClient, Response
+from sqlalchemy import delete, func, select
+from sqlmodel import col
+
+from app.core.security import password_executor
+from app.db.session import engine
+from app.main import app
+from app.models.todo import Todo
+from app.models.user import User
+from app.seeds.generate import DEFAULT_PASSWORD, WORDS
+from benchmarks.common import print_table, summarize
+
+API = "/api/v1"
+SCENARIOS = ["register", "login", "list", "search", "stats", "create", "get", "update", "delete"]
+
+
+@dataclass
+class Worker:
+    """A client session: one seeded user and the todos it created."""
+
+    client: AsyncClient
+    username: str
+    headers: dict[str, str] = field(default_factory=dict)
+    todo_ids: list[str] = field(default_factory=list)
+
+
+def new_username(run_id: str) -> str:
+    return f"load_{run_id}_{uuid.uuid4().hex[:12]}"
+
+
+async def register(worker: Worker, run_id: str) -> Response:
+    username = new_username(run_id)
+    body = {"username": username, "email": f"{username}@example.com", "password": DEFAULT_PASSWORD}
+    return await worker.client.post(f"{API}/auth/register", json=body)
+
+
+async def login(worker: Worker, run_id: str) -> Response:
+    return await worker.client.post(
+        f"{API}/auth/login", json={"username": worker.username, "password": DEFAULT_PASSWORD}
+    )
+
+
+async def list_todos(worker: Worker, run_id: str) -> Response:
+    params = {"page": random.randint(1, 5), "page_size": 20}
+    return await worker.client.get(f"{API}/todos", params=params, headers=worker.headers)
+
+
+async def search(worker: Worker, run_id: str) -> Response:
+    params = {"search": random.choice(WORDS)}
+    return await worker.client.get(f"{API}/todos", params=params, headers=worker.headers)
+
+
+async def stats(worker: Worker, run_id: str) -> Response:
+    return await worker.client.get(f"{API}/todos/stats", headers=worker.headers)
+
+
+async def create(worker: Worker, run_id: str) -> Response:
+    body = {
+        "title": " ".join(random.choices(WORDS, k=3)).capitalize(),
+        "description": "Created by the load test",
+        "priority": random.choice(["LOW", "MEDIUM", "HIGH"]),
+    }
+    response = await worker.client.post(f"{API}/todos", json=body, headers=worker.headers)
+    if response.status_code == 201:
+        worker.todo_ids.append(response.json()["id"])
+    return response
+
+
+async def get(worker: Worker, run_id: str) -> Response:
+    todo_id = random.choice(worker.todo_ids)
+    return await worker.client.get(f"{API}/todos/{todo_id}", headers=worker.headers)
+
+
+async def update(worker: Worker, run_id: str) -> Response:
+    todo_id = random.choice(worker.todo_ids)
+    body = {"status": random.choice(["NOT_STARTED", "IN_PROGRESS", "COMPLETED"])}
+    return await worker.client.patch(f"{API}/todos/{todo_id}", json=body, headers=worker.headers)
+
+
+async def delete_todo(worker: Worker, run_id: str) -> Response | None:
+    if not worker.todo_ids:
+        return None
+    todo_id = worker.todo_ids.pop()
+    return await worker.client.delete(f"{API}/todos/{todo_id}", headers=worker.headers)
+
+
+Scenario = Callable[[Worker, str], Awaitable[Response | None]]
+SCENARIO_FUNCS: dict[str, Scenario] = {
+    "register": register,
+    "login": login,
+    "list": list_todos,
+    "search": search,
+    "stats": stats,
+    "create": create,
+    "get": get,
+    "update": update,
+    "delete": delete_todo,
+}
+# Scenarios working on todos the worker created itself
+NEEDS_TODOS = {"get", "update", "delete"}
+
+
+async def run_scenario(
+    name: str, workers: list[Worker], seconds: float, run_id: str
+) -> dict[str, float]:
+    scenario = SCENARIO_FUNCS[name]
+    samples: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def loop(worker: Worker) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await scenario(worker, run_id)
+            if response is None:
+                return
+            samples.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(loop(worker) for worker in workers))
+    elapsed = time.perf_counter() - started
+    if not samples:
+        return {"requests": 0, "errors": 0, "throughput_rps": 0.0}
+    latency = summarize(samples)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": (len(samples) - errors) / elapsed,
+        **{f"{stat}_ms": value for stat, value in latency.items()},
+    }
+
+
+async def start_workers(
+    client: AsyncClient, concurrency: int, prefix: str, users: int
+) -> list[Worker]:
+    workers = [Worker(client, f"{prefix}{index % users}") for index in range(concurrency)]
+    for worker in workers:
+        response = await login(worker, "")
+        if response.status_code != 200:
+            sys.exit(
+                f"Cannot log in as {worker.username} ({response.status_code}); "
+                "seed a dataset with python -m app.seeds.generate first"
+            )
+        worker.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return workers
+
+
+async def dataset_size(prefix: str) -> dict[str, int]:
+    async with engine.connect() as conn:
+        users = await conn.scalar(
+            select(func.count()).select_from(User).where(func.starts_with(User.username, prefix))
+        )
+        todos = await conn.scalar(select(func.count()).select_from(Todo))
+    return {"seed_users": users, "todos": todos}
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def print_comparison(baseline: dict, results: dict) -> None:
+    rows = []
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if not previous or not previous.get("requests") or not current.get("requests"):
+            continue
+        row = [name]
+        for stat in ("throughput_rps", "p95_ms", "p99_ms"):
+            change = (current[stat] - previous[stat]) / previous[stat] * 100
+            row += [previous[stat], current[stat], f"{change:+.1f}%"]
+        rows.append(row)
+    print(f"\nCompared with {baseline['run'].get('git_commit')} ({baseline['run']['started_at']})")
+    headers = ["scenario"]
+    for stat in ("rps", "p95", "p99"):
+        headers += [f"{stat} was", stat, "change"]
+    print_table(headers, rows)
+
+
+async def main(args: argparse.Namespace) -> None:
+    run_id = uuid.uuid4().hex[:8]
+    dataset = await dataset_size(args.prefix)
+    if not dataset["seed_users"]:
+        sys.exit(f"No users named {args.prefix}*; run python -m app.seeds.generate first")
+
+    if args.base_url:
+        client = AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://load-test")
+    results = {
+        "run": {
+            "started_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "target": args.base_url or "in-process",
+            "concurrency": args.concurrency,
+            "seconds": args.seconds,
+            "python": platform.python_version(),
+            "dataset": dataset,
+        },
+        "scenarios": {},
+    }
+    workers: list[Worker] = []
+    try:
+        async with client:
+            workers = await start_workers(
+                client, args.concurrency, args.prefix, dataset["seed_users"]
+            )
+            # SCENARIOS order: create makes the todos get, update and delete use
+            selected = set(args.scenarios)
+            if selected & NEEDS_TODOS:
+                selected.add("create")
+            for name in [name for name in SCENARIOS if name in selected]:
+                if name in NEEDS_TODOS and not any(worker.todo_ids for worker in workers):
+                    print(f"{name}: skipped, no todos were created", file=sys.stderr)
+                    continue
+                print(f"{name}: {args.seconds}s at concurrency {args.concurrency}...")
+                stats = await run_scenario(name, workers, args.seconds, run_id)
+                results["scenarios"][name] = stats
+    finally:
+        # Users registered by the run, and todos created and not deleted by it
+        async with engine.begin() as conn:
+            await conn.execute(delete(User).where(col(User.username).startswith(f"load_{run_id}_")))
+            leftovers = [todo_id for worker in workers for todo_id in worker.todo_ids]
+            if leftovers:
+                await conn.execute(delete(Todo).where(col(Todo.id).in_(leftovers)))
+        await engine.dispose()
+        password_executor.shutdown()
+
+    print()
+    latency_stats = ["p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    print_table(
+        ["scenario", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms", "max ms"],
+        [
+            [name, stats["requests"], stats["errors"], stats["throughput_rps"]]
+            + [stats.get(stat, 0.0) for stat in latency_stats]
+            for name, stats in results["scenarios"].items()
+        ],
+    )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        print_comparison(json.loads(args.compare.read_text()), results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10, help="per scenario")
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=SCENARIOS,
+        help=f"comma-separated subset of {','.join(SCENARIOS)}",
+    )
+    parser.add_argument("--base-url", help="run against a server instead of in-process")
+    parser.add_argument("--prefix", default="seed_", help="username prefix of the dataset")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--compare", type=Path, help="JSON results of an earlier run")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    asyncio.run(main(args))
@@ -0,0 +1,90 @@
+"""Latency of an unrelated endpoint while a login storm is running.
+
+Drives the app in-process: `--logins` concurrent clients hammer
+POST /auth/login while a probe requests GET /health every few milliseconds.
+Runs once with Argon2 inline on the event loop (the old behaviour) and once
+per executor mode, and reports probe latency for each.
+
+    uv run python -m benchmarks.login_storm --logins 32 --seconds 5
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete
+
+from app.core import security
+from app.core.security import PasswordExecutor
+from app.db.session import engine
+from app.main import app
+from app.models.user import User
+from benchmarks.common import print_table, summarize
+
+PASSWORD = "Password123!"
+PROBE_INTERVAL = 0.01
+
+
+async def storm(
+    client: AsyncClient, username: str, seconds: float, logins_concurrency: int
+) -> dict[str, float]:
+    deadline = time.perf_counter() + seconds
+    logins = 0
+
+    async def login_loop() -> None:
+        nonlocal logins
+        while time.perf_counter() < deadline:
+            response = await client.post(
+                "/api/v1/auth/login", json={"username": username, "password": PASSWORD}
+            )
+            if response.status_code == 200:
+                logins += 1
+
+    async def probe() -> list[float]:
+        # Latency is measured from the scheduled send time, so time the probe
+        # spent waiting for a blocked event loop counts too.
+        samples = []
+        scheduled = time.perf_counter()
+        while scheduled < deadline:
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            await client.get("/health")
+            samples.append((time.perf_counter() - scheduled) * 1000)
+            scheduled += PROBE_INTERVAL
+        return samples
+
+    *_, samples = await asyncio.gather(*(login_loop() for _ in range(logins_concurrency)), probe())
+    return {**summarize(samples), "logins/s": logins / seconds}
+
+
+async def main(modes: list[str], seconds: float, workers: int, logins: int) -> None:
+    username = f"bench_{uuid.uuid4().hex[:8]}"
+    results = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        response = await client.post(
+            "/api/v1/auth/register", json={"username": username, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        try:
+            for mode in modes:
+                security.password_executor = PasswordExecutor(mode, workers, max_queue=logins * 2)
+                stats = await storm(client, username, seconds, logins)
+                security.password_executor.shutdown()
+                results.append([mode, stats["p50"], stats["p99"], stats["max"], stats["logins/s"]])
+        finally:
+            async with engine.begin() as conn:
+                await conn.execute(delete(User).where(User.username == username))
+    await engine.dispose()
+
+    print_table(["hashing", "p50 ms", "p99 ms", "max ms", "logins/s"], results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login clients")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=0, help="0 = one per CPU")
+    parser.add_argument("--modes", nargs="+", default=["inline", "thread", "process"])
+    args = parser.parse_args()
+    asyncio.run(main(args.modes, args.seconds, args.workers, args.logins))
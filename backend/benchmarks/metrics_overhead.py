@@ -0,0 +1,111 @@
+"""Per-request cost of the metrics middleware and stage timing hooks.
+
+Each case runs the same work with and without instrumentation and reports
+microseconds per call (best of five rounds); the difference is the overhead:
+
+- middleware: MetricsMiddleware around a bare ASGI app
+- route: a FastAPI route returning 100 items, with TimedRoute and
+  TimedJSONResponse vs. the stock APIRoute and JSONResponse
+- query: SELECT 1 on an engine with the query accounting hooks vs. without
+
+    uv run python -m benchmarks.metrics_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import get_settings
+from app.core.timing import RequestTimings, current_timings
+from app.db.instrumentation import instrument_engine, track_queries
+from app.middleware.metrics import MetricsMiddleware, TimedJSONResponse, TimedRoute
+from benchmarks.common import call, print_table
+
+ROUNDS = 5
+ITEMS = [{"id": i, "title": f"Todo {i}", "completed": i % 2 == 0} for i in range(100)]
+
+
+async def bare_app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def route_app(route_class: type[APIRoute], response_class: type[JSONResponse]) -> FastAPI:
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/items")
+    async def items() -> list[dict]:
+        return ITEMS
+
+    app = FastAPI(default_response_class=response_class)
+    app.include_router(router)
+    return app
+
+
+async def per_call_us(func, count: int, rounds: int = ROUNDS) -> float:
+    """Best of `rounds` runs, which filters out scheduler and GC noise."""
+    for _ in range(min(count // 10, 1000)):
+        await func()
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(count):
+            await func()
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1_000_000
+
+
+async def query_us(count: int, instrumented: bool) -> float:
+    url = get_settings().DATABASE_URL
+    query_engine = create_async_engine(url)
+    if instrumented:
+        instrument_engine(query_engine)
+    token = current_timings.set(RequestTimings())
+    try:
+        with track_queries():
+            async with query_engine.connect() as conn:
+
+                async def select_one():
+                    await conn.execute(text("SELECT 1"))
+
+                return await per_call_us(select_one, count)
+    finally:
+        current_timings.reset(token)
+        await query_engine.dispose()
+
+
+async def main(requests: int, queries: int) -> None:
+    plain_route = route_app(APIRoute, JSONResponse)
+    timed_route = MetricsMiddleware(route_app(TimedRoute, TimedJSONResponse))
+    timed_bare = MetricsMiddleware(bare_app)
+    cases = [
+        (
+            "middleware",
+            await per_call_us(lambda: call(bare_app, "/"), requests),
+            await per_call_us(lambda: call(timed_bare, "/"), requests),
+        ),
+        (
+            "route, 100 items",
+            await per_call_us(lambda: call(plain_route, "/items"), requests),
+            await per_call_us(lambda: call(timed_route, "/items"), requests),
+        ),
+        ("query, SELECT 1", await query_us(queries, False), await query_us(queries, True)),
+    ]
+    print_table(
+        ["case", "plain us", "instrumented us", "overhead us"],
+        [[name, plain, timed, timed - plain] for name, plain, timed in cases],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=5_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.queries))
@@ -0,0 +1,188 @@
+"""Overload test: latency of admitted requests with admission control on and off.
+
+Seed a dataset first, as for the load test:
+
+    uv run python -m app.seeds.generate --users 1000 --todos 1000000 --drop-indexes
+    uv run python -m benchmarks.overload --seconds 10 --overload 3
+
+First the capacity is measured: --concurrency workers send a mix of logins
+(critical), stats (normal) and list pages (low priority) back to back.
+Requests then arrive open-loop, at --overload times that rate whatever the
+responses, once with admission control and once without. Without it the
+excess waits for a pool connection (up to DATABASE_POOL_TIMEOUT) and latency
+grows for as long as the overload lasts; with it the excess gets 503 and what
+is admitted keeps its latency. The response cache is turned off so every
+request reaches the database.
+
+The limit that keeps latency low depends on the machine: when the CPU rather
+than the pool is the bottleneck, set it below the pool size, e.g.
+
+    ADMISSION_MAX_CONCURRENCY=4 ADMISSION_QUEUE_TIMEOUT=0.5 ADMISSION_MAX_QUEUE=8 \
+        uv run python -m benchmarks.overload --concurrency 4
+
+With --base-url requests go to a running server, whose admission setting
+cannot be switched from here: only the capacity and one overloaded run are
+measured.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+
+from httpx import ASGITransport, AsyncClient, Response
+
+from app.core.response_cache import response_cache
+from app.core.security import password_executor
+from app.db.session import engine
+from app.main import app
+from app.middleware import admission
+from benchmarks.common import print_table, summarize
+from benchmarks.load_test import (
+    Worker,
+    dataset_size,
+    list_todos,
+    login,
+    start_workers,
+    stats,
+)
+
+# (share of requests, priority label, scenario). Logins are few: Argon2 is
+# CPU-bound, and admission control only guards the connection pool
+MIX = [(0.02, "critical", login), (0.49, "normal", stats), (0.49, "low", list_todos)]
+
+
+def pick_scenario():
+    value = random.random()
+    for share, label, scenario in MIX:
+        if value < share:
+            return label, scenario
+        value -= share
+    return MIX[-1][1:]
+
+
+async def measure_capacity(workers: list[Worker], seconds: float, run_id: str) -> float:
+    """Requests per second served by `workers` sending the mix back to back."""
+    completed = 0
+    deadline = time.perf_counter() + seconds
+
+    async def loop(worker: Worker) -> None:
+        nonlocal completed
+        while time.perf_counter() < deadline:
+            _, scenario = pick_scenario()
+            response = await scenario(worker, run_id)
+            completed += response.status_code < 400
+
+    started = time.perf_counter()
+    await asyncio.gather(*(loop(worker) for worker in workers))
+    return completed / (time.perf_counter() - started)
+
+
+async def open_loop(workers: list[Worker], rate: float, seconds: float, run_id: str) -> dict:
+    """Send requests at `rate` per second for `seconds`, and wait for them all.
+
+    Returns the latencies of successes and the count of 503s and other
+    errors per priority, plus the elapsed time including the stragglers.
+    """
+    results: dict = {label: {"ok": [], "rejected": 0, "errors": 0} for _, label, _ in MIX}
+
+    async def send(worker: Worker) -> None:
+        label, scenario = pick_scenario()
+        start = time.perf_counter()
+        response: Response = await scenario(worker, run_id)
+        result = results[label]
+        if response.status_code == 503:
+            result["rejected"] += 1
+        elif response.status_code >= 400:
+            result["errors"] += 1
+        else:
+            result["ok"].append((time.perf_counter() - start) * 1000)
+
+    tasks = []
+    started = time.perf_counter()
+    for index in range(int(rate * seconds)):
+        # Poisson arrivals would be burstier; a fixed schedule keeps runs comparable
+        delay = started + index / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(workers[index % len(workers)])))
+    await asyncio.gather(*tasks)
+    results["elapsed"] = time.perf_counter() - started
+    return results
+
+
+def result_rows(name: str, results: dict) -> list[list]:
+    rows = []
+    for _, label, _ in MIX:
+        result = results[label]
+        ok = result["ok"]
+        latency = summarize(ok) if ok else {"p50": 0.0, "p99": 0.0, "max": 0.0}
+        rows.append(
+            [
+                name,
+                label,
+                len(ok),
+                result["rejected"],
+                result["errors"],
+                len(ok) / results["elapsed"],
+                latency["p50"],
+                latency["p99"],
+                latency["max"],
+            ]
+        )
+    return rows
+
+
+async def main(args: argparse.Namespace) -> None:
+    run_id = uuid.uuid4().hex[:8]
+    dataset = await dataset_size(args.prefix)
+    if not dataset["seed_users"]:
+        sys.exit(f"No users named {args.prefix}*; run python -m app.seeds.generate first")
+
+    if args.base_url:
+        client = AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        client = AsyncClient(
+            transport=ASGITransport(app=app, raise_app_exceptions=False), base_url="http://overload"
+        )
+        response_cache.ttl = 0
+    rows = []
+    try:
+        async with client:
+            # Enough sessions that requests in flight at once rarely share one
+            workers = await start_workers(
+                client, args.concurrency * 4, args.prefix, dataset["seed_users"]
+            )
+            # Closed-loop workers cannot overload the server; 503s would only skew this
+            admission.settings.ADMISSION_CONTROL = False
+            capacity = await measure_capacity(workers[: args.concurrency], args.seconds, run_id)
+            rate = capacity * args.overload
+            print(f"capacity {capacity:.1f} req/s; sending {rate:.1f} req/s")
+            runs = [("server", None)] if args.base_url else [("on", True), ("off", False)]
+            for name, enabled in runs:
+                if enabled is not None:
+                    admission.settings.ADMISSION_CONTROL = enabled
+                print(f"admission {name}: {args.seconds}s at {rate:.1f} req/s...")
+                results = await open_loop(workers, rate, args.seconds, run_id)
+                rows += result_rows(name, results)
+    finally:
+        await engine.dispose()
+        password_executor.shutdown()
+
+    print()
+    print_table(
+        ["admission", "priority", "ok", "503", "errors", "ok/s", "p50 ms", "p99 ms", "max ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16, help="to measure capacity")
+    parser.add_argument("--seconds", type=float, default=10, help="per run")
+    parser.add_argument("--overload", type=float, default=3, help="multiple of capacity")
+    parser.add_argument("--base-url", help="run against a server instead of in-process")
+    parser.add_argument("--prefix", default="seed_", help="username prefix of the dataset")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,82 @@
+"""Indexed title search vs. the naive ILIKE scan.
+
+The naive path is the pre-index query: `title ILIKE '%q%'` ordered by
+created_at, with bitmap scans disabled so Postgres cannot use the trigram
+index. The indexed paths go through `TodoRepository.search_todos`.
+
+    uv run python -m benchmarks.title_search --rows 1000000
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import engine
+from app.models.todo import Todo
+from app.repositories.todo_repository import TodoRepository
+from app.schemas.todo import SearchMode
+from benchmarks.common import measure, print_table, seed_todos
+
+QUERIES = ["garden", "quarterly invoice", "eploy", "zzz-no-match"]
+
+
+async def main(rows: int, repeat: int, page_size: int) -> None:
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            print(f"Seeding {rows} todos...")
+            (viewer_id,) = await seed_todos(conn, rows)
+            session = AsyncSession(bind=conn)
+            repository = TodoRepository(session)
+
+            results = []
+            for query in QUERIES:
+
+                async def naive() -> None:
+                    await session.exec(text("SET LOCAL enable_bitmapscan = off"))
+                    statement = (
+                        select(Todo)
+                        .where(col(Todo.title).ilike(f"%{query}%"))
+                        .order_by(col(Todo.created_at).desc(), col(Todo.id).desc())
+                        .limit(page_size)
+                    )
+                    await session.exec(statement)
+                    await session.exec(text("SET LOCAL enable_bitmapscan = on"))
+
+                async def substring() -> None:
+                    await repository.search_todos(query, viewer_id=viewer_id, limit=page_size)
+
+                async def words() -> None:
+                    await repository.search_todos(
+                        query,
+                        viewer_id=viewer_id,
+                        limit=page_size,
+                        search_mode=SearchMode.WORDS,
+                    )
+
+                for name, func in [
+                    ("naive ILIKE", naive),
+                    ("trigram", substring),
+                    ("full-text", words),
+                ]:
+                    stats = await measure(func, repeat)
+                    results.append([query, name, stats["p50"], stats["p95"], stats["max"]])
+                    session.expunge_all()
+        finally:
+            await transaction.rollback()
+
+    print()
+    print_table(["query", "path", "p50 ms", "p95 ms", "max ms"], results)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat, args.page_size))
@@ -0,0 +1,84 @@
+"""GET /users: the unbounded list it used to return vs. keyset pages.
+
+Seeds --users users (5% suspended) in a transaction that is rolled back, then
+times UserService.get_users plus rendering for typical requests, and reports
+the response size. The "everything" row is the previous endpoint: every user
+loaded as an ORM object, validated into UserRead and JSON-encoded.
+
+    uv run python -m benchmarks.user_listing --users 100000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.pagination import encode_cursor
+from app.db.session import engine
+from app.middleware.metrics import TimedORJSONResponse
+from app.models.user import User, UserStatus
+from app.repositories.user_repository import UserRepository
+from app.schemas.user import UserRead, UserView
+from app.services.user_service import UserService
+from benchmarks.common import measure, print_table, seed_todos
+
+CASES = [
+    ("first page", {}),
+    ("first page, 100", {"page_size": 100}),
+    ("deep page", {"cursor": encode_cursor("bench_8")}),
+    ("prefix bench_ab", {"username_prefix": "bench_ab"}),
+    ("suspended", {"user_status": UserStatus.SUSPENDED}),
+    ("summary, 100", {"page_size": 100, "view": UserView.SUMMARY}),
+]
+
+
+async def main(users: int, repeat: int) -> None:
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            print(f"Seeding {users} users...")
+            await seed_todos(conn, 0, users=users)
+            await conn.execute(
+                text("UPDATE \"user\" SET status = 'SUSPENDED' WHERE random() < 0.05")
+            )
+            await conn.execute(text('ANALYZE "user"'))
+            service = UserService(UserRepository(AsyncSession(bind=conn)))
+
+            async def everything() -> bytes:
+                session = AsyncSession(bind=conn)
+                rows = (await session.exec(select(User))).all()
+                items = [UserRead.model_validate(user) for user in rows]
+                return json.dumps(jsonable_encoder(items)).encode()
+
+            # Tens of seconds at 100k users (mostly EmailStr validation): run once
+            start = time.perf_counter()
+            body = await everything()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            results = [["everything", len(body), elapsed_ms, elapsed_ms]]
+            for name, params in CASES:
+
+                async def page() -> bytes:
+                    return TimedORJSONResponse(await service.get_users(**params)).body
+
+                body = await page()
+                stats = await measure(page, repeat)
+                results.append([name, len(body), stats["p50"], stats["p95"]])
+        finally:
+            await transaction.rollback()
+
+    print()
+    print_table(["request", "bytes", "p50 ms", "p95 ms"], results)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.repeat))
@@ -0,0 +1,182 @@
+"""Throughput against worker count, through the production launcher.
+
+Seed a dataset first, as for the load test:
+
+    uv run python -m app.seeds.generate --users 1000 --todos 1000000 --drop-indexes
+    uv run python -m benchmarks.workers --workers 1,2,4,8 --concurrency 32 --seconds 10
+
+For each worker count, `python -m app.server` is started on --port with this
+environment (so DATABASE_MAX_CONNECTIONS and the pool settings apply), and
+once every worker has finished its warm-up the --scenarios of
+benchmarks.load_test are driven over HTTP. The table shows the pool each
+worker got and the throughput relative to the first worker count.
+
+The client runs on the same machine and takes CPU from the workers, so
+throughput stops scaling before the cores run out; with one core, extra
+workers only add context switches. Read the results as how this machine
+scales, not as a deployment's capacity.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from asyncio.subprocess import PIPE, STDOUT, Process
+
+from httpx import AsyncClient
+
+from app.core.config import get_settings
+from app.core.security import password_executor
+from app.db.session import engine
+from app.server import available_cpus, plan_server
+from benchmarks.common import print_table
+from benchmarks.load_test import dataset_size, run_scenario, start_workers
+
+settings = get_settings()
+
+# Scenarios that leave nothing behind in the database
+SCENARIOS = ["list", "search", "stats", "login"]
+STARTED = b"Application startup complete."
+
+
+async def wait_started(server: Process, workers: int) -> None:
+    """Read the server's output until every worker has started."""
+    started = 0
+    while started < workers:
+        line = await server.stdout.readline()
+        if not line:
+            sys.exit(f"Server exited with {await server.wait()}")
+        started += STARTED in line
+
+
+async def discard(server: Process) -> None:
+    # Keeps the pipe from filling up with access logs and blocking the workers
+    while await server.stdout.read(65536):
+        pass
+
+
+async def run_with_workers(
+    workers: int, args: argparse.Namespace, users: int, run_id: str
+) -> dict[str, dict[str, float]]:
+    server = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "app.server",
+        "--workers",
+        str(workers),
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(args.port),
+        stdout=PIPE,
+        stderr=STDOUT,
+        # Startup is detected from uvicorn's info messages
+        env={**os.environ, "LOG_LEVEL": "INFO"},
+    )
+    draining = None
+    try:
+        await asyncio.wait_for(wait_started(server, workers), args.startup_timeout)
+        draining = asyncio.create_task(discard(server))
+        async with AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60) as client:
+            clients = await start_workers(client, args.concurrency, args.prefix, users)
+            results = {}
+            for name in args.scenarios:
+                print(f"{workers} worker(s), {name}: {args.seconds}s...")
+                results[name] = await run_scenario(name, clients, args.seconds, run_id)
+            return results
+    finally:
+        if server.returncode is None:
+            server.terminate()
+        await server.wait()
+        if draining:
+            await draining
+
+
+async def main(args: argparse.Namespace) -> None:
+    run_id = uuid.uuid4().hex[:8]
+    dataset = await dataset_size(args.prefix)
+    await engine.dispose()
+    if not dataset["seed_users"]:
+        sys.exit(f"No users named {args.prefix}*; run python -m app.seeds.generate first")
+
+    cpus = available_cpus()
+    rows, baseline = [], {}
+    try:
+        for workers in args.workers:
+            try:
+                plan = plan_server(
+                    cpus,
+                    workers,
+                    settings.WEB_INSTANCES,
+                    settings.DATABASE_MAX_CONNECTIONS,
+                    settings.DATABASE_POOL_SIZE,
+                    settings.DATABASE_MAX_OVERFLOW,
+                )
+            except ValueError as exc:
+                print(f"{workers} worker(s): skipped, {exc}", file=sys.stderr)
+                continue
+            results = await run_with_workers(workers, args, dataset["seed_users"], run_id)
+            for name, stats in results.items():
+                baseline.setdefault(name, stats["throughput_rps"])
+                rows.append(
+                    [
+                        workers,
+                        f"{plan.pool_size}+{plan.max_overflow}",
+                        name,
+                        stats["requests"],
+                        stats["errors"],
+                        stats["throughput_rps"],
+                        f"{stats['throughput_rps'] / baseline[name]:.2f}x",
+                        stats.get("p50_ms", 0.0),
+                        stats.get("p95_ms", 0.0),
+                        stats.get("p99_ms", 0.0),
+                    ]
+                )
+    finally:
+        password_executor.shutdown()
+
+    print(f"\n{cpus} CPU(s) available, concurrency {args.concurrency}")
+    print_table(
+        [
+            "workers",
+            "pool",
+            "scenario",
+            "requests",
+            "errors",
+            "req/s",
+            "scaling",
+            "p50 ms",
+            "p95 ms",
+            "p99 ms",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(count) for count in value.split(",")],
+        default=[1, 2, 4],
+        help="comma-separated worker counts",
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10, help="per scenario")
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=["list", "stats"],
+        help=f"comma-separated subset of {','.join(SCENARIOS)}",
+    )
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--prefix", default="seed_", help="username prefix of the dataset")
+    parser.add_argument(
+        "--startup-timeout", type=float, default=120, help="seconds to wait for the workers"
+    )
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    asyncio.run(main(args))
@@ -1,8 +1,126 @@
 """Pytest configuration and shared fixtures."""
 
+import asyncio
+import os
 import sys
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
+import asyncpg
+import pytest
+from alembic.config import Config
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlmodel import SQLModel
+
+from alembic import command
+
 # Add the project root to the Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
+
+from app.core.config import Settings  # noqa: E402
+
+# Tests run against a dedicated database so they never touch development data.
+# Set TEST_DATABASE_URL to override; otherwise DATABASE_URL with a `_test` suffix.
+if "TEST_DATABASE_URL" in os.environ:
+    _test_url = make_url(os.environ["TEST_DATABASE_URL"])
+else:
+    _dev_url = make_url(Settings().DATABASE_URL)
+    _test_url = _dev_url.set(database=f"{_dev_url.database}_test")
+TEST_DATABASE_URL = _test_url.render_as_string(hide_password=False)
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+# Replicas would point at development data; tests install their own
+os.environ["DATABASE_READ_URLS"] = ""
+# Fail any request that looks like an N+1 instead of only logging it
+os.environ["SQL_REPEATED_QUERY_ERROR"] = "True"
+
+from app.core.cache import recent_writers, token_cache, user_cache  # noqa: E402
+from app.core.response_cache import response_cache  # noqa: E402
+from app.db.instrumentation import QueryLog, track_queries  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+async def _recreate_database() -> None:
+    conn = await asyncpg.connect(
+        user=_test_url.username,
+        password=_test_url.password,
+        host=_test_url.host,
+        port=_test_url.port,
+        database="postgres",
+    )
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{_test_url.database}" WITH (FORCE)')
+        await conn.execute(f'CREATE DATABASE "{_test_url.database}"')
+    finally:
+        await conn.close()
+
+
+@pytest.fixture(scope="session")
+def database() -> str:
+    """A freshly created test database migrated to head.
+
+    Skips database-backed tests when PostgreSQL is not reachable.
+    """
+    try:
+        asyncio.run(_recreate_database())
+    except (OSError, asyncpg.PostgresError) as exc:
+        pytest.skip(f"PostgreSQL is not available: {exc}")
+    command.upgrade(Config(str(project_root / "alembic.ini")), "head")
+    return TEST_DATABASE_URL
+
+
+@pytest.fixture
+async def db(database: str) -> AsyncIterator[None]:
+    """Empty every table and in-process cache before the test runs."""
+    token_cache.clear()
+    user_cache.clear()
+    recent_writers.clear()
+    await response_cache.clear()
+    tables = ", ".join(f'"{table.name}"' for table in SQLModel.metadata.sorted_tables)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} CASCADE"))
+    yield
+
+
+@pytest.fixture
+async def async_client(db: None) -> AsyncIterator[AsyncClient]:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def register_user(
+    async_client: AsyncClient,
+) -> Callable[[str], Awaitable[dict[str, str]]]:
+    """Register and log in a user, returning its Authorization headers."""
+
+    async def _register_user(username: str) -> dict[str, str]:
+        credentials = {"username": username, "password": "Password123!"}
+        response = await async_client.post(
+            "/api/v1/auth/register",
+            json={**credentials, "email": f"{username}@example.com"},
+        )
+        assert response.status_code == 201, response.text
+        response = await async_client.post("/api/v1/auth/login", json=credentials)
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return _register_user
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryLog]:
+    """Fail if the block runs more than `limit` SQL statements.
+
+    Counts everything the block runs in this task, requests made through
+    `async_client` included.
+    """
+    with track_queries() as queries:
+        yield queries
+    assert queries.count <= limit, (
+        f"{queries.count} queries, expected at most {limit}:\n{queries.summary()}"
+    )
@@ -0,0 +1,106 @@
+"""Tests for admission control."""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.middleware.admission import (
+    AdmissionController,
+    OverloadedError,
+    Priority,
+    admission,
+    route_priority,
+)
+
+
+async def wait_queued(controller: AdmissionController, count: int) -> None:
+    while controller.queued < count:
+        await asyncio.sleep(0)
+
+
+def test_route_priorities():
+    assert route_priority("POST", "/api/v1/auth/login") == Priority.CRITICAL
+    assert route_priority("GET", "/health/ready") == Priority.CRITICAL
+    assert route_priority("GET", "/api/v1/todos") == Priority.LOW
+    assert route_priority("GET", "/api/v1/todos/export") == Priority.LOW
+    assert route_priority("GET", "/api/v1/users") == Priority.LOW
+    assert route_priority("POST", "/api/v1/todos") == Priority.NORMAL
+    assert route_priority("GET", "/api/v1/todos/stats") == Priority.NORMAL
+    assert route_priority("OPTIONS", "/api/v1/todos") is None
+    assert route_priority("GET", "/metrics") is None
+    assert route_priority("GET", "/health") is None
+
+
+async def test_queued_requests_are_admitted_by_priority():
+    controller = AdmissionController(limit=1, max_queue=10, queue_timeout=5)
+    await controller.acquire(Priority.NORMAL)
+    admitted: list[Priority] = []
+
+    async def request(priority: Priority) -> None:
+        await controller.acquire(priority)
+        admitted.append(priority)
+        controller.release()
+
+    tasks = [asyncio.create_task(request(p)) for p in (Priority.LOW, Priority.CRITICAL)]
+    await wait_queued(controller, 2)
+    controller.release()
+    await asyncio.gather(*tasks)
+
+    assert admitted == [Priority.CRITICAL, Priority.LOW]
+    assert controller.active == 0
+    assert controller.queued == 0
+
+
+async def test_full_queue_sheds_lower_priority_or_rejects():
+    controller = AdmissionController(limit=1, max_queue=1, queue_timeout=5)
+    await controller.acquire(Priority.NORMAL)
+    low = asyncio.create_task(controller.acquire(Priority.LOW))
+    await wait_queued(controller, 1)
+
+    with pytest.raises(OverloadedError, match="queue_full"):
+        await controller.acquire(Priority.LOW)
+
+    critical = asyncio.create_task(controller.acquire(Priority.CRITICAL))
+    with pytest.raises(OverloadedError, match="shed"):
+        await low
+    controller.release()
+    await critical
+    assert controller.active == 1
+
+
+async def test_wait_times_out_and_cancelled_waiters_leave_no_slot_behind():
+    controller = AdmissionController(limit=1, max_queue=10, queue_timeout=0.01)
+    await controller.acquire(Priority.NORMAL)
+
+    with pytest.raises(OverloadedError, match="timeout"):
+        await controller.acquire(Priority.NORMAL)
+    controller.queue_timeout = 5
+    waiter = asyncio.create_task(controller.acquire(Priority.NORMAL))
+    await wait_queued(controller, 1)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    controller.release()
+    assert controller.active == 0
+    await controller.acquire(Priority.NORMAL)
+    assert controller.active == 1
+
+
+async def test_overloaded_request_gets_503_with_retry_after(async_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(admission, "limit", 1)
+    monkeypatch.setattr(admission, "max_queue", 0)
+    await admission.acquire(Priority.NORMAL)
+    try:
+        response = await async_client.get("/api/v1/todos")
+    finally:
+        admission.release()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    # Exempt routes are still served
+    assert (await async_client.get("/health")).status_code == 200
+
+    metrics = (await async_client.get("/metrics")).text
+    assert 'admission_requests_total{priority="LOW",outcome="queue_full"}' in metrics
+    assert "admission_active_requests" in metrics
@@ -0,0 +1,119 @@
+"""Tests for archiving old completed todos."""
+
+import json
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import engine
+from app.repositories.todo_repository import TodoRepository
+from app.schemas.mixin import utcnow_aware
+
+TODOS_URL = "/api/v1/todos"
+
+
+@pytest.fixture
+async def alice(register_user) -> dict[str, str]:
+    return await register_user("alice")
+
+
+async def create_todo(
+    client: AsyncClient, headers: dict[str, str], title: str, *, completed_days_ago: int | None
+) -> dict:
+    """A todo, completed and last updated `completed_days_ago` days ago if given."""
+    response = await client.post(
+        TODOS_URL, json={"title": title, "description": "", "priority": "HIGH"}, headers=headers
+    )
+    todo = response.json()
+    if completed_days_ago is not None:
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "UPDATE todo SET status = 'COMPLETED', "
+                    "updated_at = now() - make_interval(days => :days) WHERE id = :id"
+                ),
+                {"days": completed_days_ago, "id": todo["id"]},
+            )
+    return todo
+
+
+async def archive(batch_size: int = 100) -> int:
+    cutoff = utcnow_aware() - timedelta(days=90)
+    archived = 0
+    async with AsyncSession(engine) as session:
+        while owners := await TodoRepository(session).archive_completed(cutoff, batch_size):
+            archived += len(owners)
+    return archived
+
+
+async def test_only_old_completed_todos_are_archived(async_client: AsyncClient, alice):
+    old = [
+        await create_todo(async_client, alice, f"Old {i}", completed_days_ago=200) for i in range(3)
+    ]
+    await create_todo(async_client, alice, "Recent", completed_days_ago=10)
+    await create_todo(async_client, alice, "Open", completed_days_ago=None)
+
+    assert await archive(batch_size=2) == 3
+
+    titles = [
+        t["title"] for t in (await async_client.get(TODOS_URL, headers=alice)).json()["items"]
+    ]
+    assert sorted(titles) == ["Open", "Recent"]
+    async with engine.begin() as conn:
+        archived = (await conn.execute(text("SELECT id FROM todo_archive"))).scalars().all()
+    assert {str(todo_id) for todo_id in archived} == {todo["id"] for todo in old}
+
+
+async def test_archived_todos_are_read_only_on_request(async_client: AsyncClient, alice):
+    todo = await create_todo(async_client, alice, "Old", completed_days_ago=200)
+    await create_todo(async_client, alice, "Open", completed_days_ago=None)
+    await archive()
+    url = f"{TODOS_URL}/{todo['id']}"
+
+    assert (await async_client.get(url, headers=alice)).status_code == 404
+    response = await async_client.get(url, params={"include_archived": True}, headers=alice)
+    assert response.status_code == 200
+    assert response.json()["status"] == "COMPLETED"
+    assert (await async_client.patch(url, json={"title": "x"}, headers=alice)).status_code == 404
+
+    page = (
+        await async_client.get(TODOS_URL, params={"include_archived": True}, headers=alice)
+    ).json()
+    assert page["total"] == 2
+    assert [t["title"] for t in page["items"]] == ["Open", "Old"]
+    search = (
+        await async_client.get(
+            TODOS_URL, params={"include_archived": True, "search": "old"}, headers=alice
+        )
+    ).json()
+    assert [t["id"] for t in search["items"]] == [todo["id"]]
+
+
+async def test_stats_count_archived_todos(async_client: AsyncClient, alice):
+    await create_todo(async_client, alice, "Old", completed_days_ago=200)
+    await create_todo(async_client, alice, "Open", completed_days_ago=None)
+    before = (await async_client.get(f"{TODOS_URL}/stats", headers=alice)).json()
+
+    assert await archive() == 1
+
+    async with AsyncSession(engine) as session:
+        assert await TodoRepository(session).reconcile_stats(fix=False) == []
+    after = (await async_client.get(f"{TODOS_URL}/stats", headers=alice)).json()
+    assert after == before
+    assert (after["total"], after["completed"]) == (2, 1)
+
+
+async def test_export_includes_archived_todos(async_client: AsyncClient, alice):
+    old = await create_todo(async_client, alice, "Old", completed_days_ago=200)
+    await create_todo(async_client, alice, "Open", completed_days_ago=None)
+    assert await archive() == 1
+
+    response = await async_client.get(f"{TODOS_URL}/export", headers=alice)
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["title"] for r in records] == ["Old", "Open"]
+    assert records[0]["id"] == old["id"]
+    assert records[0]["status"] == "COMPLETED"
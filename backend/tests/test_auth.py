@@ -0,0 +1,68 @@
+"""Tests for authentication and the current-user dependency."""
+
+from httpx import AsyncClient
+
+from app.core.cache import token_cache, user_cache
+
+
+class TestCurrentUser:
+    """Tests for get_current_user."""
+
+    async def test_invalid_token_is_rejected(self, async_client: AsyncClient, db):
+        response = await async_client.get(
+            "/api/v1/users/me", headers={"Authorization": "Bearer not-a-jwt"}
+        )
+
+        assert response.status_code == 403
+
+    async def test_repeat_requests_are_served_from_cache(
+        self, async_client: AsyncClient, register_user
+    ):
+        headers = await register_user("alice")
+
+        await async_client.get("/api/v1/users/me", headers=headers)
+        response = await async_client.get("/api/v1/users/me", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["username"] == "alice"
+        assert token_cache.hits == 1
+        assert user_cache.hits == 1
+
+    async def test_suspension_invalidates_cached_user(
+        self, async_client: AsyncClient, register_user
+    ):
+        headers = await register_user("alice")
+        me = (await async_client.get("/api/v1/users/me", headers=headers)).json()
+
+        response = await async_client.patch(
+            f"/api/v1/users/{me['id']}", json={"status": "SUSPENDED"}, headers=headers
+        )
+        assert response.status_code == 200
+
+        response = await async_client.get("/api/v1/users/me", headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Suspended user"
+
+
+class TestRegister:
+    """Tests for POST /auth/register."""
+
+    async def test_conflicts_name_the_taken_field(self, async_client: AsyncClient, db):
+        url = "/api/v1/auth/register"
+        user = {"username": "alice", "email": "alice@example.com", "password": "Password123!"}
+        assert (await async_client.post(url, json=user)).status_code == 201
+
+        same_name = await async_client.post(url, json={**user, "email": "other@example.com"})
+        same_email = await async_client.post(url, json={**user, "username": "other"})
+
+        assert same_name.status_code == same_email.status_code == 400
+        assert same_name.json()["detail"] == "Username already registered"
+        assert same_email.json()["detail"] == "Email already registered"
+
+    async def test_users_without_email_do_not_conflict(self, async_client: AsyncClient, db):
+        for username in ["alice", "bob"]:
+            response = await async_client.post(
+                "/api/v1/auth/register",
+                json={"username": username, "password": "Password123!"},
+            )
+            assert response.status_code == 201, response.text
@@ -0,0 +1,71 @@
+"""Tests for the in-process TTL cache."""
+
+from app.core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_get_counts_hits_and_misses(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=60, timer=clock)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=5)
+
+        clock.now = 10
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+        clock.now = 61
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_per_entry_ttl_cannot_exceed_default(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=60, timer=clock)
+        cache.set("a", 1, ttl=3600)
+
+        clock.now = 61
+        assert cache.get("a") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_zero_ttl_disables_cache(self):
+        cache = TTLCache(maxsize=10, ttl=0)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_delete(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.delete("a")
+        cache.delete("missing")
+
+        assert cache.get("a") is None
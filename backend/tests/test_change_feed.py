@@ -0,0 +1,194 @@
+"""Tests for the todo change feed."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.change_feed import (
+    ChangeFeed,
+    ChangeFeedUnavailableError,
+    Subscription,
+    change_feed,
+)
+from app.db.session import engine
+from app.repositories.todo_repository import TodoRepository
+from app.schemas.mixin import utcnow_aware
+
+TODOS_URL = "/api/v1/todos"
+
+
+def parse(message: bytes) -> dict[str, str]:
+    """The fields of one SSE message."""
+    fields = {}
+    for line in message.decode().splitlines():
+        name, _, value = line.partition(": ")
+        fields[name] = value
+    return fields
+
+
+async def next_events(subscription: Subscription, user_id: str, count: int) -> list[dict]:
+    """The next `count` events about `user_id`'s todos, as parsed messages."""
+    events = []
+    while len(events) < count:
+        message = await asyncio.wait_for(subscription.queue.get(), 5)
+        fields = parse(message)
+        if json.loads(fields["data"]).get("user_id") == user_id:
+            events.append(fields)
+    return events
+
+
+@pytest.fixture
+async def listening() -> AsyncIterator[None]:
+    """The app's change feed, stopped afterwards so no task outlives the test."""
+    await change_feed.start(timeout=5)
+    yield
+    await change_feed.stop()
+
+
+def fake_feed(**options) -> ChangeFeed:
+    defaults = {"buffer_size": 10, "queue_size": 10, "max_subscribers": 10, "heartbeat": 5}
+    return ChangeFeed("postgresql://unused", **{**defaults, **options})
+
+
+def notify(feed: ChangeFeed, event_id: int, event_type: str = "created") -> None:
+    payload = json.dumps({"id": event_id, "type": event_type, "user_id": "u"})
+    feed._on_notification(None, 0, "todo_changes", payload)
+
+
+async def test_writes_are_streamed(async_client: AsyncClient, register_user, listening):
+    headers = await register_user("alice")
+    user_id = (await async_client.get("/api/v1/users/me", headers=headers)).json()["id"]
+    subscription = change_feed.subscribe()
+    try:
+        todo = (
+            await async_client.post(
+                TODOS_URL, json={"title": "Write docs", "description": "Long"}, headers=headers
+            )
+        ).json()
+        url = f"{TODOS_URL}/{todo['id']}"
+        await async_client.patch(url, json={"title": "Ship docs"}, headers=headers)
+        await async_client.patch(f"{url}/complete", headers=headers)
+        await async_client.delete(url, headers=headers)
+
+        events = await next_events(subscription, user_id, 4)
+    finally:
+        change_feed.unsubscribe(subscription)
+
+    assert [event["event"] for event in events] == ["created", "updated", "completed", "deleted"]
+    updated = json.loads(events[1]["data"])
+    assert updated["id"] == int(events[1]["id"])
+    assert updated["todo"]["id"] == todo["id"]
+    assert updated["todo"]["title"] == "Ship docs"
+    assert updated["todo"]["description"] is None
+
+
+async def test_archived_todos_are_announced(async_client: AsyncClient, register_user, listening):
+    headers = await register_user("alice")
+    todo = (
+        await async_client.post(
+            TODOS_URL, json={"title": "Old", "description": ""}, headers=headers
+        )
+    ).json()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("UPDATE todo SET status = 'COMPLETED', updated_at = now() - interval '1 year'")
+        )
+    subscription = change_feed.subscribe()
+    try:
+        async with AsyncSession(engine) as session:
+            cutoff = utcnow_aware() - timedelta(days=90)
+            await TodoRepository(session).archive_completed(cutoff, 100)
+
+        [event] = await next_events(subscription, todo["user_id"], 1)
+    finally:
+        change_feed.unsubscribe(subscription)
+
+    assert event["event"] == "archived"
+    assert json.loads(event["data"])["todo"]["id"] == todo["id"]
+
+
+async def test_large_writes_send_one_bulk_event(
+    async_client: AsyncClient, register_user, listening
+):
+    headers = await register_user("alice")
+    user_id = (await async_client.get("/api/v1/users/me", headers=headers)).json()["id"]
+    subscription = change_feed.subscribe()
+    try:
+        body = "".join(
+            json.dumps({"title": f"Todo {i}", "description": ""}) + "\n" for i in range(1001)
+        )
+        response = await async_client.post(
+            f"{TODOS_URL}:import",
+            content=body,
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+        )
+        assert response.json()["imported"] == 1001
+
+        [event] = await next_events(subscription, user_id, 1)
+    finally:
+        change_feed.unsubscribe(subscription)
+
+    assert event["event"] == "bulk"
+    assert json.loads(event["data"])["count"] == 1001
+    assert subscription.queue.empty()
+
+
+async def test_resume_replays_missed_events_or_resets():
+    feed = fake_feed()
+    for event_id in (1, 2, 3):
+        notify(feed, event_id)
+
+    resumed = feed.subscribe(last_event_id="1")
+    assert [parse(resumed.queue.get_nowait())["id"] for _ in range(2)] == ["2", "3"]
+
+    unknown = feed.subscribe(last_event_id="99")
+    reset = parse(unknown.queue.get_nowait())
+    assert (reset["event"], reset["id"]) == ("reset", "3")
+
+    live = feed.subscribe()
+    notify(feed, 4)
+    assert parse(live.queue.get_nowait())["id"] == "4"
+
+
+async def test_lost_connection_resets_subscribers():
+    feed = fake_feed()
+    notify(feed, 1)
+    subscription = feed.subscribe()
+
+    feed._lost_events()
+
+    assert parse(subscription.queue.get_nowait())["event"] == "reset"
+    assert parse(feed.subscribe(last_event_id="1").queue.get_nowait())["event"] == "reset"
+
+
+async def test_slow_subscriber_is_disconnected_after_its_queue():
+    feed = fake_feed(queue_size=2)
+    subscription = feed.subscribe()
+    for event_id in (1, 2, 3, 4):
+        notify(feed, event_id)
+
+    assert subscription not in feed.subscribers
+    messages = [message async for message in feed.stream(subscription)]
+    assert messages[0].startswith(b"retry:")
+    assert [parse(message)["id"] for message in messages[1:]] == ["1", "2"]
+
+
+async def test_subscribers_are_capped(
+    async_client: AsyncClient, register_user, listening, monkeypatch
+):
+    feed = fake_feed(max_subscribers=1)
+    feed.subscribe()
+    with pytest.raises(ChangeFeedUnavailableError):
+        feed.subscribe()
+
+    headers = await register_user("alice")
+    monkeypatch.setattr(change_feed, "max_subscribers", 0)
+    response = await async_client.get(f"{TODOS_URL}/events", headers=headers)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,168 @@
+"""Tests for ETags and conditional requests."""
+
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.etag import etag_matches, make_etag
+from app.db.session import engine
+from app.repositories.todo_repository import TodoRepository
+
+TODOS_URL = "/api/v1/todos"
+
+
+async def create_todo(client: AsyncClient, headers: dict[str, str], **fields) -> dict:
+    payload = {"title": "Write tests", "description": "Cover ETags", **fields}
+    response = await client.post(TODOS_URL, json=payload, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def revalidate(client: AsyncClient, url: str, headers: dict[str, str], etag: str):
+    return await client.get(url, headers={**headers, "If-None-Match": etag})
+
+
+def test_etag_matches():
+    etag = make_etag("a", 1)
+    assert etag.startswith('W/"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert etag_matches(f'W/"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(make_etag("a", 2), etag)
+    assert not etag_matches(None, etag)
+
+
+class TestConditionalGet:
+    """Tests for If-None-Match on the read endpoints."""
+
+    async def test_single_todo(self, async_client: AsyncClient, register_user):
+        alice = await register_user("alice")
+        todo = await create_todo(async_client, alice)
+        url = f"{TODOS_URL}/{todo['id']}"
+
+        response = await async_client.get(url, headers=alice)
+        etag = response.headers["ETag"]
+        assert response.headers["Cache-Control"] == "private, no-cache"
+
+        response = await revalidate(async_client, url, alice, etag)
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+        await async_client.patch(url, json={"title": "Renamed"}, headers=alice)
+        response = await revalidate(async_client, url, alice, etag)
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    async def test_list_watermark(self, async_client: AsyncClient, register_user):
+        alice = await register_user("alice")
+        bob = await register_user("bob")
+        todo = await create_todo(async_client, alice)
+
+        etag = (await async_client.get(TODOS_URL, headers=alice)).headers["ETag"]
+        assert (await revalidate(async_client, TODOS_URL, alice, etag)).status_code == 304
+
+        # The tag depends on the viewer and on the query
+        bob_etag = (await async_client.get(TODOS_URL, headers=bob)).headers["ETag"]
+        assert bob_etag != etag
+        page_2 = await revalidate(async_client, f"{TODOS_URL}?page=2", alice, etag)
+        assert page_2.status_code == 200
+
+        # Any write to any user's todos moves the watermark, edits included
+        for change in [
+            lambda: create_todo(async_client, bob),
+            lambda: async_client.patch(
+                f"{TODOS_URL}/{todo['id']}", json={"description": "new"}, headers=alice
+            ),
+            lambda: async_client.delete(f"{TODOS_URL}/{todo['id']}", headers=alice),
+        ]:
+            await change()
+            response = await revalidate(async_client, TODOS_URL, alice, etag)
+            assert response.status_code == 200
+            etag = response.headers["ETag"]
+
+    async def test_list_watermark_survives_user_deletion(
+        self, async_client: AsyncClient, register_user
+    ):
+        alice = await register_user("alice")
+        bob = await register_user("bob")
+        await create_todo(async_client, bob)
+        await create_todo(async_client, bob)
+
+        async def watermark() -> int:
+            async with AsyncSession(engine) as session:
+                return await TodoRepository(session).get_list_watermark()
+
+        before = await watermark()
+        etag = (await async_client.get(TODOS_URL, headers=alice)).headers["ETag"]
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM \"user\" WHERE username = 'bob'"))
+
+        # The cascade removes bob's todos and counters; the version still grows
+        assert await watermark() > before
+        assert (await revalidate(async_client, TODOS_URL, alice, etag)).status_code == 200
+
+    async def test_stats(self, async_client: AsyncClient, register_user):
+        alice = await register_user("alice")
+        url = f"{TODOS_URL}/stats"
+        etag = (await async_client.get(url, headers=alice)).headers["ETag"]
+
+        assert (await revalidate(async_client, url, alice, etag)).status_code == 304
+        await create_todo(async_client, alice)
+        assert (await revalidate(async_client, url, alice, etag)).status_code == 200
+
+    async def test_me(self, async_client: AsyncClient, register_user):
+        alice = await register_user("alice")
+        url = "/api/v1/users/me"
+        response = await async_client.get(url, headers=alice)
+        etag = response.headers["ETag"]
+
+        assert (await revalidate(async_client, url, alice, etag)).status_code == 304
+        await async_client.patch(
+            f"/api/v1/users/{response.json()['id']}",
+            json={"email": "alice@example.org"},
+            headers=alice,
+        )
+        assert (await revalidate(async_client, url, alice, etag)).status_code == 200
+
+
+class TestIfMatch:
+    """Tests for optimistic concurrency with If-Match on PATCH."""
+
+    async def test_stale_etag_is_rejected(self, async_client: AsyncClient, register_user):
+        alice = await register_user("alice")
+        todo = await create_todo(async_client, alice)
+        url = f"{TODOS_URL}/{todo['id']}"
+        etag = (await async_client.get(url, headers=alice)).headers["ETag"]
+
+        first = await async_client.patch(
+            url, json={"title": "First"}, headers={**alice, "If-Match": etag}
+        )
+        assert first.status_code == 200
+        assert first.headers["ETag"] != etag
+
+        second = await async_client.patch(
+            url, json={"title": "Second"}, headers={**alice, "If-Match": etag}
+        )
+        assert second.status_code == 412
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert (await async_client.get(url, headers=alice)).json()["title"] == "First"
+
+        complete = await async_client.patch(
+            f"{url}/complete", headers={**alice, "If-Match": first.headers["ETag"]}
+        )
+        assert complete.status_code == 200
+        assert complete.json()["status"] == "COMPLETED"
+
+    async def test_wildcard_matches_any_version(self, async_client: AsyncClient, register_user):
+        alice = await register_user("alice")
+        todo = await create_todo(async_client, alice)
+
+        response = await async_client.patch(
+            f"{TODOS_URL}/{todo['id']}",
+            json={"title": "Whatever"},
+            headers={**alice, "If-Match": "*"},
+        )
+
+        assert response.status_code == 200
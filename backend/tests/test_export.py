@@ -0,0 +1,142 @@
+"""Tests for the streaming todo export."""
+
+import asyncio
+import csv
+import io
+import json
+import os
+import resource
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.core.cache import user_cache
+from app.db.session import engine
+from app.main import app
+
+EXPORT_URL = "/api/v1/todos/export"
+# Rows exported by the memory test; lower it locally for a faster run
+EXPORT_TEST_ROWS = int(os.environ.get("EXPORT_TEST_ROWS", 1_000_000))
+MAX_RSS_GROWTH = 100 * 1024 * 1024
+
+
+def current_rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+
+
+async def me(client: AsyncClient, headers: dict[str, str]) -> dict:
+    return (await client.get("/api/v1/users/me", headers=headers)).json()
+
+
+async def create_todos(client: AsyncClient, headers: dict[str, str], count: int) -> None:
+    items = [{"title": f"todo {i}", "description": f"details {i}"} for i in range(count)]
+    response = await client.post(
+        "/api/v1/todos:batchCreate", json={"items": items}, headers=headers
+    )
+    assert response.status_code == 201
+
+
+class TestExport:
+    """Tests for GET /todos/export."""
+
+    async def test_ndjson_export_contains_only_own_todos(
+        self, async_client: AsyncClient, register_user
+    ):
+        alice = await register_user("alice")
+        bob = await register_user("bob")
+        await create_todos(async_client, alice, 3)
+        await create_todos(async_client, bob, 2)
+
+        response = await async_client.get(EXPORT_URL, headers=alice)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["title"] for r in records] == ["todo 0", "todo 1", "todo 2"]
+        assert {r["user_id"] for r in records} == {(await me(async_client, alice))["id"]}
+        assert records[0]["description"] == "details 0"
+
+    async def test_csv_export(self, async_client: AsyncClient, register_user):
+        alice = await register_user("alice")
+        await create_todos(async_client, alice, 2)
+
+        response = await async_client.get(EXPORT_URL, params={"format": "CSV"}, headers=alice)
+
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["title"] for row in rows] == ["todo 0", "todo 1"]
+
+    async def test_exporting_all_todos_requires_admin(
+        self, async_client: AsyncClient, register_user
+    ):
+        alice = await register_user("alice")
+        bob = await register_user("bob")
+        await create_todos(async_client, bob, 2)
+
+        response = await async_client.get(EXPORT_URL, params={"all": True}, headers=alice)
+        assert response.status_code == 403
+
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("UPDATE \"user\" SET is_superuser = true WHERE username = 'alice'")
+            )
+        user_cache.clear()
+        response = await async_client.get(EXPORT_URL, params={"all": True}, headers=alice)
+        assert response.status_code == 200
+        assert len(response.text.splitlines()) == 2
+
+    @pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc")
+    async def test_export_memory_stays_flat(self, async_client: AsyncClient, register_user):
+        headers = await register_user("alice")
+        user_id = (await me(async_client, headers))["id"]
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "INSERT INTO todo (id, user_id, title, description, status, "
+                    "created_at, updated_at) "
+                    "SELECT gen_random_uuid(), :user_id, 'todo ' || i, repeat('x', 100), "
+                    "'NOT_STARTED', now() - i * interval '1 second', now() "
+                    "FROM generate_series(1, :rows) AS i"
+                ),
+                {"user_id": user_id, "rows": EXPORT_TEST_ROWS},
+            )
+
+        # Drive the ASGI app directly: httpx's ASGITransport buffers the body
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": EXPORT_URL,
+            "raw_path": EXPORT_URL.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"authorization", headers["Authorization"].encode())],
+            "server": ("test", 80),
+            "client": ("test", 123),
+        }
+        baseline = current_rss()
+        peak = baseline
+        lines = 0
+
+        requested = asyncio.Event()
+
+        async def receive() -> dict:
+            # Starlette polls receive() for a disconnect while streaming
+            if requested.is_set():
+                await asyncio.Event().wait()
+            requested.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: dict) -> None:
+            nonlocal peak, lines
+            if message["type"] == "http.response.body":
+                lines += message.get("body", b"").count(b"\n")
+                peak = max(peak, current_rss())
+
+        await app(scope, receive, send)
+
+        assert lines == EXPORT_TEST_ROWS
+        assert peak - baseline < MAX_RSS_GROWTH
@@ -0,0 +1,98 @@
+"""Tests for the COPY-based todo bulk import."""
+
+import json
+
+from httpx import AsyncClient
+
+from app.schemas.todo import FileFormat
+from app.seeds.import_todos import import_file
+
+IMPORT_URL = "/api/v1/todos:import"
+
+
+async def chunked(body: bytes, size: int = 7):
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+async def list_todos(client: AsyncClient, headers: dict[str, str]) -> list[dict]:
+    response = await client.get("/api/v1/todos", params={"page_size": 100}, headers=headers)
+    return response.json()["items"]
+
+
+class TestImport:
+    """Tests for POST /todos:import and the import CLI."""
+
+    async def test_ndjson_import_reports_invalid_rows(
+        self, async_client: AsyncClient, register_user
+    ):
+        headers = await register_user("alice")
+        lines = [
+            json.dumps({"title": "one", "description": "first", "priority": "HIGH"}),
+            json.dumps({"title": "two", "description": "", "status": "COMPLETED"}),
+            "",
+            json.dumps({"title": "x" * 201, "description": "too long"}),
+            "{not json",
+            json.dumps({"title": "three", "description": "ünïcode"}),
+        ]
+        body = "\n".join(lines).encode()
+
+        response = await async_client.post(IMPORT_URL, content=chunked(body), headers=headers)
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["imported"] == 3
+        assert result["rejected"] == 2
+        assert [error["row"] for error in result["errors"]] == [3, 4]
+        assert result["errors"][0]["detail"].startswith("title:")
+        todos = await list_todos(async_client, headers)
+        assert sorted(todo["title"] for todo in todos) == ["one", "three", "two"]
+        stats = (await async_client.get("/api/v1/todos/stats", headers=headers)).json()
+        assert stats["total"] == 3
+        assert stats["completed"] == 1
+        assert stats["by_priority"]["HIGH"] == 1
+
+    async def test_csv_import(self, async_client: AsyncClient, register_user):
+        headers = await register_user("alice")
+        body = (
+            b"title,description,priority,due_date\r\n"
+            b'Pay rent,"line one\r\nline ""two""",,2026-01-01T12:00:00+02:00\r\n'
+            b"Call mum,,LOW,\r\n"
+            b"Broken,row\r\n"
+        )
+
+        response = await async_client.post(
+            IMPORT_URL, params={"format": "CSV"}, content=chunked(body), headers=headers
+        )
+
+        result = response.json()
+        assert result["imported"] == 2
+        assert result["errors"] == [{"row": 3, "detail": "Expected 4 columns, got 2"}]
+        todos = {todo["title"]: todo for todo in await list_todos(async_client, headers)}
+        assert todos["Pay rent"]["description"] == 'line one\r\nline "two"'
+        assert todos["Pay rent"]["priority"] is None
+        assert todos["Pay rent"]["due_date"] == "2026-01-01T10:00:00"
+        assert todos["Call mum"]["description"] == ""
+
+    async def test_malformed_stream_imports_nothing(self, async_client: AsyncClient, register_user):
+        headers = await register_user("alice")
+        body = json.dumps({"title": "ok", "description": "ok"}).encode() + b"\n\xff\xfe\n"
+
+        response = await async_client.post(IMPORT_URL, content=body, headers=headers)
+
+        assert response.status_code == 400
+        assert await list_todos(async_client, headers) == []
+
+    async def test_cli_writes_rejected_rows(
+        self, async_client: AsyncClient, register_user, tmp_path
+    ):
+        headers = await register_user("alice")
+        source = tmp_path / "todos.csv"
+        source.write_text("title,description,status\nWrite docs,soon,\nBad,row,DONE\n")
+        errors = tmp_path / "errors.ndjson"
+
+        exit_code = await import_file(source, "alice", FileFormat.CSV, errors)
+
+        assert exit_code == 1
+        assert [todo["title"] for todo in await list_todos(async_client, headers)] == ["Write docs"]
+        assert json.loads(errors.read_text())["row"] == 2
@@ -0,0 +1,112 @@
+"""Tests for the metrics endpoint and Server-Timing header."""
+
+import re
+
+from httpx import AsyncClient
+
+from app.core.metrics import Counter, Histogram, Registry
+from app.core.timing import RequestTimings
+
+TODOS_URL = "/api/v1/todos"
+
+
+def sample(body: str, name: str, **labels: str) -> float | None:
+    """Value of the sample `name` whose labels include `labels`."""
+    for line in body.splitlines():
+        match = re.fullmatch(r"(\w+)(?:\{(.*)\})? (\S+)", line)
+        if not match or match[1] != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match[2] or ""))
+        if labels.items() <= found.items():
+            return float(match[3])
+    return None
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    return {
+        name.strip(): float(duration)
+        for name, duration in re.findall(r"([\w-]+);dur=([\d.]+)", header)
+    }
+
+
+def test_registry_renders_text_format():
+    registry = Registry()
+    requests = Counter("requests_total", "Requests.", ("path",))
+    latency = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    registry.register(requests)
+    registry.register(latency)
+    registry.add_collector(lambda: ["# TYPE extra gauge", "extra 7"])
+    requests.inc(('/a "b"',))
+    requests.inc(('/a "b"',), 2)
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value)
+
+    body = registry.render()
+
+    assert "# TYPE requests_total counter" in body
+    assert 'requests_total{path="/a \\"b\\""} 3' in body
+    assert 'latency_seconds_bucket{le="0.1"} 2' in body
+    assert 'latency_seconds_bucket{le="1"} 3' in body
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in body
+    assert "latency_seconds_sum 3.65" in body
+    assert "latency_seconds_count 4" in body
+    assert body.endswith("extra 7\n")
+
+
+def test_server_timing_lists_recorded_stages():
+    timings = RequestTimings()
+    timings.add("auth", 0.002)
+    timings.add("db", 0.001)
+    timings.add("db", 0.0005)
+
+    stages = parse_server_timing(timings.server_timing())
+
+    assert list(stages) == ["auth", "db", "total"]
+    assert stages["auth"] == 2.0
+    assert stages["db"] == 1.5
+
+
+async def test_requests_are_counted_per_route(async_client: AsyncClient, register_user):
+    alice = await register_user("alice")
+    before = await async_client.get("/metrics")
+    route = "/api/v1/todos/{todo_id}"
+    count = sample(before.text, "http_requests_total", route=route, status="404") or 0
+
+    for _ in range(2):
+        response = await async_client.get(
+            f"{TODOS_URL}/00000000-0000-0000-0000-000000000000", headers=alice
+        )
+        assert response.status_code == 404
+    await async_client.get("/no/such/path")
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert sample(body, "http_requests_total", route=route, status="404") == count + 2
+    assert sample(body, "http_requests_total", route="<unmatched>", status="404") >= 1
+    assert sample(body, "http_request_duration_seconds_count", method="GET", route=route) >= 2
+    # Only the scrape itself is in flight
+    assert sample(body, "http_requests_in_flight") == 1
+    assert sample(body, "db_pool_checkouts_total", engine="primary") > 0
+
+
+async def test_server_timing_header(async_client: AsyncClient, register_user):
+    alice = await register_user("alice")
+    response = await async_client.post(
+        TODOS_URL, json={"title": "Timed", "description": "Server-Timing"}, headers=alice
+    )
+    assert response.status_code == 201
+
+    response = await async_client.get(TODOS_URL, headers=alice)
+
+    stages = parse_server_timing(response.headers["server-timing"])
+    assert {"auth", "db", "serialize", "total"} <= stages.keys()
+    assert stages["total"] >= stages["db"]
+
+    # A 304 builds no JSON body, so there is no serialize stage
+    response = await async_client.get(
+        TODOS_URL, headers={**alice, "If-None-Match": response.headers["etag"]}
+    )
+    assert response.status_code == 304
+    assert "serialize" not in parse_server_timing(response.headers["server-timing"])
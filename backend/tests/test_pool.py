@@ -0,0 +1,91 @@
+"""Tests for pool configuration and telemetry."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.cache import user_cache
+from app.db import session as db_session
+from app.db.pool import InstrumentedQueuePool, PoolStats, pool_status
+from app.db.session import engine
+from tests.conftest import TEST_DATABASE_URL
+
+POOLS_URL = "/api/v1/internal/pools"
+
+
+def test_wait_histogram_is_cumulative():
+    stats = PoolStats()
+    for wait_ms in [0.2, 1, 3, 20_000]:
+        stats.observe(wait_ms)
+
+    histogram = stats.wait_histogram()
+
+    assert stats.checkouts == 4
+    assert histogram["1"] == 2
+    assert histogram["5"] == 3
+    assert histogram["10000"] == 3
+    assert histogram["+Inf"] == 4
+
+
+async def test_pool_counts_checkouts_and_timeouts():
+    small = create_async_engine(
+        TEST_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    async with small.connect():
+        status = pool_status("small", small)
+        assert status["checked_out"] == 1
+        assert status["connections"] == 1
+        with pytest.raises(PoolTimeoutError):
+            async with small.connect():
+                pass
+
+    await small.dispose()
+    status = pool_status("small", small)
+    assert status["checkouts"] == 1
+    assert status["checkout_timeouts"] == 1
+    assert status["connections"] == 0
+
+
+async def test_pgbouncer_mode_disables_statement_caches(monkeypatch):
+    monkeypatch.setattr(db_session.settings, "DATABASE_PGBOUNCER", True)
+    bouncer = db_session._create_engine(TEST_DATABASE_URL)
+    try:
+        async with bouncer.connect() as conn:
+            for _ in range(2):
+                assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+            raw = (await conn.get_raw_connection()).driver_connection
+            assert raw._stmt_cache.get_max_size() == 0
+    finally:
+        await bouncer.dispose()
+
+
+class TestPoolsEndpoint:
+    """Tests for GET /internal/pools."""
+
+    async def test_requires_admin(self, async_client: AsyncClient, register_user):
+        headers = await register_user("alice")
+
+        response = await async_client.get(POOLS_URL, headers=headers)
+
+        assert response.status_code == 403
+
+    async def test_reports_primary_pool(self, async_client: AsyncClient, register_user):
+        headers = await register_user("alice")
+        async with engine.begin() as conn:
+            await conn.execute(text('UPDATE "user" SET is_superuser = true'))
+        user_cache.clear()
+
+        response = await async_client.get(POOLS_URL, headers=headers)
+
+        assert response.status_code == 200
+        [primary] = response.json()
+        assert primary["engine"] == "primary"
+        assert primary["pool_size"] == db_session.settings.DATABASE_POOL_SIZE
+        assert primary["checkouts"] > 0
+        assert primary["wait_ms_histogram"]["+Inf"] == primary["checkouts"]
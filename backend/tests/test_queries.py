@@ -0,0 +1,215 @@
+"""Tests for SQL instrumentation: query counts, N+1 detection, slow queries."""
+
+import asyncio
+import logging
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.core.cache import recent_writers, token_cache, user_cache
+from app.db import instrumentation
+from app.db.instrumentation import RepeatedQueryError, track_queries
+from app.db.session import engine
+from app.dependencies.auth import TokenDep, get_current_user
+from app.dependencies.user import UserServiceDep
+from app.main import app
+from app.middleware import metrics as metrics_middleware
+from tests.conftest import assert_max_queries
+
+TODOS_URL = "/api/v1/todos"
+
+# Statements per request with cold auth caches; raise a limit only on purpose.
+# Writes are one statement each (INSERT/UPDATE/DELETE ... RETURNING).
+ENDPOINT_QUERY_LIMITS = [
+    (
+        "POST",
+        "/api/v1/auth/register",
+        {"username": "carol", "email": "carol@example.com", "password": "Password123!"},
+        1,
+    ),
+    ("POST", "/api/v1/auth/login", {"username": "alice", "password": "Password123!"}, 1),
+    ("GET", "/api/v1/users/me", None, 1),
+    ("GET", "/api/v1/users", None, 2),
+    ("PATCH", "/api/v1/users/{user_id}", {"email": "alice@example.org"}, 2),
+    ("POST", TODOS_URL, {"title": "New", "description": "Todo"}, 2),
+    ("GET", TODOS_URL, None, 4),
+    ("GET", f"{TODOS_URL}?search=write", None, 4),
+    ("GET", f"{TODOS_URL}/stats", None, 2),
+    ("GET", f"{TODOS_URL}/export", None, 2),
+    ("GET", f"{TODOS_URL}/{{todo_id}}", None, 2),
+    ("PATCH", f"{TODOS_URL}/{{todo_id}}", {"title": "Renamed"}, 2),
+    ("PATCH", f"{TODOS_URL}/{{todo_id}}/complete", None, 2),
+    ("DELETE", f"{TODOS_URL}/{{todo_id}}", None, 2),
+    (
+        "POST",
+        f"{TODOS_URL}:batchCreate",
+        {"items": [{"title": f"Todo {i}", "description": "Batch"} for i in range(50)]},
+        2,
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "method,url,body,limit",
+    ENDPOINT_QUERY_LIMITS,
+    ids=[f"{method} {url}" for method, url, _, _ in ENDPOINT_QUERY_LIMITS],
+)
+async def test_endpoint_query_count(
+    async_client: AsyncClient, register_user, method: str, url: str, body, limit: int
+):
+    alice = await register_user("alice")
+    for i in range(3):
+        response = await async_client.post(
+            TODOS_URL, json={"title": f"Write {i}", "description": "Tests"}, headers=alice
+        )
+        assert response.status_code == 201
+    todo_id = response.json()["id"]
+    user_id = response.json()["user_id"]
+    for cache in (token_cache, user_cache, recent_writers):
+        cache.clear()
+
+    with assert_max_queries(limit):
+        response = await async_client.request(
+            method, url.format(todo_id=todo_id, user_id=user_id), json=body, headers=alice
+        )
+    assert response.status_code < 300, response.text
+
+
+async def test_conditional_update_locks_then_writes(async_client: AsyncClient, register_user):
+    alice = await register_user("alice")
+    response = await async_client.post(
+        TODOS_URL, json={"title": "Write", "description": "Tests"}, headers=alice
+    )
+    url = f"{TODOS_URL}/{response.json()['id']}"
+    headers = {**alice, "If-Match": response.headers.get("ETag", "*")}
+
+    # Authentication, SELECT ... FOR UPDATE and the UPDATE
+    with assert_max_queries(3):
+        response = await async_client.patch(url, json={"title": "Renamed"}, headers=headers)
+    assert response.status_code == 200
+
+
+async def test_assert_max_queries_reports_statements():
+    with pytest.raises(AssertionError, match="2 queries, expected at most 1") as error:
+        with assert_max_queries(1):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+    assert "1x SELECT 2" in str(error.value)
+
+
+async def test_nested_logs_count_into_parents():
+    with track_queries() as outer:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with track_queries() as inner:
+                await conn.execute(text("SELECT 1"))
+
+    assert inner.count == 1
+    assert outer.count == 2
+    assert outer.statements["SELECT 1"] == 2
+    assert outer.seconds >= inner.seconds > 0
+
+
+class TestRepeatedQueries:
+    """Tests for N+1 detection."""
+
+    async def test_repeats_raise_in_tests(self):
+        with pytest.raises(RepeatedQueryError, match="more than 3 times"):
+            with track_queries(repeat_limit=3):
+                async with engine.connect() as conn:
+                    for todo_id in range(4):
+                        await conn.execute(text("SELECT CAST(:id AS int)"), {"id": todo_id})
+
+    async def test_repeats_are_logged_once(self, monkeypatch, caplog):
+        monkeypatch.setattr(instrumentation.settings, "SQL_REPEATED_QUERY_ERROR", False)
+        with caplog.at_level(logging.WARNING, logger="app.db.instrumentation"):
+            with track_queries(repeat_limit=3):
+                async with engine.connect() as conn:
+                    for todo_id in range(10):
+                        await conn.execute(text("SELECT CAST(:id AS int)"), {"id": todo_id})
+
+        messages = [record.message for record in caplog.records]
+        assert len(messages) == 1
+        assert "likely an N+1 query" in messages[0]
+
+    async def test_requests_are_checked(
+        self, async_client: AsyncClient, register_user, monkeypatch
+    ):
+        alice = await register_user("alice")
+        monkeypatch.setattr(metrics_middleware.settings, "SQL_REPEATED_QUERY_LIMIT", 2)
+
+        async def load_user_three_times(token: TokenDep, user_service: UserServiceDep):
+            for _ in range(3):
+                user_cache.clear()
+                user = await get_current_user(token, user_service)
+            return user
+
+        app.dependency_overrides[get_current_user] = load_user_three_times
+        try:
+            with pytest.raises(RepeatedQueryError):
+                await async_client.get("/api/v1/users/me", headers=alice)
+            # Each request gets its own log, so the count does not carry over
+            del app.dependency_overrides[get_current_user]
+            for _ in range(3):
+                user_cache.clear()
+                response = await async_client.get("/api/v1/users/me", headers=alice)
+                assert response.status_code == 200
+        finally:
+            app.dependency_overrides.pop(get_current_user, None)
+
+
+class TestSlowQueries:
+    """Tests for the slow-query log."""
+
+    @pytest.fixture
+    def slow_log(self, monkeypatch, caplog):
+        monkeypatch.setattr(instrumentation.settings, "SQL_SLOW_QUERY_MS", 20)
+        instrumentation._explained.clear()
+        caplog.set_level(logging.WARNING, logger="app.db.slow_queries")
+
+        async def records(statement: str) -> list[str]:
+            await asyncio.gather(*instrumentation._explain_tasks)
+            return [
+                record.getMessage()
+                for record in caplog.records
+                if record.name == "app.db.slow_queries" and statement in record.getMessage()
+            ]
+
+        return records
+
+    async def test_select_is_explained_with_analyze(self, slow_log):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT pg_sleep(0.05)"))
+
+        (message,) = await slow_log("pg_sleep(0.05)")
+        assert message.startswith("Slow query (")
+        assert "Execution Time" in message
+
+    async def test_writes_are_planned_not_executed(self, slow_log):
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE slow_write (n int)"))
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text("INSERT INTO slow_write SELECT 1 FROM pg_sleep(0.05)"))
+            (message,) = await slow_log("INSERT INTO slow_write")
+            async with engine.connect() as conn:
+                count = await conn.scalar(text("SELECT count(*) FROM slow_write"))
+        finally:
+            async with engine.begin() as conn:
+                await conn.execute(text("DROP TABLE slow_write"))
+
+        assert count == 1
+        assert "Insert on slow_write" in message
+        assert "Execution Time" not in message
+
+    async def test_statement_is_explained_once_per_interval(self, slow_log):
+        async with engine.connect() as conn:
+            for _ in range(2):
+                await conn.execute(text("SELECT pg_sleep(0.03)"))
+
+        messages = await slow_log("pg_sleep(0.03)")
+        assert len(messages) == 2
+        # The repeat is logged straight away, the first one once EXPLAIN is back
+        assert len([message for message in messages if "Execution Time" in message]) == 1
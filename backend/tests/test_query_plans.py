@@ -0,0 +1,285 @@
+"""Query plan regression tests: every repository query shape on a realistic table.
+
+Seeds PLAN_TEST_ROWS todos with app.seeds.generate (its mix of statuses and
+priorities, users skewed by Zipf), runs each repository call and EXPLAINs
+the statements it sent. A shape fails if its plan scans a whole table
+sequentially or stops using the index it is expected to use, so a schema or
+query change cannot quietly turn a hot path into O(n). Counting every row is
+O(n) whatever the plan, so unfiltered counts and reconciliation are left out.
+"""
+
+import os
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import engine
+from app.models.todo import Priority
+from app.models.user import UserStatus
+from app.repositories.todo_repository import TodoRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.mixin import utcnow_aware
+from app.schemas.todo import SearchMode, TodoUpdate
+from app.seeds.generate import DEFAULT_PASSWORD, generate
+
+# Todos seeded for the plans; the planner needs volume to prefer indexes
+PLAN_TEST_ROWS = int(os.environ.get("PLAN_TEST_ROWS", 50_000))
+PLAN_TEST_USERS = 1000
+# Tables no hot-path query may read with a sequential scan
+HOT_TABLES = {"todo", "todo_archive", "user", "todo_stats"}
+
+
+@dataclass
+class Seeded:
+    """A seeded todo, for the calls to use its id, owner and sort key."""
+
+    user_id: uuid.UUID
+    todo_id: uuid.UUID
+    created_at: datetime
+
+
+@pytest.fixture(scope="module")
+async def seeded(database: str) -> AsyncIterator[Seeded]:
+    tables = ", ".join(f'"{table.name}"' for table in SQLModel.metadata.sorted_tables)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} CASCADE"))
+    await generate(PLAN_TEST_USERS, PLAN_TEST_ROWS, 1.0, "plan_", DEFAULT_PASSWORD, 1, False)
+    # Todos completed over half a year ago have been archived
+    async with AsyncSession(engine) as session:
+        cutoff = utcnow_aware() - timedelta(days=180)
+        while await TodoRepository(session).archive_completed(cutoff, 5000):
+            pass
+    async with engine.connect() as conn:
+        # Statistics and a visibility map, as a table in steady use has
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("todo", "todo_archive", '"user"', "todo_stats"):
+            await conn.execute(text(f"VACUUM ANALYZE {table}"))
+        row = (
+            await conn.execute(
+                text(
+                    "SELECT user_id, id, created_at FROM todo "
+                    "ORDER BY created_at DESC OFFSET 1000 LIMIT 1"
+                )
+            )
+        ).one()
+    yield Seeded(*row)
+
+
+@contextmanager
+def capture_statements(conn: AsyncConnection) -> Iterator[list[tuple[str, Any]]]:
+    statements: list[tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(conn.sync_connection, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(conn.sync_connection, "before_cursor_execute", record)
+
+
+def plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+Call = Callable[[TodoRepository, UserRepository, Seeded], Awaitable[Any]]
+
+# (shape, repository call, indexes its plan must use)
+QUERY_SHAPES: list[tuple[str, Call, set[str]]] = [
+    (
+        "list newest",
+        lambda todos, users, ids: todos.get_todos(viewer_id=ids.user_id, limit=21),
+        {"ix_todo_created_at_id"},
+    ),
+    (
+        "list deep page",
+        lambda todos, users, ids: todos.get_todos(viewer_id=ids.user_id, limit=21, offset=980),
+        {"ix_todo_created_at_id"},
+    ),
+    (
+        "list after cursor",
+        lambda todos, users, ids: todos.get_todos(
+            viewer_id=ids.user_id, limit=21, after=(ids.created_at, ids.todo_id)
+        ),
+        {"ix_todo_created_at_id"},
+    ),
+    (
+        "list by priority",
+        lambda todos, users, ids: todos.get_todos(
+            viewer_id=ids.user_id, limit=21, priority=Priority.HIGH
+        ),
+        {"ix_todo_priority_created_at_id"},
+    ),
+    (
+        "list completed",
+        lambda todos, users, ids: todos.get_todos(viewer_id=ids.user_id, limit=21, completed=True),
+        {"ix_todo_status_created_at_id"},
+    ),
+    (
+        # Most todos are open: walking the list order finds a page at once
+        "list open",
+        lambda todos, users, ids: todos.get_todos(viewer_id=ids.user_id, limit=21, completed=False),
+        {"ix_todo_created_at_id"},
+    ),
+    (
+        "list with archive",
+        lambda todos, users, ids: todos.get_todos(
+            viewer_id=ids.user_id, limit=21, include_archived=True
+        ),
+        {"ix_todo_created_at_id", "ix_todo_archive_created_at_id"},
+    ),
+    (
+        "count by priority",
+        lambda todos, users, ids: todos.count_todos(priority=Priority.LOW),
+        {"ix_todo_priority_created_at_id"},
+    ),
+    (
+        # The archival index holds exactly the completed todos, and is smaller
+        "count completed",
+        lambda todos, users, ids: todos.count_todos(completed=True),
+        {"ix_todo_completed_updated_at"},
+    ),
+    (
+        "search substring",
+        lambda todos, users, ids: todos.search_todos("kitchen", viewer_id=ids.user_id, limit=21),
+        {"ix_todo_title_trgm"},
+    ),
+    (
+        "search words",
+        lambda todos, users, ids: todos.search_todos(
+            "kitchen", viewer_id=ids.user_id, limit=21, search_mode=SearchMode.WORDS
+        ),
+        {"ix_todo_title_fts"},
+    ),
+    (
+        "count search",
+        lambda todos, users, ids: todos.count_todos(search="kitchen"),
+        {"ix_todo_title_trgm"},
+    ),
+    (
+        "get todo",
+        lambda todos, users, ids: todos.get_todo(ids.todo_id, for_update=True),
+        {"pk_todo"},
+    ),
+    (
+        "get archived todo",
+        lambda todos, users, ids: todos.get_archived_todo(ids.todo_id),
+        {"pk_todo_archive"},
+    ),
+    (
+        "existing ids",
+        lambda todos, users, ids: todos.get_existing_ids([ids.todo_id, uuid.uuid4()]),
+        {"pk_todo"},
+    ),
+    (
+        "update todo",
+        lambda todos, users, ids: todos.update_todo(
+            ids.todo_id, ids.user_id, TodoUpdate(title="Renamed")
+        ),
+        {"pk_todo"},
+    ),
+    (
+        "batch update",
+        lambda todos, users, ids: todos.update_todos(
+            ids.user_id, {ids.todo_id: {"title": "Renamed"}}
+        ),
+        {"pk_todo"},
+    ),
+    (
+        "delete todos",
+        lambda todos, users, ids: todos.delete_todos(ids.user_id, [ids.todo_id]),
+        {"pk_todo"},
+    ),
+    (
+        "export own todos",
+        lambda todos, users, ids: anext(todos.stream_todos(user_id=ids.user_id)),
+        {"ix_todo_user_id_created_at_id"},
+    ),
+    (
+        "archive batch",
+        lambda todos, users, ids: todos.archive_completed(utcnow_aware() - timedelta(days=90), 500),
+        {"ix_todo_completed_updated_at"},
+    ),
+    (
+        "stats",
+        lambda todos, users, ids: todos.get_stats(ids.user_id),
+        {"pk_todo_stats"},
+    ),
+    (
+        "user by username",
+        lambda todos, users, ids: users.get_user_by_username("plan_1"),
+        {"ix_user_username"},
+    ),
+    (
+        "user by email",
+        lambda todos, users, ids: users.get_user_by_email("plan_1@example.com"),
+        {"ix_user_email"},
+    ),
+    (
+        "list users",
+        lambda todos, users, ids: users.get_users(
+            limit=21, after="plan_1", status=UserStatus.ACTIVE, username_prefix="plan_"
+        ),
+        {"ix_user_username"},
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "call,expected_indexes",
+    [(call, indexes) for _, call, indexes in QUERY_SHAPES],
+    ids=[shape for shape, _, _ in QUERY_SHAPES],
+)
+async def test_query_plan(seeded: Seeded, call: Call, expected_indexes: set[str]):
+    async with engine.connect() as conn:
+        # Writes are made in a savepoint and rolled back with the transaction
+        await conn.begin()
+        session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+        with capture_statements(conn) as statements:
+            await call(TodoRepository(session), UserRepository(session), seeded)
+
+        used: set[str] = set()
+        plans = []
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+                continue
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + statement, tuple(parameters or ())
+            )
+            plan = result.scalar_one()[0]["Plan"]
+            plans.append(plan)
+            for node in plan_nodes(plan):
+                if node["Node Type"] == "Seq Scan":
+                    assert node["Relation Name"] not in HOT_TABLES, (
+                        f"Sequential scan on {node['Relation Name']}:\n{statement}\n{plan}"
+                    )
+                if "Index Name" in node:
+                    used.add(node["Index Name"])
+        await conn.rollback()
+
+    assert plans, "The call sent no statement to explain"
+    assert expected_indexes <= used, f"Expected {expected_indexes}, plans used {used}:\n{plans}"
+
+
+async def test_username_collation_is_c(database: str):
+    # Otherwise "list users" only uses the index when the database itself is C
+    async with engine.connect() as conn:
+        collation = await conn.scalar(
+            text(
+                "SELECT collation_name FROM information_schema.columns "
+                "WHERE table_name = 'user' AND column_name = 'username'"
+            )
+        )
+    assert collation == "C"
@@ -0,0 +1,127 @@
+"""Tests for read-replica routing."""
+
+from collections import Counter
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.cache import recent_writers
+from app.db import session as db_session
+from app.db.session import ReplicaSet
+from tests.conftest import TEST_DATABASE_URL
+
+TODOS_URL = "/api/v1/todos"
+# Nothing listens on port 1, so connecting fails straight away
+DEAD_URL = make_url(TEST_DATABASE_URL).set(port=1).render_as_string(hide_password=False)
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+async def replica():
+    """The test database reached under a second URL."""
+    engine = create_async_engine(make_url(TEST_DATABASE_URL).set(host="127.0.0.1"))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def checkouts(replica) -> Counter:
+    """Connections handed out by the replica's pool."""
+    counter = Counter()
+
+    @event.listens_for(replica.sync_engine, "checkout")
+    def count(*args) -> None:
+        counter["replica"] += 1
+
+    return counter
+
+
+@pytest.fixture
+async def dead_replica():
+    engine = create_async_engine(DEAD_URL, connect_args={"timeout": 1})
+    yield engine
+    await engine.dispose()
+
+
+def install(monkeypatch, *engines, timer=None) -> ReplicaSet:
+    replicas = ReplicaSet(list(engines), retry_after=30, timer=timer or FakeTimer())
+    monkeypatch.setattr(db_session, "replicas", replicas)
+    return replicas
+
+
+def test_replica_set_rotates_and_skips_failed_replicas():
+    first, second = create_async_engine(DEAD_URL), create_async_engine(DEAD_URL)
+    timer = FakeTimer()
+    replicas = ReplicaSet([first, second], retry_after=30, timer=timer)
+
+    assert replicas.available() == [first, second]
+    assert replicas.available() == [second, first]
+    replicas.mark_down(first)
+    assert replicas.available() == [second]
+    timer.now = 31
+    assert replicas.available() == [second, first]
+    assert ReplicaSet([], retry_after=30).available() == []
+
+
+class TestReadRouting:
+    """Reads go to replicas unless the client just wrote or they are down."""
+
+    async def test_reads_use_replica_until_own_write(
+        self, async_client: AsyncClient, register_user, replica, checkouts, monkeypatch
+    ):
+        install(monkeypatch, replica)
+        alice = await register_user("alice")
+        bob = await register_user("bob")
+
+        await async_client.post(TODOS_URL, json={"title": "t", "description": "d"}, headers=alice)
+
+        # Bob did not write: his reads hit the replica
+        response = await async_client.get(TODOS_URL, headers=bob)
+        assert response.status_code == 200
+        assert checkouts["replica"] == 1
+        # Alice just wrote: she reads her own writes from the primary
+        response = await async_client.get(TODOS_URL, headers=alice)
+        assert response.json()["total"] == 1
+        assert checkouts["replica"] == 1
+        # Once the stickiness expires she is back on the replica
+        recent_writers.clear()
+        await async_client.get(f"{TODOS_URL}/stats", headers=alice)
+        assert checkouts["replica"] == 2
+
+    async def test_failed_replica_falls_back(
+        self,
+        async_client: AsyncClient,
+        register_user,
+        replica,
+        checkouts,
+        dead_replica,
+        monkeypatch,
+    ):
+        alice = await register_user("alice")
+        replicas = install(monkeypatch, dead_replica, replica)
+
+        response = await async_client.get(TODOS_URL, headers=alice)
+        assert response.status_code == 200
+        assert checkouts["replica"] == 1
+        assert replicas.available() == [replica]
+
+    async def test_no_healthy_replica_uses_primary(
+        self, async_client: AsyncClient, register_user, dead_replica, monkeypatch
+    ):
+        alice = await register_user("alice")
+        install(monkeypatch, dead_replica)
+
+        response = await async_client.get("/api/v1/users", headers=alice)
+
+        assert response.status_code == 200
+        assert [user["username"] for user in response.json()["items"]] == ["alice"]
@@ -0,0 +1,147 @@
+"""Tests for the response cache and its invalidation on writes."""
+
+import os
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.response_cache import MemoryCacheBackend, RedisCacheBackend
+from tests.conftest import assert_max_queries
+
+TODOS_URL = "/api/v1/todos"
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(maxsize=2)
+    await backend.set("a", "1", b"one", ttl=10)
+    await backend.set("a", "2", b"two", ttl=10)
+    await backend.get("a", "1")
+
+    await backend.set("b", "3", b"three", ttl=10)
+
+    assert await backend.get("a", "1") == b"one"
+    assert await backend.get("a", "2") is None
+    assert len(backend) == 2
+
+
+async def test_memory_backend_expires_and_invalidates_by_scope():
+    timer = FakeTimer()
+    backend = MemoryCacheBackend(maxsize=10, timer=timer)
+    await backend.set("a", "1", b"one", ttl=5)
+    await backend.set("a", "2", b"two", ttl=50)
+    await backend.set("b", "1", b"other", ttl=50)
+
+    timer.now = 10
+    assert await backend.get("a", "1") is None
+    assert await backend.get("a", "2") == b"two"
+
+    await backend.invalidate("a")
+    assert await backend.get("a", "2") is None
+    assert await backend.get("b", "1") == b"other"
+
+
+@pytest.mark.skipif("TEST_REDIS_URL" not in os.environ, reason="TEST_REDIS_URL is not set")
+async def test_redis_backend():
+    backend = RedisCacheBackend(os.environ["TEST_REDIS_URL"], prefix="test-response-cache:")
+    await backend.clear()
+    try:
+        await backend.set("a", "1", b"one", ttl=5)
+        await backend.set("b", "1", b"other", ttl=5)
+        await backend.set("b", "2", b"gone", ttl=0.001)
+
+        assert await backend.get("a", "1") == b"one"
+        assert await backend.get("b", "2") is None
+        await backend.invalidate("a")
+        assert await backend.get("a", "1") is None
+        assert await backend.get("b", "1") == b"other"
+    finally:
+        await backend.clear()
+        await backend.client.aclose()
+
+
+async def test_stats_are_served_from_cache_until_a_write(async_client: AsyncClient, register_user):
+    headers = await register_user("alice")
+    await async_client.get(f"{TODOS_URL}/stats", headers=headers)
+
+    with assert_max_queries(0):
+        response = await async_client.get(f"{TODOS_URL}/stats", headers=headers)
+    assert response.json()["total"] == 0
+
+    await async_client.post(
+        TODOS_URL, json={"title": "Write docs", "description": ""}, headers=headers
+    )
+    response = await async_client.get(f"{TODOS_URL}/stats", headers=headers)
+    assert response.json()["total"] == 1
+
+
+async def test_cached_todo_follows_updates_and_revalidates(
+    async_client: AsyncClient, register_user
+):
+    headers = await register_user("alice")
+    todo = (
+        await async_client.post(
+            TODOS_URL, json={"title": "Write docs", "description": ""}, headers=headers
+        )
+    ).json()
+    url = f"{TODOS_URL}/{todo['id']}"
+    etag = (await async_client.get(url, headers=headers)).headers["ETag"]
+
+    with assert_max_queries(0):
+        response = await async_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    await async_client.patch(url, json={"title": "Ship docs"}, headers=headers)
+    response = await async_client.get(url, headers=headers)
+    assert response.json()["title"] == "Ship docs"
+    assert response.headers["ETag"] != etag
+
+    await async_client.delete(url, headers=headers)
+    assert (await async_client.get(url, headers=headers)).status_code == 404
+
+
+async def test_list_sees_other_users_writes(async_client: AsyncClient, register_user):
+    alice = await register_user("alice")
+    bob = await register_user("bob")
+    await async_client.get(TODOS_URL, headers=alice)
+
+    # Only the watermark behind the ETag is queried on a hit
+    with assert_max_queries(1):
+        response = await async_client.get(TODOS_URL, headers=alice)
+    assert response.json()["items"] == []
+
+    await async_client.post(TODOS_URL, json={"title": "Bob's", "description": "x"}, headers=bob)
+    items = (await async_client.get(TODOS_URL, headers=alice)).json()["items"]
+    assert [(item["title"], item["description"]) for item in items] == [("Bob's", None)]
+
+
+async def test_me_follows_user_updates(async_client: AsyncClient, register_user):
+    headers = await register_user("alice")
+    me = (await async_client.get("/api/v1/users/me", headers=headers)).json()
+
+    await async_client.patch(
+        f"/api/v1/users/{me['id']}", json={"email": "new@example.com"}, headers=headers
+    )
+
+    response = await async_client.get("/api/v1/users/me", headers=headers)
+    assert response.json()["email"] == "new@example.com"
+
+
+async def test_hit_ratio_is_exported(async_client: AsyncClient, register_user):
+    headers = await register_user("alice")
+    for _ in range(2):
+        await async_client.get(f"{TODOS_URL}/stats", headers=headers)
+
+    metrics = (await async_client.get("/metrics")).text
+
+    route = f"{TODOS_URL}/stats"
+    assert f'response_cache_requests_total{{route="{route}",result="hit"}}' in metrics
+    assert f'response_cache_hit_ratio{{route="{route}"}}' in metrics
+    assert "response_cache_entries" in metrics
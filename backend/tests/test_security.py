@@ -0,0 +1,58 @@
+"""Tests for password hashing and the hashing executor."""
+
+import asyncio
+
+import pytest
+
+from app.core import security
+from app.core.security import PasswordExecutor, PasswordHasherBusyError
+
+
+class TestPasswordExecutor:
+    """Tests for PasswordExecutor."""
+
+    @pytest.mark.parametrize("mode", ["inline", "thread"])
+    async def test_hash_and_verify_roundtrip(self, mode: str):
+        executor = PasswordExecutor(mode, workers=2, max_queue=4)
+        try:
+            hashed = await executor.run(security.get_password_hash, "Password123!")
+
+            assert await executor.run(security.verify_password, "Password123!", hashed)
+            assert not await executor.run(security.verify_password, "wrong", hashed)
+        finally:
+            executor.shutdown()
+
+    async def test_does_not_block_event_loop(self):
+        executor = PasswordExecutor("thread", workers=1, max_queue=4)
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            await executor.run(security.get_password_hash, "Password123!")
+        finally:
+            task.cancel()
+            executor.shutdown()
+
+        assert ticks > 0
+
+    async def test_full_queue_rejects(self):
+        executor = PasswordExecutor("thread", workers=1, max_queue=1)
+        try:
+            first = asyncio.create_task(executor.run(security.get_password_hash, "Password123!"))
+            await asyncio.sleep(0)
+
+            with pytest.raises(PasswordHasherBusyError):
+                await executor.run(security.get_password_hash, "Password123!")
+            await first
+        finally:
+            executor.shutdown()
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            PasswordExecutor("fibers", workers=1, max_queue=1)
@@ -0,0 +1,52 @@
+"""Tests for the dataset generator."""
+
+import random
+
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.seeds.generate import DEFAULT_PASSWORD, generate, todo_counts
+
+INDEXES_QUERY = text("SELECT indexname FROM pg_indexes WHERE tablename = 'todo' ORDER BY 1")
+
+
+def test_todo_counts_are_skewed():
+    counts = todo_counts(100, 10_000, 1.0, random.Random(1))
+
+    assert sum(counts) == 10_000
+    assert counts[0] > 10 * counts[-1]
+    assert sorted(counts, reverse=True)[:5] == counts[:5]
+
+
+def test_todo_counts_without_skew_are_even():
+    counts = todo_counts(10, 1_005, 0, random.Random(1))
+
+    assert sum(counts) == 1_005
+    assert max(counts) - min(counts) <= 5
+
+
+async def test_generate(async_client: AsyncClient):
+    async with engine.connect() as conn:
+        indexes = (await conn.execute(INDEXES_QUERY)).scalars().all()
+
+    status = await generate(5, 300, 1.0, "seed_", DEFAULT_PASSWORD, 1, drop_indexes=True)
+
+    assert status == 0
+    async with engine.connect() as conn:
+        assert (await conn.execute(INDEXES_QUERY)).scalars().all() == indexes
+        todos = await conn.scalar(text("SELECT count(*) FROM todo"))
+        # COPY fires the statement-level triggers that keep todo_stats up to date
+        stats_total = await conn.scalar(text("SELECT sum(total) FROM todo_stats"))
+    assert todos == stats_total == 300
+
+    response = await async_client.post(
+        "/api/v1/auth/login", json={"username": "seed_0", "password": DEFAULT_PASSWORD}
+    )
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = await async_client.get("/api/v1/todos/stats", headers=headers)
+    assert response.json()["total"] > 300 / 5
+
+    # The same prefix again is refused rather than clashing with the first run
+    assert await generate(5, 300, 1.0, "seed_", DEFAULT_PASSWORD, 1, drop_indexes=False) == 2
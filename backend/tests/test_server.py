@@ -0,0 +1,46 @@
+"""Tests for the production launcher's worker count and connection budget."""
+
+import pytest
+
+from app.server import ServerPlan, available_cpus, plan_server
+
+
+def test_without_a_budget_the_pool_is_left_as_configured():
+    assert plan_server(4, 0, 1, 0, 5, 10) == ServerPlan(4, 5, 10)
+    assert plan_server(4, 2, 3, 0, 5, 10) == ServerPlan(2, 5, 10)
+
+
+def test_budget_is_split_across_instances_and_workers():
+    # 100 // (2 x 4) = 12 each, one of them for the change feed
+    plan = plan_server(4, 0, 2, 100, 5, 10)
+    assert plan == ServerPlan(4, 5, 6)
+    assert plan.connections_per_worker * plan.workers * 2 <= 100
+
+
+def test_budget_never_grows_the_pool():
+    assert plan_server(2, 0, 1, 1000, 5, 10) == ServerPlan(2, 5, 10)
+
+
+def test_small_share_shrinks_the_pool_size():
+    assert plan_server(8, 8, 1, 32, 5, 10) == ServerPlan(8, 3, 0)
+
+
+def test_auto_workers_are_capped_by_the_budget():
+    # Each worker needs a pooled connection and the change feed's
+    assert plan_server(16, 0, 2, 12, 5, 10) == ServerPlan(3, 1, 0)
+
+
+def test_explicit_workers_over_budget_fail():
+    with pytest.raises(ValueError, match="fewer workers"):
+        plan_server(16, 16, 2, 40, 5, 10)
+
+
+@pytest.mark.parametrize(
+    "cpu_max,expected",
+    [("max 100000\n", None), ("150000 100000\n", 2), ("50000 100000\n", 1)],
+)
+def test_available_cpus_follows_the_cgroup_quota(tmp_path, cpu_max, expected):
+    path = tmp_path / "cpu.max"
+    path.write_text(cpu_max)
+    unlimited = available_cpus(tmp_path / "missing")
+    assert available_cpus(path) == min(expected or unlimited, unlimited)
@@ -1,2 +1,501 @@
-# TODO: Implement tests for todos endpoints
-# The tests should cover CRUD operations and edge cases
+"""Tests for the todos endpoints."""
+
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.instrumentation import track_queries
+from app.db.session import engine
+from app.repositories.todo_repository import TodoRepository
+
+TODOS_URL = "/api/v1/todos"
+
+
+@pytest.fixture
+async def alice(register_user) -> dict[str, str]:
+    return await register_user("alice")
+
+
+@pytest.fixture
+async def bob(register_user) -> dict[str, str]:
+    return await register_user("bob")
+
+
+async def create_todo(client: AsyncClient, headers: dict[str, str], **fields) -> dict:
+    payload = {"title": "Write tests", "description": "Cover the todo API", **fields}
+    response = await client.post(TODOS_URL, json=payload, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+class TestCreateTodo:
+    """Tests for POST /todos."""
+
+    async def test_create_todo_success(self, async_client: AsyncClient, alice):
+        response = await async_client.post(
+            TODOS_URL,
+            json={"title": "Buy milk", "description": "2 litres", "priority": "HIGH"},
+            headers=alice,
+        )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["title"] == "Buy milk"
+        assert data["description"] == "2 litres"
+        assert data["priority"] == "HIGH"
+        assert data["status"] == "NOT_STARTED"
+        me = await async_client.get("/api/v1/users/me", headers=alice)
+        assert data["user_id"] == me.json()["id"]
+
+    async def test_create_todo_requires_auth(self, async_client: AsyncClient):
+        response = await async_client.post(TODOS_URL, json={"title": "x", "description": "y"})
+
+        assert response.status_code == 401
+
+    async def test_create_todo_validates_input(self, async_client: AsyncClient, alice):
+        response = await async_client.post(
+            TODOS_URL, json={"title": "x" * 201, "description": "y"}, headers=alice
+        )
+
+        assert response.status_code == 422
+
+    async def test_due_date_with_offset_is_stored_as_utc(self, async_client: AsyncClient, alice):
+        todo = await create_todo(async_client, alice, due_date="2026-01-01T12:00:00+02:00")
+
+        assert todo["due_date"] == "2026-01-01T10:00:00"
+        fetched = await async_client.get(f"{TODOS_URL}/{todo['id']}", headers=alice)
+        assert fetched.json()["due_date"] == "2026-01-01T10:00:00"
+
+
+class TestListTodos:
+    """Tests for GET /todos."""
+
+    async def test_get_all_todos(self, async_client: AsyncClient, alice, bob):
+        own = await create_todo(async_client, alice, title="Alice todo")
+        other = await create_todo(async_client, bob, title="Bob todo")
+
+        response = await async_client.get(TODOS_URL, headers=alice)
+
+        assert response.status_code == 200
+        items = {item["id"]: item for item in response.json()["items"]}
+        assert set(items) == {own["id"], other["id"]}
+        assert items[own["id"]]["description"] == "Cover the todo API"
+        assert items[other["id"]]["description"] is None
+        assert items[own["id"]]["user_id"] == own["user_id"]
+        assert items[other["id"]]["user_id"] == other["user_id"]
+
+    async def test_items_render_like_single_todos(self, async_client: AsyncClient, alice):
+        todo = await create_todo(
+            async_client, alice, priority="HIGH", due_date="2030-01-02T03:04:05.120000"
+        )
+
+        listed = await async_client.get(TODOS_URL, headers=alice)
+        single = await async_client.get(f"{TODOS_URL}/{todo['id']}", headers=alice)
+
+        # Rows are rendered by orjson, single todos through the response_model
+        assert listed.headers["content-type"] == "application/json"
+        assert "ETag" in listed.headers
+        assert listed.json()["items"] == [single.json()]
+
+    @pytest.mark.parametrize("params", [{}, {"search": "todo"}], ids=["list", "search"])
+    async def test_other_descriptions_are_masked_in_sql(
+        self, async_client: AsyncClient, alice, bob, params
+    ):
+        await create_todo(async_client, alice, title="Alice todo")
+        await create_todo(async_client, bob, title="Bob todo", description="Secret")
+
+        with track_queries() as queries:
+            response = await async_client.get(TODOS_URL, params=params, headers=alice)
+
+        descriptions = {t["title"]: t["description"] for t in response.json()["items"]}
+        assert descriptions == {"Alice todo": "Cover the todo API", "Bob todo": None}
+        (statement,) = [s for s in queries.statements if "ORDER BY" in s]
+        projection = statement.split("FROM")[0]
+        assert "CASE WHEN (todo.user_id = $1::UUID) THEN todo.description END" in projection
+        assert projection.count("todo.description") == 1
+
+    async def test_filters_and_search(self, async_client: AsyncClient, alice):
+        await create_todo(async_client, alice, title="Pay rent", priority="HIGH")
+        await create_todo(async_client, alice, title="Water plants", priority="LOW")
+
+        by_priority = await async_client.get(TODOS_URL, params={"priority": "HIGH"}, headers=alice)
+        by_title = await async_client.get(TODOS_URL, params={"search": "plant"}, headers=alice)
+
+        assert [t["title"] for t in by_priority.json()["items"]] == ["Pay rent"]
+        assert [t["title"] for t in by_title.json()["items"]] == ["Water plants"]
+
+    async def test_page_mode(self, async_client: AsyncClient, alice):
+        for i in range(5):
+            await create_todo(async_client, alice, title=f"todo {i}")
+
+        response = await async_client.get(
+            TODOS_URL, params={"page": 2, "page_size": 2}, headers=alice
+        )
+
+        data = response.json()
+        assert data["total"] == 5
+        assert data["page"] == 2
+        assert [t["title"] for t in data["items"]] == ["todo 2", "todo 1"]
+
+    async def test_cursor_mode_walks_every_todo_once(self, async_client: AsyncClient, alice):
+        for i in range(5):
+            await create_todo(async_client, alice, title=f"todo {i}")
+
+        data = (await async_client.get(TODOS_URL, params={"page_size": 2}, headers=alice)).json()
+        titles = [t["title"] for t in data["items"]]
+        while data["next_cursor"] is not None:
+            params = {"page_size": 2, "cursor": data["next_cursor"]}
+            data = (await async_client.get(TODOS_URL, params=params, headers=alice)).json()
+            assert data["total"] is None
+            titles += [t["title"] for t in data["items"]]
+
+        assert titles == [f"todo {i}" for i in reversed(range(5))]
+
+    async def test_invalid_cursor(self, async_client: AsyncClient, alice):
+        response = await async_client.get(
+            TODOS_URL, params={"cursor": "not-a-cursor"}, headers=alice
+        )
+
+        assert response.status_code == 400
+
+
+class TestSingleTodo:
+    """Tests for GET/PATCH/DELETE /todos/{todo_id}."""
+
+    async def test_owner_can_get_todo(self, async_client: AsyncClient, alice):
+        todo = await create_todo(async_client, alice)
+
+        response = await async_client.get(f"{TODOS_URL}/{todo['id']}", headers=alice)
+
+        assert response.status_code == 200
+        assert response.json()["description"] == "Cover the todo API"
+
+    async def test_other_user_is_forbidden(self, async_client: AsyncClient, alice, bob):
+        todo = await create_todo(async_client, alice)
+        url = f"{TODOS_URL}/{todo['id']}"
+
+        assert (await async_client.get(url, headers=bob)).status_code == 403
+        assert (await async_client.patch(url, json={"title": "x"}, headers=bob)).status_code == 403
+        assert (await async_client.patch(f"{url}/complete", headers=bob)).status_code == 403
+        assert (await async_client.delete(url, headers=bob)).status_code == 403
+        assert (await async_client.get(url, headers=alice)).json()["title"] == todo["title"]
+
+    async def test_missing_todo(self, async_client: AsyncClient, alice):
+        url = f"{TODOS_URL}/{uuid.uuid4()}"
+
+        assert (await async_client.get(url, headers=alice)).status_code == 404
+        assert (
+            await async_client.patch(url, json={"title": "x"}, headers=alice)
+        ).status_code == 404
+        assert (await async_client.patch(f"{url}/complete", headers=alice)).status_code == 404
+        assert (await async_client.delete(url, headers=alice)).status_code == 404
+
+    async def test_partial_update(self, async_client: AsyncClient, alice):
+        todo = await create_todo(async_client, alice, priority="LOW")
+
+        response = await async_client.patch(
+            f"{TODOS_URL}/{todo['id']}", json={"priority": "HIGH"}, headers=alice
+        )
+
+        assert response.status_code == 200
+        assert response.json()["priority"] == "HIGH"
+        assert response.json()["title"] == todo["title"]
+
+    async def test_update_due_date_with_offset(self, async_client: AsyncClient, alice):
+        todo = await create_todo(async_client, alice)
+
+        response = await async_client.patch(
+            f"{TODOS_URL}/{todo['id']}", json={"due_date": "2026-01-01T12:00:00Z"}, headers=alice
+        )
+
+        assert response.status_code == 200
+        assert response.json()["due_date"] == "2026-01-01T12:00:00"
+
+    @pytest.mark.parametrize("field", ["title", "description", "status"])
+    async def test_update_rejects_null_for_required_fields(
+        self, async_client: AsyncClient, alice, field
+    ):
+        todo = await create_todo(async_client, alice)
+        url = f"{TODOS_URL}/{todo['id']}"
+
+        response = await async_client.patch(url, json={field: None}, headers=alice)
+
+        assert response.status_code == 422
+        assert (await async_client.get(url, headers=alice)).json() == todo
+
+    async def test_update_clears_priority_and_due_date(self, async_client: AsyncClient, alice):
+        todo = await create_todo(
+            async_client, alice, priority="LOW", due_date="2030-01-01T00:00:00"
+        )
+
+        response = await async_client.patch(
+            f"{TODOS_URL}/{todo['id']}", json={"priority": None, "due_date": None}, headers=alice
+        )
+
+        assert response.status_code == 200
+        assert response.json()["priority"] is None
+        assert response.json()["due_date"] is None
+
+    async def test_empty_update_changes_nothing(self, async_client: AsyncClient, alice):
+        todo = await create_todo(async_client, alice)
+
+        response = await async_client.patch(f"{TODOS_URL}/{todo['id']}", json={}, headers=alice)
+
+        assert response.status_code == 200
+        assert response.json() == todo
+
+    async def test_delete(self, async_client: AsyncClient, alice):
+        todo = await create_todo(async_client, alice)
+        url = f"{TODOS_URL}/{todo['id']}"
+
+        assert (await async_client.delete(url, headers=alice)).status_code == 204
+        assert (await async_client.get(url, headers=alice)).status_code == 404
+
+    async def test_complete_toggles_status(self, async_client: AsyncClient, alice):
+        todo = await create_todo(async_client, alice)
+        url = f"{TODOS_URL}/{todo['id']}/complete"
+
+        assert (await async_client.patch(url, headers=alice)).json()["status"] == "COMPLETED"
+        assert (await async_client.patch(url, headers=alice)).json()["status"] == "NOT_STARTED"
+
+
+class TestStats:
+    """Tests for GET /todos/stats."""
+
+    async def test_stats_only_count_own_todos(self, async_client: AsyncClient, alice, bob):
+        done = await create_todo(async_client, alice, priority="HIGH")
+        await create_todo(async_client, alice, priority="LOW")
+        await create_todo(async_client, alice)
+        await create_todo(async_client, bob, priority="HIGH")
+        await async_client.patch(f"{TODOS_URL}/{done['id']}/complete", headers=alice)
+
+        response = await async_client.get(f"{TODOS_URL}/stats", headers=alice)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "total": 3,
+            "completed": 1,
+            "pending": 2,
+            "by_priority": {"LOW": 1, "MEDIUM": 0, "HIGH": 1},
+        }
+
+    async def test_stats_follow_updates_and_deletes(self, async_client: AsyncClient, alice):
+        first = await create_todo(async_client, alice, priority="LOW")
+        second = await create_todo(async_client, alice, priority="LOW")
+        await async_client.patch(
+            f"{TODOS_URL}/{first['id']}", json={"priority": "MEDIUM"}, headers=alice
+        )
+        await async_client.patch(
+            f"{TODOS_URL}/{first['id']}", json={"title": "renamed"}, headers=alice
+        )
+        await async_client.delete(f"{TODOS_URL}/{second['id']}", headers=alice)
+
+        response = await async_client.get(f"{TODOS_URL}/stats", headers=alice)
+
+        assert response.json() == {
+            "total": 1,
+            "completed": 0,
+            "pending": 1,
+            "by_priority": {"LOW": 0, "MEDIUM": 1, "HIGH": 0},
+        }
+
+    async def test_stats_for_user_without_todos(self, async_client: AsyncClient, alice):
+        response = await async_client.get(f"{TODOS_URL}/stats", headers=alice)
+
+        assert response.json()["total"] == 0
+
+    async def test_reconcile_reports_and_fixes_drift(self, async_client: AsyncClient, alice):
+        await create_todo(async_client, alice, priority="HIGH")
+        async with engine.begin() as conn:
+            await conn.execute(text("UPDATE todo_stats SET total = 5, high = 0"))
+
+        async with AsyncSession(engine) as session:
+            drift = await TodoRepository(session).reconcile_stats(fix=True)
+        async with AsyncSession(engine) as session:
+            assert await TodoRepository(session).reconcile_stats(fix=False) == []
+
+        assert {(d.field, d.stored, d.actual) for d in drift} == {("total", 5, 1), ("high", 0, 1)}
+        stats = (await async_client.get(f"{TODOS_URL}/stats", headers=alice)).json()
+        assert stats["total"] == 1
+        assert stats["by_priority"]["HIGH"] == 1
+
+    async def test_reconcile_does_not_wait_for_other_writers(
+        self, async_client: AsyncClient, alice, bob
+    ):
+        await create_todo(async_client, alice, priority="HIGH")
+        bob_todo = await create_todo(async_client, bob)
+        async with engine.begin() as conn:
+            # A missing counters row is recreated
+            await conn.execute(text("DELETE FROM todo_stats WHERE high = 1"))
+
+        async with engine.connect() as writer:
+            # Bob's write is in flight: his todo_stats row stays locked
+            await writer.execute(
+                text("UPDATE todo SET title = 'busy' WHERE id = :id"), {"id": bob_todo["id"]}
+            )
+            async with AsyncSession(engine) as session:
+                drift = await asyncio.wait_for(
+                    TodoRepository(session).reconcile_stats(fix=True), timeout=10
+                )
+            await writer.rollback()
+
+        assert {(d.field, d.stored, d.actual) for d in drift} == {("total", 0, 1), ("high", 0, 1)}
+        stats = (await async_client.get(f"{TODOS_URL}/stats", headers=alice)).json()
+        assert stats["by_priority"]["HIGH"] == 1
+
+
+class TestSearchTodos:
+    """Tests for title search on GET /todos."""
+
+    async def test_substring_search_is_relevance_ordered(self, async_client: AsyncClient, alice):
+        await create_todo(async_client, alice, title="Plan the garden party")
+        await create_todo(async_client, alice, title="Garden")
+        await create_todo(async_client, alice, title="Call mum")
+
+        response = await async_client.get(TODOS_URL, params={"search": "garden"}, headers=alice)
+
+        data = response.json()
+        assert data["total"] == 2
+        assert [t["title"] for t in data["items"]] == ["Garden", "Plan the garden party"]
+
+    async def test_substring_search_escapes_wildcards(self, async_client: AsyncClient, alice):
+        await create_todo(async_client, alice, title="100% done")
+        await create_todo(async_client, alice, title="1000 things")
+
+        response = await async_client.get(TODOS_URL, params={"search": "100%"}, headers=alice)
+
+        assert [t["title"] for t in response.json()["items"]] == ["100% done"]
+
+    async def test_word_search_matches_stemmed_words(self, async_client: AsyncClient, alice):
+        await create_todo(async_client, alice, title="Water the plants")
+        await create_todo(async_client, alice, title="Plantain recipe")
+
+        response = await async_client.get(
+            TODOS_URL, params={"search": "plant", "search_mode": "WORDS"}, headers=alice
+        )
+
+        assert [t["title"] for t in response.json()["items"]] == ["Water the plants"]
+
+    async def test_search_cursor_walks_every_match_once(self, async_client: AsyncClient, alice):
+        for title in ["report", "weekly report", "report draft v2", "old reports", "other"]:
+            await create_todo(async_client, alice, title=title)
+
+        params = {"search": "report", "page_size": 2}
+        data = (await async_client.get(TODOS_URL, params=params, headers=alice)).json()
+        ids = [t["id"] for t in data["items"]]
+        while data["next_cursor"] is not None:
+            params["cursor"] = data["next_cursor"]
+            data = (await async_client.get(TODOS_URL, params=params, headers=alice)).json()
+            ids += [t["id"] for t in data["items"]]
+
+        assert len(ids) == len(set(ids)) == 4
+
+
+class TestBatchTodos:
+    """Tests for the :batchCreate, :batchUpdate and :batchDelete endpoints."""
+
+    async def test_batch_create(self, async_client: AsyncClient, alice):
+        items = [{"title": f"todo {i}", "description": "", "priority": "LOW"} for i in range(3)]
+
+        response = await async_client.post(
+            f"{TODOS_URL}:batchCreate", json={"items": items}, headers=alice
+        )
+
+        assert response.status_code == 201
+        assert [t["title"] for t in response.json()["items"]] == ["todo 0", "todo 1", "todo 2"]
+        stats = (await async_client.get(f"{TODOS_URL}/stats", headers=alice)).json()
+        assert stats["total"] == 3
+        assert stats["by_priority"]["LOW"] == 3
+
+    async def test_batch_create_rejects_oversized_batch(self, async_client: AsyncClient, alice):
+        items = [{"title": "x", "description": ""}] * 501
+
+        response = await async_client.post(
+            f"{TODOS_URL}:batchCreate", json={"items": items}, headers=alice
+        )
+
+        assert response.status_code == 422
+
+    async def test_batch_update_reports_per_item_errors(
+        self, async_client: AsyncClient, alice, bob
+    ):
+        first = await create_todo(async_client, alice, priority="LOW")
+        second = await create_todo(async_client, alice, priority="HIGH")
+        foreign = await create_todo(async_client, bob)
+        missing = str(uuid.uuid4())
+
+        response = await async_client.patch(
+            f"{TODOS_URL}:batchUpdate",
+            json={
+                "items": [
+                    {"id": first["id"], "title": "renamed"},
+                    {"id": second["id"], "priority": None, "status": "COMPLETED"},
+                    {"id": foreign["id"], "title": "hijacked"},
+                    {"id": missing, "title": "ghost"},
+                    {"id": first["id"], "title": "again"},
+                ]
+            },
+            headers=alice,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        updated = {t["id"]: t for t in data["items"]}
+        assert updated[first["id"]]["title"] == "renamed"
+        assert updated[first["id"]]["priority"] == "LOW"
+        assert updated[second["id"]]["priority"] is None
+        assert updated[second["id"]]["status"] == "COMPLETED"
+        assert [(e["index"], e["status_code"]) for e in data["errors"]] == [
+            (2, 403),
+            (3, 404),
+            (4, 400),
+        ]
+        bob_todo = await async_client.get(f"{TODOS_URL}/{foreign['id']}", headers=bob)
+        assert bob_todo.json()["title"] == "Write tests"
+        stats = (await async_client.get(f"{TODOS_URL}/stats", headers=alice)).json()
+        assert stats["completed"] == 1
+        assert stats["by_priority"] == {"LOW": 1, "MEDIUM": 0, "HIGH": 0}
+
+    async def test_batch_update_rejects_null_for_required_fields(
+        self, async_client: AsyncClient, alice
+    ):
+        first = await create_todo(async_client, alice)
+        second = await create_todo(async_client, alice)
+
+        response = await async_client.patch(
+            f"{TODOS_URL}:batchUpdate",
+            json={
+                "items": [
+                    {"id": first["id"], "title": "renamed"},
+                    {"id": second["id"], "title": None},
+                ]
+            },
+            headers=alice,
+        )
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][-2:] == [1, "title"]
+        unchanged = await async_client.get(f"{TODOS_URL}/{first['id']}", headers=alice)
+        assert unchanged.json()["title"] == first["title"]
+
+    async def test_batch_delete(self, async_client: AsyncClient, alice, bob):
+        own = await create_todo(async_client, alice)
+        foreign = await create_todo(async_client, bob)
+
+        response = await async_client.request(
+            "DELETE",
+            f"{TODOS_URL}:batchDelete",
+            json={"ids": [own["id"], foreign["id"]]},
+            headers=alice,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["deleted"] == [own["id"]]
+        assert response.json()["errors"][0]["status_code"] == 403
+        assert (
+            await async_client.get(f"{TODOS_URL}/{foreign['id']}", headers=bob)
+        ).status_code == 200
@@ -0,0 +1,124 @@
+"""Tests for the users endpoints."""
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+
+USERS_URL = "/api/v1/users"
+
+
+@pytest.fixture
+async def users(register_user) -> dict[str, dict[str, str]]:
+    """Register a few users, returning their Authorization headers by name."""
+    return {name: await register_user(name) for name in ["bob", "alina", "a_b", "alice", "abe"]}
+
+
+async def usernames(client: AsyncClient, headers: dict[str, str], **params) -> list[str]:
+    response = await client.get(USERS_URL, params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return [user["username"] for user in response.json()["items"]]
+
+
+class TestListUsers:
+    """Tests for GET /users."""
+
+    async def test_users_render_like_single_users(self, async_client: AsyncClient, users):
+        me = (await async_client.get(f"{USERS_URL}/me", headers=users["alice"])).json()
+
+        response = await async_client.get(USERS_URL, headers=users["alice"])
+
+        assert response.status_code == 200
+        by_name = {user["username"]: user for user in response.json()["items"]}
+        assert by_name["alice"] == me
+        assert "hashed_password" not in by_name["bob"]
+
+    async def test_cursor_walks_every_user_once(self, async_client: AsyncClient, users):
+        params = {"page_size": 2}
+        data = (await async_client.get(USERS_URL, params=params, headers=users["bob"])).json()
+        names = [user["username"] for user in data["items"]]
+        while data["next_cursor"] is not None:
+            params["cursor"] = data["next_cursor"]
+            response = await async_client.get(USERS_URL, params=params, headers=users["bob"])
+            data = response.json()
+            names += [user["username"] for user in data["items"]]
+
+        assert names == sorted(users)
+
+    async def test_username_prefix_is_not_a_pattern(self, async_client: AsyncClient, users):
+        headers = users["bob"]
+
+        assert await usernames(async_client, headers, username_prefix="ali") == [
+            "alice",
+            "alina",
+        ]
+        # "_" and "%" match themselves only
+        assert await usernames(async_client, headers, username_prefix="a_") == ["a_b"]
+        assert await usernames(async_client, headers, username_prefix="%") == []
+
+    async def test_status_filter(self, async_client: AsyncClient, users):
+        bob = (await async_client.get(f"{USERS_URL}/me", headers=users["bob"])).json()
+        await async_client.patch(
+            f"{USERS_URL}/{bob['id']}", json={"status": "SUSPENDED"}, headers=users["alice"]
+        )
+
+        headers = users["alice"]
+        assert await usernames(async_client, headers, status="SUSPENDED") == ["bob"]
+        assert "bob" not in await usernames(async_client, headers, status="ACTIVE")
+
+    async def test_summary_view(self, async_client: AsyncClient, users):
+        response = await async_client.get(
+            USERS_URL, params={"view": "SUMMARY", "page_size": 1}, headers=users["bob"]
+        )
+
+        (user,) = response.json()["items"]
+        assert set(user) == {"id", "username"}
+
+    @pytest.mark.parametrize(
+        "params,status_code",
+        [({"cursor": "not-a-cursor"}, 400), ({"page_size": 101}, 422)],
+    )
+    async def test_invalid_parameters(
+        self, async_client: AsyncClient, register_user, params, status_code
+    ):
+        headers = await register_user("alice")
+
+        response = await async_client.get(USERS_URL, params=params, headers=headers)
+
+        assert response.status_code == status_code
+
+    def test_schema_documents_user_page(self):
+        responses = app.openapi()["paths"][USERS_URL]["get"]["responses"]
+
+        schema = responses["200"]["content"]["application/json"]["schema"]
+        assert schema == {"$ref": "#/components/schemas/UserPage"}
+
+
+class TestUpdateUser:
+    """Tests for PATCH /users/{user_id}."""
+
+    async def test_taken_email_is_rejected(self, async_client: AsyncClient, register_user):
+        alice = await register_user("alice")
+        await register_user("bob")
+        me = (await async_client.get(f"{USERS_URL}/me", headers=alice)).json()
+        url = f"{USERS_URL}/{me['id']}"
+
+        response = await async_client.patch(url, json={"email": "bob@example.com"}, headers=alice)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Email already registered"
+
+        response = await async_client.patch(url, json={"email": "new@example.com"}, headers=alice)
+        assert response.status_code == 200
+        assert response.json()["email"] == "new@example.com"
+        assert response.json()["updated_at"] != me["updated_at"]
+
+    async def test_null_status_is_rejected(self, async_client: AsyncClient, register_user):
+        alice = await register_user("alice")
+        me = (await async_client.get(f"{USERS_URL}/me", headers=alice)).json()
+
+        response = await async_client.patch(
+            f"{USERS_URL}/{me['id']}", json={"status": None}, headers=alice
+        )
+
+        assert response.status_code == 422
+        assert (await async_client.get(f"{USERS_URL}/me", headers=alice)).json() == me